@@ -0,0 +1,108 @@
+import struct
+
+import numpy as np
+
+# Același format ca decodorul din Server/adpcm.py: pentru fiecare canal un header de 4 octeți
+# (predictor int16, index pas uint8, rezervat), apoi blocurile de nibble-uri ale canalelor, pe rând.
+CHANNEL_HEADER_SIZE = 4
+
+STEP_TABLE = (
+    7, 8, 9, 10, 11, 12, 13, 14, 16, 17, 19, 21, 23, 25, 28, 31, 34, 37, 41, 45,
+    50, 55, 60, 66, 73, 80, 88, 97, 107, 118, 130, 143, 157, 173, 190, 209, 230, 253, 279, 307,
+    337, 371, 408, 449, 494, 544, 598, 658, 724, 796, 876, 963, 1060, 1166, 1282, 1411, 1552, 1707, 1878, 2066,
+    2272, 2499, 2749, 3024, 3327, 3660, 4026, 4428, 4871, 5358, 5894, 6484, 7132, 7845, 8630, 9493, 10442, 11487,
+    12635, 13899, 15289, 16818, 18500, 20350, 22385, 24623, 27086, 29794, 32767)
+INDEX_ADJUST = (-1, -1, -1, -1, 2, 4, 6, 8)
+
+
+def adpcm_payload_bytes(frames, channels):
+    return channels * (CHANNEL_HEADER_SIZE + frames // 2)
+
+
+def adpcm_max_frames(payload_bytes, channels):
+    return 2 * (payload_bytes // channels - CHANNEL_HEADER_SIZE)
+
+
+def _encode_channel(samples, predictor, index, out, out_offset):
+    step_table = STEP_TABLE
+    index_adjust = INDEX_ADJUST
+    low_nibble = -1
+    pos = out_offset
+    for sample in samples:
+        step = step_table[index]
+        diff = sample - predictor
+        code = 0
+        if diff < 0:
+            code = 8
+            diff = -diff
+        vpdiff = step >> 3
+        if diff >= step:
+            code |= 4
+            diff -= step
+            vpdiff += step
+        half = step >> 1
+        if diff >= half:
+            code |= 2
+            diff -= half
+            vpdiff += half
+        quarter = step >> 2
+        if diff >= quarter:
+            code |= 1
+            vpdiff += quarter
+        predictor = predictor - vpdiff if code & 8 else predictor + vpdiff
+        if predictor > 32767:
+            predictor = 32767
+        elif predictor < -32768:
+            predictor = -32768
+        index += index_adjust[code & 7]
+        if index < 0:
+            index = 0
+        elif index > 88:
+            index = 88
+        if low_nibble < 0:
+            low_nibble = code
+        else:
+            out[pos] = low_nibble | (code << 4)
+            pos += 1
+            low_nibble = -1
+    return predictor, index
+
+
+class AdpcmEncoder:
+    """Encoder IMA-ADPCM pe blocuri: fiecare pachet primește starea decodorului în header.
+
+    Starea encoderului continuă de la un pachet la altul; header-ul permite totuși
+    decodarea independentă a fiecărui pachet, deci o pierdere nu strică pachetele următoare.
+    Intrarea este PCM pe 16 biți; un frame rămas nepereche se păstrează pentru pachetul următor.
+    """
+
+    def __init__(self, channels=1, max_frames=4096):
+        self.channels = channels
+        self._predictors = [0] * channels
+        self._indices = [0] * channels
+        self._pending = np.zeros(0, dtype='<i2')
+        self.last_frames = 0
+        self._out = bytearray(adpcm_payload_bytes(max_frames, channels))
+        self._out_view = memoryview(self._out)
+
+    def encode(self, pcm16):
+        samples = np.frombuffer(pcm16, dtype='<i2')
+        if len(self._pending):
+            samples = np.concatenate((self._pending, samples))
+        frames = len(samples) // self.channels
+        frames -= frames & 1
+        self._pending = samples[frames * self.channels:].copy()
+        self.last_frames = frames
+        size = adpcm_payload_bytes(frames, self.channels)
+        if size > len(self._out):
+            self._out = bytearray(size)
+            self._out_view = memoryview(self._out)
+        block_bytes = frames // 2
+        for ch in range(self.channels):
+            struct.pack_into('<hBB', self._out, ch * CHANNEL_HEADER_SIZE,
+                             self._predictors[ch], self._indices[ch], 0)
+            channel_samples = samples[ch:frames * self.channels:self.channels].tolist()
+            block_offset = self.channels * CHANNEL_HEADER_SIZE + ch * block_bytes
+            self._predictors[ch], self._indices[ch] = _encode_channel(
+                channel_samples, self._predictors[ch], self._indices[ch], self._out, block_offset)
+        return self._out_view[:size]
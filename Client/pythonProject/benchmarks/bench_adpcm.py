@@ -0,0 +1,72 @@
+import importlib.util
+import os
+import sys
+import time
+import wave
+
+import numpy as np
+
+CLIENT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+REPO_DIR = os.path.dirname(os.path.dirname(CLIENT_DIR))
+sys.path.insert(0, CLIENT_DIR)
+
+from adpcm import AdpcmEncoder  # noqa: E402
+from gain import GainStage  # noqa: E402
+from packetizer import AUDIO_HEADER_SIZE, IPV4_UDP_HEADER_BYTES  # noqa: E402
+
+
+def load_server_decoder():
+    # Decodorul firmware-ului, rulat aici pe calea CPython (fără viper).
+    spec = importlib.util.spec_from_file_location("pico_adpcm", os.path.join(REPO_DIR, "Server", "adpcm.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.AdpcmDecoder
+
+
+def cpu_time(fn, items):
+    start = time.process_time()
+    results = [fn(item) for item in items]
+    return time.process_time() - start, results
+
+
+def main():
+    path = sys.argv[1] if len(sys.argv) > 1 else os.path.join(REPO_DIR, "WAV", "1.wav")
+    seconds = 10
+    frames_per_packet = 360
+    with wave.open(path, 'rb') as w:
+        rate, channels, width = w.getframerate(), w.getnchannels(), w.getsampwidth()
+        pcm = w.readframes(rate * seconds)
+    if width != 2:
+        print("Benchmark-ul ADPCM cere un WAV pe 16 biți.")
+        return
+    audio_seconds = len(pcm) / (rate * channels * width)
+    step = frames_per_packet * channels * width
+    chunks = [pcm[i:i + step] for i in range(0, len(pcm), step)]
+    print(f"{os.path.basename(path)}: {rate}Hz, {channels}ch, {audio_seconds:.1f}s, {len(chunks)} pachete")
+
+    gain = GainStage(frames_per_packet * channels)
+    pcm_cpu, pcm_packets = cpu_time(lambda c: bytes(gain.process(c, 75, 2)), chunks)
+
+    encoder = AdpcmEncoder(channels)
+    enc_cpu, adpcm_packets = cpu_time(lambda c: bytes(encoder.encode(gain.process(c, 75, 2))), chunks)
+
+    decoder = load_server_decoder()(2048)
+    dec_cpu, decoded = cpu_time(lambda p: bytes(decoder.decode(p, channels)), adpcm_packets)
+
+    overhead = AUDIO_HEADER_SIZE + IPV4_UDP_HEADER_BYTES
+    for label, packets, cpu in (("PCM", pcm_packets, pcm_cpu), ("ADPCM", adpcm_packets, enc_cpu)):
+        wire = sum(len(p) + overhead for p in packets) / audio_seconds
+        print(f"{label:6s}: {wire / 1000:7.1f} kB/s pe fir | CPU client {cpu / audio_seconds * 1000:6.1f} ms/s audio")
+    print(f"Decodor Pico (fallback CPython): {dec_cpu / audio_seconds * 1000:6.1f} ms/s audio, "
+          f"{len(pcm) // 2 / dec_cpu / 1e6:.2f} M eșantioane/s")
+
+    reference = np.frombuffer(b"".join(pcm_packets), dtype='<i2').astype(np.float64)
+    restored = np.frombuffer(b"".join(decoded), dtype='<i2').astype(np.float64)
+    n = min(len(reference), len(restored))
+    noise = np.sum((reference[:n] - restored[:n]) ** 2)
+    snr = 10 * np.log10(np.sum(reference[:n] ** 2) / noise) if noise else float('inf')
+    print(f"SNR ADPCM față de PCM: {snr:.1f} dB")
+
+
+if __name__ == "__main__":
+    main()
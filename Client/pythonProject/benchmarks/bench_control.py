@@ -0,0 +1,109 @@
+import importlib.util
+import os
+import random
+import socket
+import sys
+import threading
+import time
+
+CLIENT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+REPO_DIR = os.path.dirname(os.path.dirname(CLIENT_DIR))
+sys.path.insert(0, CLIENT_DIR)
+
+from control_channel import (OP_ACK, ControlChannel, config_payload, config_text,  # noqa: E402
+                             pack_control_frame, parse_control_frame)
+
+
+def load_pico_protocol():
+    # Secvențiatorul din firmware, rulat aici pe CPython.
+    spec = importlib.util.spec_from_file_location("pico_control", os.path.join(REPO_DIR, "Server", "control_protocol.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def per_call_us(fn, calls=100000):
+    start = time.perf_counter()
+    for _ in range(calls):
+        fn()
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+class LossyPico:
+    """Răspunde ca Pico (ACK cumulativ), pierzând aleator cadre în ambele sensuri."""
+
+    def __init__(self, loss, seed=1):
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.bind(("127.0.0.1", 0))
+        self.sock.settimeout(0.1)
+        self.addr = self.sock.getsockname()
+        self.sequencer = load_pico_protocol().ControlSequencer()
+        self.loss = loss
+        self.rng = random.Random(seed)
+        self.applied = []
+        self.running = True
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def run(self):
+        while self.running:
+            try:
+                data, addr = self.sock.recvfrom(64)
+            except socket.timeout:
+                continue
+            if self.rng.random() < self.loss:
+                continue
+            if self.sequencer.accept(data):
+                self.applied.append((data[1], bytes(data[5:])))
+            if self.rng.random() >= self.loss:
+                self.sock.sendto(bytes(self.sequencer.ack), addr)
+
+    def stop(self):
+        self.running = False
+        self.thread.join()
+        self.sock.close()
+
+
+def delivery_run(loss, commands, spacing):
+    pico = LossyPico(loss)
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    channel = ControlChannel(sock, pico.addr, "binary", max_retries=10)
+    expected = []
+    for i in range(commands):
+        level = i % 101
+        channel.send_volume(level)
+        expected.append((2, bytes([level])))
+        time.sleep(spacing)
+    deadline = time.monotonic() + 5
+    while channel.pending() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    channel.close()
+    sock.close()
+    pico.stop()
+    rtts = sorted(channel.rtt_samples)
+    in_order = pico.applied == expected
+    return channel.stats(), in_order, rtts
+
+
+def main():
+    frame = pack_control_frame(2, 7, 123, bytes([75]))
+    ack = pack_control_frame(OP_ACK, 7, 123)
+    print("Cost client (µs/mesaj):")
+    print(f"  VOL text encode    : {per_call_us(lambda: f'VOL:{75}'.encode()):.2f}")
+    print(f"  VOL binar pack     : {per_call_us(lambda: pack_control_frame(2, 7, 123, bytes([75]))):.2f}")
+    print(f"  CONFIG text encode : {per_call_us(lambda: config_text(44100, 16, 2, True, False).encode()):.2f}")
+    print(f"  CONFIG binar pack  : {per_call_us(lambda: pack_control_frame(1, 7, 5, config_payload(44100, 16, 2, True))):.2f}")
+    print(f"  ACK parse          : {per_call_us(lambda: parse_control_frame(ack)):.2f}")
+    assert parse_control_frame(frame)[3] == bytes([75])
+
+    # Comenzi la 50 ms: mai des decât permite cooldown-ul gesturilor din main.py
+    for loss in (0.0, 0.1, 0.3):
+        stats, in_order, rtts = delivery_run(loss, 100, 0.05)
+        p95 = rtts[int(len(rtts) * 0.95)] * 1000 if rtts else 0.0
+        print(f"Pierdere {loss:.0%}: {stats}, aplicate în ordine: {in_order}, confirmare p95 {p95:.1f} ms")
+        # Pentru comparație: CONFIG text trimis de 3 ori, fără ACK, se pierde cu probabilitatea loss^3
+        print(f"  (CONFIG text 3x fără ACK: pierdut cu probabilitatea {loss ** 3:.3%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,295 @@
+import importlib.util
+import os
+import random
+import selectors
+import socket
+import statistics
+import struct
+import sys
+import tempfile
+import threading
+import time
+import wave
+
+import numpy as np
+
+CLIENT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+REPO_DIR = os.path.dirname(os.path.dirname(CLIENT_DIR))
+sys.path.insert(0, CLIENT_DIR)
+
+from control_channel import OP_START, OP_SYNC, START_PAYLOAD_FORMAT, TICKS_PERIOD, ControlChannel  # noqa: E402
+from fanout import ControlGroup, FanoutPacketizer, local_us  # noqa: E402
+from gain import GainStage  # noqa: E402
+from pacing import make_pacer  # noqa: E402
+from packetizer import AUDIO_HEADER_SIZE, AudioFramer, Packetizer, choose_chunk_frames  # noqa: E402
+from track_source import WavTrackSource  # noqa: E402
+
+# Utilizare: python bench_fanout.py [secunde pe test]
+# N receptori emulați pe localhost (un singur thread cu selectors, ca să nu concureze cu
+# emițătorul mai mult decât e nevoie) primesc același stream 44.1 kHz stereo. Se compară:
+#   fan-out   un streamer: citire + gain o singură dată, apoi un sendto pe receptor (fanout.py)
+#   separat   câte un streamer complet pe receptor, ca main.py pornit de N ori
+# CPU = timpul thread-urilor emițătoare, ca procent dintr-un nucleu. Jitter = estimatorul din
+# RFC 3550 (sosire față de poziția în stream), pe receptor. Decalaj = cât diferă momentul sosirii
+# aceluiași pachet între receptori. La sfârșit, START sincron prin ControlGroup pe receptori cu
+# ceasuri decalate aleator: cât diferă momentul de pornire ajuns la fiecare.
+RECEIVER_COUNTS = (1, 2, 4, 8, 16)
+RATE = 44100
+CHANNELS = 2
+VOLUME = 70  # gain pe client, ca să conteze și scalarea în costul dublat
+MULTICAST_GROUP = "239.255.0.57"
+
+
+def load_pico_protocol():
+    spec = importlib.util.spec_from_file_location("pico_control", os.path.join(REPO_DIR, "Server", "control_protocol.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def write_test_wav(path, seconds):
+    samples = np.random.default_rng(3).integers(-12000, 12000, size=RATE * seconds * CHANNELS, dtype=np.int16)
+    with wave.open(path, "wb") as f:
+        f.setnchannels(CHANNELS)
+        f.setsampwidth(2)
+        f.setframerate(RATE)
+        f.writeframes(samples.tobytes())
+
+
+class Receiver:
+    """Un Pico emulat: socket audio + socket control, cu ceasul ticks_us decalat cu clock_offset."""
+
+    def __init__(self, protocol, audio_sock=None):
+        if audio_sock is None:
+            audio_sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            audio_sock.bind(("127.0.0.1", 0))
+        self.audio = audio_sock
+        self.control = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.control.bind(("127.0.0.1", 0))
+        self.sequencer = protocol.ControlSequencer()
+        self.clock_offset = random.randrange(TICKS_PERIOD)
+        self.arrivals = []  # (momentul sosirii, seq, sample_pos)
+        self.start_local_us = None
+
+    def ticks_us(self):
+        return (local_us() + self.clock_offset) % TICKS_PERIOD
+
+    def on_audio(self):
+        data = self.audio.recv(2048)
+        seq, _flags, pos = struct.unpack_from("<HHI", data, 0)
+        self.arrivals.append((time.perf_counter(), seq, pos))
+
+    def on_control(self):
+        data, addr = self.control.recvfrom(128)
+        if self.sequencer.accept(data):
+            if data[1] == OP_SYNC:
+                self.control.sendto(f"SYNC:{self.ticks_us()}".encode(), addr)
+            elif data[1] == OP_START:
+                deadline, _pos = struct.unpack_from(START_PAYLOAD_FORMAT, data, 5)
+                # Înapoi pe ceasul local, ca pornirile receptorilor să se poată compara
+                ahead = (deadline - self.ticks_us() + TICKS_PERIOD // 2) % TICKS_PERIOD - TICKS_PERIOD // 2
+                self.start_local_us = local_us() + ahead
+        self.control.sendto(bytes(self.sequencer.ack), addr)
+
+    def jitter_ms(self):
+        # RFC 3550: J += (|D| - J) / 16, D = diferența timpilor de tranzit a două pachete succesive
+        jitter = 0.0
+        previous = None
+        for arrived, _seq, pos in self.arrivals:
+            transit = arrived - pos / RATE
+            if previous is not None:
+                jitter += (abs(transit - previous) - jitter) / 16
+            previous = transit
+        return jitter * 1000
+
+    def close(self):
+        self.audio.close()
+        self.control.close()
+
+
+class ReceiverGroup:
+    def __init__(self, count, multicast=False):
+        protocol = load_pico_protocol()
+        self.multicast_port = None
+        sockets = [None] * count
+        if multicast:
+            sockets = [self._multicast_socket() for _ in range(count)]
+        self.receivers = [Receiver(protocol, sock) for sock in sockets]
+        self.selector = selectors.DefaultSelector()
+        for r in self.receivers:
+            self.selector.register(r.audio, selectors.EVENT_READ, r.on_audio)
+            self.selector.register(r.control, selectors.EVENT_READ, r.on_control)
+        self.running = True
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def _multicast_socket(self):
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        if hasattr(socket, "SO_REUSEPORT"):
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        sock.bind(("", self.multicast_port or 0))
+        self.multicast_port = sock.getsockname()[1]
+        mreq = socket.inet_aton(MULTICAST_GROUP) + socket.inet_aton("127.0.0.1")
+        sock.setsockopt(socket.IPPROTO_IP, socket.IP_ADD_MEMBERSHIP, mreq)
+        return sock
+
+    def audio_addrs(self):
+        if self.multicast_port:
+            return [(MULTICAST_GROUP, self.multicast_port)]
+        return [r.audio.getsockname() for r in self.receivers]
+
+    def run(self):
+        while self.running:
+            for key, _events in self.selector.select(0.05):
+                try:
+                    key.data()
+                except OSError:
+                    pass
+
+    def clear(self):
+        for r in self.receivers:
+            r.arrivals = []
+
+    def close(self):
+        self.running = False
+        self.thread.join()
+        self.selector.close()
+        for r in self.receivers:
+            r.close()
+
+
+def stream(path, sock, addrs, seconds, cpu_out):
+    """Streamer-ul din main.py, redus: pacing, citire, gain, header, trimitere."""
+    source = WavTrackSource(path)
+    frame_size = CHANNELS * 2
+    frames = choose_chunk_frames(frame_size, RATE, header_bytes=AUDIO_HEADER_SIZE)
+    pacer = make_pacer("deadline", frames * 1_000_000_000 // RATE)
+    gain_stage = GainStage(frames * CHANNELS)
+    framer = AudioFramer()
+    packetizer = FanoutPacketizer(sock, addrs) if len(addrs) > 1 else Packetizer(sock, addrs[0])
+    cpu_start = time.thread_time()
+    until = time.monotonic() + seconds
+    pacer.start()
+    while time.monotonic() < until:
+        pacer.wait()
+        data = source.read_chunk(frames)
+        if not data:
+            source.seek_frame(0)
+            continue
+        payload = gain_stage.process(data, VOLUME, 2)
+        packetizer.send(payload, framer.next_header(len(data) // frame_size))
+    cpu_out.append(time.thread_time() - cpu_start)
+    source.close()
+
+
+def run_mode(path, group, mode, seconds):
+    group.clear()
+    cpu = []
+    socks = []
+    if mode == "separat":
+        threads = []
+        for addr in group.audio_addrs():
+            sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            socks.append(sock)
+            threads.append(threading.Thread(target=stream, args=(path, sock, [addr], seconds, cpu)))
+    else:
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        if mode == "multicast":
+            sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_IF, socket.inet_aton("127.0.0.1"))
+            sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_TTL, 1)
+        socks.append(sock)
+        threads = [threading.Thread(target=stream, args=(path, sock, group.audio_addrs(), seconds, cpu))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    time.sleep(0.1)
+    for sock in socks:
+        sock.close()
+    return summarize(group, sum(cpu) / seconds * 100)
+
+
+def summarize(group, cpu_percent):
+    jitters = [r.jitter_ms() for r in group.receivers]
+    received = [len(r.arrivals) for r in group.receivers]
+    by_key = {}
+    for r in group.receivers:
+        for arrived, seq, pos in r.arrivals:
+            by_key.setdefault(pos, []).append(arrived)
+    spreads = sorted((max(times) - min(times)) * 1000 for times in by_key.values() if len(times) == len(group.receivers))
+    pick = (lambda q: spreads[min(len(spreads) - 1, int(len(spreads) * q))]) if spreads else (lambda q: float("nan"))
+    return {"cpu": cpu_percent, "packets": min(received), "jitter_avg": statistics.mean(jitters),
+            "jitter_max": max(jitters), "skew_p50": pick(0.5), "skew_p99": pick(0.99)}
+
+
+def sync_start_spread(group, trials=5):
+    """Trimite START prin ControlGroup; întoarce (cât diferă pornirile între receptori, RTT-ul SYNC maxim) în µs."""
+    channels = [ControlChannel(socket.socket(socket.AF_INET, socket.SOCK_DGRAM), r.control.getsockname())
+                for r in group.receivers]
+    control = ControlGroup(channels)
+    spreads = []
+    for _ in range(trials):
+        for r in group.receivers:
+            r.start_local_us = None
+        control.send_start(0, delay_ms=150)
+        starts = [r.start_local_us for r in group.receivers if r.start_local_us is not None]
+        if len(starts) == len(group.receivers):
+            spreads.append(max(starts) - min(starts))
+        control.sync_clocks(force=True)
+    rtt = max(clock.rtt_us for clock in control.clocks)
+    control.close()
+    for ch in channels:
+        ch.sock.close()
+    return (max(spreads) if spreads else float("nan")), rtt
+
+
+def multicast_available():
+    try:
+        group = ReceiverGroup(1, multicast=True)
+    except OSError:
+        return False
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    try:
+        sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_IF, socket.inet_aton("127.0.0.1"))
+        sock.sendto(struct.pack("<HHI", 0, 0, 0), group.audio_addrs()[0])
+        time.sleep(0.1)
+        return bool(group.receivers[0].arrivals)
+    except OSError:
+        return False
+    finally:
+        sock.close()
+        group.close()
+
+
+def main():
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 3.0
+    frames = choose_chunk_frames(CHANNELS * 2, RATE, header_bytes=AUDIO_HEADER_SIZE)
+    print(f"{RATE} Hz stereo, {frames} frame-uri/pachet ({RATE / frames:.0f} pachete/s), {seconds:.0f} s pe test")
+    modes = ["fan-out", "separat"]
+    if multicast_available():
+        modes.append("multicast")
+    else:
+        print("Multicast pe loopback indisponibil aici, se sare peste.")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "test.wav")
+        write_test_wav(path, 10)
+        print(f"{'N':>3s} {'mod':10s} {'CPU':>7s} {'pachete':>8s} {'jitter med':>11s} {'max':>7s} "
+              f"{'decalaj p50':>12s} {'p99':>8s}")
+        for count in RECEIVER_COUNTS:
+            for mode in modes:
+                group = ReceiverGroup(count, multicast=mode == "multicast")
+                r = run_mode(path, group, mode, seconds)
+                group.close()
+                print(f"{count:3d} {mode:10s} {r['cpu']:6.1f}% {r['packets']:8d} {r['jitter_avg']:9.3f}ms "
+                      f"{r['jitter_max']:5.3f}ms {r['skew_p50']:10.3f}ms {r['skew_p99']:6.3f}ms")
+    print("\nSTART sincron (ceasuri decalate aleator, 5 încercări):")
+    for count in RECEIVER_COUNTS:
+        group = ReceiverGroup(count)
+        spread, rtt = sync_start_spread(group)
+        group.close()
+        print(f"{count:3d} receptori: pornirile diferă cu cel mult {spread:.0f} µs (RTT SYNC max {rtt} µs)")
+
+
+if __name__ == "__main__":
+    main()
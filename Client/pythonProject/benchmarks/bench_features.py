@@ -0,0 +1,84 @@
+import os
+import random
+import sys
+import timeit
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from hand_features import (INDEX_FINGER_MCP, INDEX_FINGER_PIP, INDEX_FINGER_TIP, MIDDLE_FINGER_MCP,  # noqa: E402
+                           MIDDLE_FINGER_PIP, MIDDLE_FINGER_TIP, PINKY_MCP, PINKY_PIP, PINKY_TIP, RING_FINGER_MCP,
+                           RING_FINGER_PIP, RING_FINGER_TIP, THUMB_TIP, extract_hand_features,
+                           extract_hand_features_batch, get_distance_2d, is_finger_up, is_thumb_extended,
+                           is_thumb_tucked, landmarks_to_array)
+
+IMAGE_W, IMAGE_H = 640, 480
+
+
+class FakeLandmark:
+    __slots__ = ("x", "y", "z")
+
+    def __init__(self, x, y, z):
+        self.x, self.y, self.z = x, y, z
+
+
+def random_hand(rng):
+    return [FakeLandmark(rng.random(), rng.random(), rng.uniform(-0.1, 0.1)) for _ in range(21)]
+
+
+def legacy_frame(landmarks):
+    # Exact ce făcea bucla veche pe cadru: recunoașterea plus recalcularea pentru desen.
+    thumb_tckd = is_thumb_tucked(landmarks, IMAGE_W, IMAGE_H, threshold_px=45)
+    thumb_xtnd = is_thumb_extended(landmarks, IMAGE_W, IMAGE_H, threshold_px=75)
+    index_up = is_finger_up(landmarks, INDEX_FINGER_TIP, INDEX_FINGER_PIP, INDEX_FINGER_MCP)
+    middle_up = is_finger_up(landmarks, MIDDLE_FINGER_TIP, MIDDLE_FINGER_PIP, MIDDLE_FINGER_MCP)
+    ring_up = is_finger_up(landmarks, RING_FINGER_TIP, RING_FINGER_PIP, RING_FINGER_MCP)
+    pinky_up = is_finger_up(landmarks, PINKY_TIP, PINKY_PIP, PINKY_MCP)
+    pinch = get_distance_2d(landmarks[THUMB_TIP], landmarks[INDEX_FINGER_TIP], IMAGE_W, IMAGE_H)
+    is_thumb_extended(landmarks, IMAGE_W, IMAGE_H)
+    for tip, pip, mcp in ((INDEX_FINGER_TIP, INDEX_FINGER_PIP, INDEX_FINGER_MCP),
+                          (MIDDLE_FINGER_TIP, MIDDLE_FINGER_PIP, MIDDLE_FINGER_MCP),
+                          (RING_FINGER_TIP, RING_FINGER_PIP, RING_FINGER_MCP),
+                          (PINKY_TIP, PINKY_PIP, PINKY_MCP)):
+        is_finger_up(landmarks, tip, pip, mcp)
+    return thumb_tckd, thumb_xtnd, index_up, middle_up, ring_up, pinky_up, pinch
+
+
+def vectorized_frame(landmarks):
+    f = extract_hand_features(landmarks, IMAGE_W, IMAGE_H)
+    return f.thumb_tucked, f.thumb_extended, f.index_up, f.middle_up, f.ring_up, f.pinky_up, f.pinch_px
+
+
+def main():
+    rng = random.Random(1234)
+    hands = [random_hand(rng) for _ in range(2000)]
+
+    mismatches = sum(1 for h in hands if legacy_frame(h) != vectorized_frame(h))
+    print(f"Verificare echivalență: {len(hands)} mâini, {mismatches} diferențe")
+
+    # main.py și vision_pool.py dau extract_hand_features un ndarray (landmarks_to_array, pentru replay)
+    batch = np.stack([landmarks_to_array(h) for h in hands])
+    array_mismatches = sum(1 for h, points in zip(hands, batch) if legacy_frame(h) != vectorized_frame(points))
+    print(f"Verificare echivalență pe ndarray: {array_mismatches} diferențe")
+
+    for name, fn, inputs in (("legacy (per landmark)", legacy_frame, hands),
+                             ("un cadru (landmark-uri)", vectorized_frame, hands),
+                             ("un cadru (ndarray)", vectorized_frame, list(batch))):
+        total = min(timeit.repeat(lambda: [fn(h) for h in inputs], number=5, repeat=3))
+        per_frame_us = total / (5 * len(hands)) * 1e6
+        print(f"{name:24s}: {per_frame_us:7.2f} us/cadru")
+
+    batch_features = extract_hand_features_batch(batch, IMAGE_W, IMAGE_H)
+    batch_rows = zip(batch_features.thumb_tucked.tolist(), batch_features.thumb_extended.tolist(),
+                     batch_features.index_up.tolist(), batch_features.middle_up.tolist(),
+                     batch_features.ring_up.tolist(), batch_features.pinky_up.tolist(),
+                     batch_features.pinch_px.tolist())
+    batch_mismatches = sum(1 for row, h in zip(batch_rows, hands) if row != legacy_frame(h))
+    total = min(timeit.repeat(lambda: extract_hand_features_batch(batch, IMAGE_W, IMAGE_H), number=5, repeat=3))
+    print(f"{'vectorizat pe lot':24s}: {total / (5 * len(hands)) * 1e6:7.2f} us/cadru "
+          f"(lot de {len(hands)}, {batch_mismatches} diferențe)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from gain import GainStage, scale_volume  # noqa: E402
+
+CHUNK_FRAMES = 256
+CHANNELS = 2
+NUM_CHUNKS = 20000
+VOLUME = 75
+
+
+def run(label, process_chunk, chunks):
+    start = time.perf_counter()
+    for chunk in chunks:
+        process_chunk(chunk)
+    elapsed = time.perf_counter() - start
+
+    # Vârful de memorie alocată temporar în timpul unui chunk, mediat pe 1000 de chunk-uri.
+    tracemalloc.start()
+    transient_bytes = 0
+    for chunk in chunks[:1000]:
+        baseline, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        process_chunk(chunk)
+        _, peak = tracemalloc.get_traced_memory()
+        transient_bytes += peak - baseline
+    tracemalloc.stop()
+    print(f"{label:28s}: {len(chunks) / elapsed:10.0f} chunk-uri/s | "
+          f"alocat temporar: {transient_bytes / 1000:8.0f} B/chunk")
+
+
+def main():
+    rng = np.random.default_rng(0)
+    chunks = [rng.integers(-32768, 32768, CHUNK_FRAMES * CHANNELS, dtype=np.int16).tobytes()
+              for _ in range(64)] * (NUM_CHUNKS // 64)
+
+    legacy_out = np.frombuffer(scale_volume(chunks[0], VOLUME, 2), dtype=np.int16).astype(np.int32)
+    gain_stage = GainStage(CHUNK_FRAMES * CHANNELS)
+    q15_out = np.frombuffer(gain_stage.process(chunks[0], VOLUME, 2), dtype=np.int16).astype(np.int32)
+    print(f"Diferență maximă față de scale_volume (16 biți): {np.abs(legacy_out - q15_out).max()} LSB")
+
+    run("scale_volume (float64)", lambda c: scale_volume(c, VOLUME, 2), chunks)
+    run("GainStage Q15 (16 biți)", lambda c: gain_stage.process(c, VOLUME, 2), chunks)
+
+    chunks_24 = [rng.integers(0, 256, CHUNK_FRAMES * CHANNELS * 3, dtype=np.uint8).tobytes()
+                 for _ in range(64)] * (NUM_CHUNKS // 64)
+    run("GainStage Q15 (24 biți)", lambda c: gain_stage.process(c, VOLUME, 3), chunks_24)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_replay import synthetic_session  # noqa: E402
+from gestures import GESTURE_NAMES, GestureRecognizer, pinch_to_volume  # noqa: E402
+from hand_features import map_value  # noqa: E402
+from landmark_replay import CommandLog, load_recording, replay_recording  # noqa: E402
+
+# Utilizare: python bench_gestures.py [sesiune.npz ...]
+# Fără argumente: sesiuni sintetice cu gesturi rapide și cadre citite greșit, cu adevărul știut,
+# pentru latența gest -> comandă, comenzile ratate și cele false. Cu .npz: comenzile celor doi.
+GESTURE_TOLERANCE_SEC = 0.3  # o comandă venită la scurt timp după segment îi aparține încă lui
+VOLUME_TOLERANCE = 5
+
+RAPID_SCRIPT = [(None, 0.5, None), ("PLAY", 0.6, None), ("REST", 0.3, None), ("NEXT", 0.5, None),
+                ("REST", 0.3, None), ("NEXT", 0.5, None), ("REST", 0.3, None), ("NEXT", 0.5, None),
+                ("REST", 0.3, None), ("PREV", 0.5, None), (None, 0.4, None), ("VOL", 1.2, 50),
+                ("VOL", 1.2, 170), ("VOL", 1.2, 100), ("REST", 0.3, None), ("PAUSE", 0.6, None),
+                (None, 0.4, None), ("PLAY", 0.6, None), ("REST", 0.5, None)]
+
+
+class CooldownRecognizer:
+    """Logica veche din main.py: primul cadru cu gestul declanșează, apoi 1.5 s nimic (gest și volum separat)."""
+
+    def __init__(self, sink, volume=75, gesture_cooldown=1.5, volume_cooldown=1.5):
+        self.sink = sink
+        self.volume = volume
+        self.gesture_cooldown = gesture_cooldown
+        self.volume_cooldown = volume_cooldown
+        self.last_gesture_time = float("-inf")
+        self.last_volume_time = float("-inf")
+
+    def update_code(self, code, volume_pose, pinch_px, now, origin=None):
+        if code and now - self.last_gesture_time > self.gesture_cooldown:
+            self.sink(GESTURE_NAMES[code], origin=origin)
+            self.last_gesture_time = now
+        if volume_pose and now - self.last_volume_time > self.volume_cooldown:
+            new_volume = map_value(pinch_px, 20, 220, 0, 100)
+            if abs(new_volume - self.volume) > 2 or new_volume == 0 or new_volume == 100:
+                self.volume = new_volume
+                self.last_volume_time = now
+                self.sink("VOL", new_volume, origin=origin)
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))] if ordered else float("nan")
+
+
+def score(commands, segments, volume_targets):
+    """Latențele gesturilor, ratările, comenzile false și cât durează volumul până aproape de țintă."""
+    gestures = [(at, name) for at, name, _args in commands if name != "VOL"]
+    volumes = [(at, args[0]) for at, name, args in commands if name == "VOL"]
+    latencies, missed, used = [], 0, set()
+    volume_settle, volume_missed = [], 0
+    for pose, start, end in segments:
+        if pose in ("PLAY", "PAUSE", "NEXT", "PREV"):
+            hits = [i for i, (at, name) in enumerate(gestures)
+                    if name == pose and start <= at < end + GESTURE_TOLERANCE_SEC and i not in used]
+            if hits:
+                used.add(hits[0])
+                latencies.append(gestures[hits[0]][0] - start)
+            else:
+                missed += 1
+        elif pose == "VOL":
+            target = volume_targets[start]
+            settled = [at for at, level in volumes if start <= at < end and abs(level - target) <= VOLUME_TOLERANCE]
+            if settled:
+                volume_settle.append(settled[0] - start)
+            else:
+                volume_missed += 1
+    false = len(gestures) - len(used)
+    return {"latencies": latencies, "missed": missed, "false": false, "vol_sends": len(volumes),
+            "vol_settle": volume_settle, "vol_missed": volume_missed}
+
+
+def run_synthetic(glitch, seed, repeats=10):
+    script = RAPID_SCRIPT * repeats
+    recorder, segments = synthetic_session(script, glitch=glitch, seed=seed)
+    volume_targets = {start: pinch_to_volume(param)
+                      for (pose, _seconds, param), (_pose, start, _end) in zip(script, segments) if pose == "VOL"}
+    recording = recorder.recording()
+    rows = []
+    for name, recognizer in (("cooldown 1.5 s (vechi)", CooldownRecognizer(CommandLog())),
+                             ("debouncer 4 din 6", GestureRecognizer(CommandLog()))):
+        result = replay_recording(recording, recognizer)
+        rows.append((name, score(result.commands, segments, volume_targets)))
+    return recorder.frames, sum(1 for s in segments if s[0] in ("PLAY", "PAUSE", "NEXT", "PREV")), rows
+
+
+def main():
+    paths = sys.argv[1:]
+    for path in paths:
+        recording = load_recording(path)
+        for name, recognizer in (("cooldown", CooldownRecognizer(CommandLog())),
+                                 ("debouncer", GestureRecognizer(CommandLog()))):
+            result = replay_recording(recording, recognizer)
+            print(f"{os.path.basename(path)} {name}: " + ", ".join(
+                f"{at:.2f}s {command}{''.join(f' {a}' for a in args)}" for at, command, args in result.commands))
+    if paths:
+        return
+
+    for glitch in (0.0, 0.03, 0.08):
+        frames, gesture_count, rows = run_synthetic(glitch, seed=7)
+        print(f"\nSesiune sintetică: {frames} cadre, {gesture_count} gesturi, {glitch:.0%} cadre citite greșit")
+        print(f"{'':24s} {'lat p50':>8s} {'p95':>7s} {'ratate':>7s} {'false':>6s} {'VOL trimise':>12s} "
+              f"{'VOL la țintă p50':>17s} {'VOL ratat':>10s}")
+        for name, r in rows:
+            print(f"{name:24s} {percentile(r['latencies'], 0.5) * 1000:6.0f}ms "
+                  f"{percentile(r['latencies'], 0.95) * 1000:5.0f}ms {r['missed']:7d} {r['false']:6d} "
+                  f"{r['vol_sends']:12d} {percentile(r['vol_settle'], 0.5) * 1000:15.0f}ms {r['vol_missed']:10d}")
+
+
+if __name__ == "__main__":
+    main()
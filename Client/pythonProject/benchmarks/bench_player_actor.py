@@ -0,0 +1,74 @@
+import os
+import socket
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from control_channel import ControlChannel  # noqa: E402
+from player_actor import PlayerActor  # noqa: E402
+from vision_pipeline import FrameTimeStats  # noqa: E402
+
+FPS = 30
+FRAME_WORK_SEC = 0.008  # cât durează inferența + desenarea unui cadru
+FRAMES = 300
+TRACK_CHANGE_EVERY = 45  # un NEXT la 1,5 s, cât cooldown-ul gesturilor
+
+
+class FakePlayer:
+    """Reproduce munca unui NEXT din manage_audio_thread: oprirea streamer-ului + CONFIG text 3x."""
+
+    def __init__(self):
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.control = ControlChannel(self.sock, ("127.0.0.1", 9), "text")
+        self.stop_event = threading.Event()
+        self.streamer = None
+        self.start_streamer()
+
+    def start_streamer(self):
+        self.stop_event.clear()
+        self.streamer = threading.Thread(target=self.stream, daemon=True)
+        self.streamer.start()
+
+    def stream(self):
+        while not self.stop_event.is_set():
+            time.sleep(0.02)  # un pachet audio
+
+    def handle(self, command, *args):
+        self.stop_event.set()
+        self.streamer.join(timeout=0.5)
+        self.control.send_config(44100, 16, 2, True, False)
+        self.start_streamer()
+
+    def close(self):
+        self.stop_event.set()
+        self.streamer.join()
+        self.sock.close()
+
+
+def run(label, dispatch):
+    frame_times = FrameTimeStats(window=FRAMES)
+    next_frame = time.monotonic()
+    for frame in range(FRAMES):
+        time.sleep(FRAME_WORK_SEC)
+        if frame % TRACK_CHANGE_EVERY == TRACK_CHANGE_EVERY - 1:
+            dispatch("NEXT")
+        frame_times.tick()
+        next_frame += 1.0 / FPS
+        time.sleep(max(0.0, next_frame - time.monotonic()))
+    print(f"{label:12s}: {frame_times.format()}")
+
+
+def main():
+    player = FakePlayer()
+    run("sincron", player.handle)
+    actor = PlayerActor(player.handle)
+    run("PlayerActor", actor.post)
+    actor.close()
+    print(f"PlayerActor: {actor.stats()}")
+    player.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,309 @@
+import importlib.util
+import os
+import socket
+import sys
+import threading
+import time
+
+import numpy as np
+
+CLIENT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+REPO_DIR = os.path.dirname(os.path.dirname(CLIENT_DIR))
+sys.path.insert(0, CLIENT_DIR)
+
+from control_channel import ControlChannel  # noqa: E402
+from pacing import make_pacer  # noqa: E402
+from packetizer import AudioFramer, Packetizer  # noqa: E402
+from playlist import PlaylistStream, PreparedTrack, TrackPrefetcher, TransitionStats  # noqa: E402
+from track_source import TrackLibrary, WavTrackSource  # noqa: E402
+
+CHUNK_FRAMES = 360
+SWITCHES = 12
+PLAY_BETWEEN_SEC = 0.3
+TAIL_FRAMES = 4000  # cât rămâne din melodie când testăm trecerea automată
+PICO_JITTER_TARGET_DEPTH = 4  # ca JITTER_TARGET_DEPTH din Server/main.py
+
+
+def load_pico_protocol():
+    spec = importlib.util.spec_from_file_location("pico_control", os.path.join(REPO_DIR, "Server", "control_protocol.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class FakePico:
+    """Primește audio și control pe localhost; la control răspunde cu ACK cumulativ, ca firmware-ul.
+
+    Notează momentul fiecărui pachet audio și al fiecărui CONFIG, pentru modelul de redare de mai jos.
+    """
+
+    def __init__(self):
+        self.audio = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.audio.bind(("127.0.0.1", 0))
+        self.control = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.control.bind(("127.0.0.1", 0))
+        self.control.settimeout(0.1)
+        self.audio.settimeout(0.1)
+        self.sequencer = load_pico_protocol().ControlSequencer()
+        self.events = []
+        self.running = True
+        self.threads = [threading.Thread(target=self.run_control, daemon=True),
+                        threading.Thread(target=self.run_audio, daemon=True)]
+        for thread in self.threads:
+            thread.start()
+
+    def run_control(self):
+        while self.running:
+            try:
+                data, addr = self.control.recvfrom(64)
+            except socket.timeout:
+                continue
+            if self.sequencer.accept(data) and data[1] == 1:
+                self.events.append(("config", time.monotonic()))
+            self.control.sendto(bytes(self.sequencer.ack), addr)
+
+    def run_audio(self):
+        while self.running:
+            try:
+                self.audio.recvfrom(2048)
+            except socket.timeout:
+                continue
+            self.events.append(("audio", time.monotonic()))
+
+    def stop(self):
+        self.running = False
+        for thread in self.threads:
+            thread.join()
+        self.audio.close()
+        self.control.close()
+
+
+def playout(events, chunk_sec, depth=PICO_JITTER_TARGET_DEPTH):
+    """Model al redării pe Pico: jitter buffer-ul pornește după `depth` pachete, iar CONFIG îl golește.
+
+    Întoarce, pentru fiecare pachet audio, momentul în care începe să se audă (None dacă a fost
+    aruncat) și tăcerea dinaintea lui.
+    """
+    starts = []
+    silence = []
+    prefill = []
+    queue_end = None  # până când se aude ce e deja în buffer
+    heard_until = None
+    for kind, t in sorted(events, key=lambda event: event[1]):
+        if kind == "config":
+            if queue_end is not None:
+                heard_until = min(queue_end, t)
+                for i, start in enumerate(starts):
+                    if start is not None and start >= t:
+                        starts[i] = None
+            queue_end = None
+            prefill = []
+            continue
+        starts.append(None)
+        silence.append(0.0)
+        if queue_end is None:
+            prefill.append(len(starts) - 1)
+            if len(prefill) < depth:
+                continue
+            queue_end = t
+            for i in prefill:
+                starts[i] = queue_end
+                queue_end += chunk_sec
+            silence[prefill[0]] = t - heard_until if heard_until is not None else 0.0
+            prefill = []
+        else:
+            start = max(t, queue_end)
+            silence[-1] = start - queue_end
+            starts[-1] = start
+            queue_end = start + chunk_sec
+        heard_until = queue_end
+    return starts, silence
+
+
+class BenchPlayer:
+    """Versiune redusă a player-ului din main.py: streamer cu pacing + NEXT pe una din cele două căi."""
+
+    def __init__(self, paths, pico, gapless):
+        self.paths = paths
+        self.gapless = gapless
+        self.sock_audio = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.control = ControlChannel(socket.socket(socket.AF_INET, socket.SOCK_DGRAM), pico.control.getsockname())
+        self.audio_addr = pico.audio.getsockname()
+        self.library = TrackLibrary()
+        self.prefetcher = TrackPrefetcher(self.prepare)
+        self.stats = TransitionStats()
+        self.index = 0
+        self.stream = None
+        self.thread = None
+        self.stop_event = threading.Event()
+        self.pending = None
+        self.transitions = []  # (tip, momentul cererii, numărul pachetului)
+        self.packets = 0
+        self.lock = threading.Lock()
+
+    def prepare(self, index):
+        source = WavTrackSource(self.paths[index])
+        return PreparedTrack(index, source, source.params())
+
+    def next_track(self, index):
+        return self.prefetcher.take_or_prepare((index + 1) % len(self.paths)) if self.gapless else None
+
+    def open(self, index, start_frame=0):
+        source = self.library.open(self.paths[index])
+        source.seek_frame(start_frame)
+        self.stream = PlaylistStream(PreparedTrack(index, source, source.params(), owns_source=False),
+                                     self.next_track)
+        params = self.stream.out_params
+        self.control.send_config(params["framerate"], params["sampwidth"] * 8, params["channels"], True)
+        self.prefetcher.keep_only({(index + 1) % len(self.paths)})
+        if self.gapless:
+            self.prefetcher.prefetch((index + 1) % len(self.paths))
+
+    def start(self):
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self.streamer, args=(self.stream,), daemon=True)
+        self.thread.start()
+
+    def streamer(self, stream):
+        chunk_ns = CHUNK_FRAMES * 1_000_000_000 // stream.out_params["framerate"]
+        pacer = make_pacer("deadline", chunk_ns, 8)
+        pacer.start()
+        packetizer = Packetizer(self.sock_audio, self.audio_addr)
+        framer = AudioFramer()
+        frame_size = stream.out_params["channels"] * stream.out_params["sampwidth"]
+        while not self.stop_event.is_set():
+            pacer.wait()
+            data = stream.read(CHUNK_FRAMES)
+            if not data:
+                if stream.ended_with is not None and stream.ended_with >= 0:
+                    threading.Thread(target=self.advance, args=(stream.ended_with,), daemon=True).start()
+                elif not self.gapless:
+                    # Calea veche: streamer-ul se oprește, player-ul trece la următoarea cu CONFIG nou.
+                    threading.Thread(target=self.advance, args=((stream.current.index + 1) % len(self.paths),),
+                                     daemon=True).start()
+                break
+            transition = stream.last_transition
+            with self.lock:
+                if transition is None and self.pending is not None:
+                    transition, self.pending = self.pending, None
+            if transition is not None:
+                self.transitions.append((transition[0], transition[2], self.packets))
+            packetizer.send(bytes(data), framer.next_header(len(data) // frame_size))
+            self.packets += 1
+
+    def advance(self, index):
+        self.thread.join()
+        with self.lock:
+            self.pending = ("restart-auto", index, None)
+        self.index = index
+        self.open(index)
+        self.start()
+
+    def next(self):
+        requested_at = time.monotonic()
+        self.index = (self.index + 1) % len(self.paths)
+        if self.gapless:
+            self.stream.switch_to(self.prefetcher.take_or_prepare(self.index), requested_at)
+            self.prefetcher.prefetch((self.index + 1) % len(self.paths))
+            return
+        self.stop_event.set()
+        self.thread.join(timeout=0.5)
+        with self.lock:
+            self.pending = ("restart", self.index, requested_at)
+        self.open(self.index)
+        self.start()
+
+    def close(self):
+        self.stop_event.set()
+        if self.thread:
+            self.thread.join(timeout=1.0)
+        self.control.close()
+        self.library.close_all()
+
+    def measure(self, pico):
+        # Pe localhost pachetele sosesc în ordinea trimiterii, deci al k-lea sosit e al k-lea trimis.
+        starts, silence = playout(pico.events, CHUNK_FRAMES / self.stream.out_params["framerate"])
+        for kind, requested_at, packet in self.transitions:
+            if packet >= len(starts) or starts[packet] is None:
+                continue
+            to_audio = (starts[packet] - requested_at) * 1000 if requested_at else 0.0
+            self.stats.record(kind, to_audio, silence[packet] * 1000)
+        return self.stats.summary()
+
+
+def run_switches(paths, gapless):
+    pico = FakePico()
+    player = BenchPlayer(paths, pico, gapless)
+    player.open(0)
+    player.start()
+    for _ in range(SWITCHES):
+        time.sleep(PLAY_BETWEEN_SEC)
+        player.next()
+    time.sleep(PLAY_BETWEEN_SEC)
+    player.close()
+    pico.stop()
+    return player.measure(pico), player.prefetcher.stats()
+
+
+def run_auto_advance(paths, gapless):
+    # Fiecare melodie pornește cu TAIL_FRAMES înainte de sfârșit; se măsoară golul la trecerea automată.
+    pico = FakePico()
+    player = BenchPlayer(paths, pico, gapless)
+    source = WavTrackSource(paths[0])
+    player.open(0, source.nframes - TAIL_FRAMES)
+    source.close()
+    player.start()
+    time.sleep(TAIL_FRAMES / player.stream.out_params["framerate"] + 0.6)
+    player.close()
+    pico.stop()
+    return player.measure(pico)
+
+
+def splice_check(paths):
+    """Ieșirea PlaylistStream trebuie să fie exact coada lui A urmată de B, fără eșantioane pierdute."""
+    a = WavTrackSource(paths[0])
+    b = WavTrackSource(paths[1])
+    a.seek_frame(a.nframes - TAIL_FRAMES)
+    expected = bytes(a.read_chunk(TAIL_FRAMES)) + bytes(b.read_chunk(3 * TAIL_FRAMES))
+    a.seek_frame(a.nframes - TAIL_FRAMES)
+    b.seek_frame(0)
+    tracks = {1: PreparedTrack(1, b, b.params())}
+    stream = PlaylistStream(PreparedTrack(0, a, a.params()), lambda i: tracks.pop(i + 1, None))
+    out = b"".join(bytes(stream.read(CHUNK_FRAMES)) for _ in range(len(expected) // (2 * CHUNK_FRAMES)))
+    exact = out == expected[:len(out)]
+
+    a = WavTrackSource(paths[0])
+    b = WavTrackSource(paths[1])
+    a.seek_frame(a.nframes - TAIL_FRAMES)
+    fade_ms = 100
+    tracks = {1: PreparedTrack(1, b, b.params())}
+    stream = PlaylistStream(PreparedTrack(0, a, a.params()), lambda i: tracks.pop(i + 1, None), fade_ms)
+    faded = b"".join(bytes(stream.read(CHUNK_FRAMES)) for _ in range(20))
+    fade_frames = a.framerate * fade_ms // 1000
+    # După crossfade, ieșirea e B decalat cu (coada lui A - lungimea fade-ului).
+    offset = (TAIL_FRAMES - fade_frames) * 2
+    b_after_fade = np.frombuffer(expected[TAIL_FRAMES * 2 + fade_frames * 2:], dtype='<i2')
+    tail = np.frombuffer(faded[offset + fade_frames * 2:], dtype='<i2')
+    n = min(len(tail), len(b_after_fade))
+    fade_ok = n > 0 and np.array_equal(tail[:n], b_after_fade[:n])
+    return exact, fade_ok
+
+
+def main():
+    wav_dir = sys.argv[1] if len(sys.argv) > 1 else os.path.join(REPO_DIR, "WAV")
+    paths = sorted(os.path.join(wav_dir, f) for f in os.listdir(wav_dir) if f.lower().endswith(".wav"))
+    print(f"{len(paths)} melodii din {wav_dir}, {CHUNK_FRAMES} frame-uri/pachet, "
+          f"redare modelată cu jitter buffer de {PICO_JITTER_TARGET_DEPTH} pachete")
+
+    exact, fade_ok = splice_check(paths)
+    print(f"Lipire la nivel de eșantion: {'OK' if exact else 'GREȘIT'} | crossfade 100 ms: {'OK' if fade_ok else 'GREȘIT'}")
+
+    for label, gapless in (("repornire (vechi)", False), ("gapless", True)):
+        summary, prefetch = run_switches(paths, gapless)
+        print(f"NEXT {label:18s}: {summary} | prefetch {prefetch}")
+    for label, gapless in (("repornire (vechi)", False), ("gapless", True)):
+        print(f"Sfârșit melodie {label:18s}: {run_auto_advance(paths, gapless)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from gestures import GestureRecognizer  # noqa: E402
+from hand_features import (INDEX_FINGER_MCP, INDEX_FINGER_PIP, INDEX_FINGER_TIP, MIDDLE_FINGER_MCP,  # noqa: E402
+                           MIDDLE_FINGER_PIP, MIDDLE_FINGER_TIP, NUM_LANDMARKS, PINKY_MCP, PINKY_PIP, PINKY_TIP,
+                           RING_FINGER_MCP, RING_FINGER_PIP, RING_FINGER_TIP, THUMB_TIP, WRIST, extract_hand_features,
+                           landmarks_to_array)
+from landmark_replay import CommandLog, LandmarkRecorder, load_recording, replay_recording  # noqa: E402
+
+# Utilizare:
+#   python bench_replay.py                     sesiune sintetică (fără cameră): înregistrare -> .npz -> replay
+#   python bench_replay.py sesiune.npz ...     replay pentru înregistrări făcute cu LANDMARK_RECORD_PATH
+#   python bench_replay.py clip.mp4 ...        hands.process pe fiecare cadru al clipului (cost inferență),
+#                                              landmark-urile se salvează în clip.mp4.npz pentru replay
+IMAGE_W, IMAGE_H = 640, 480
+FPS = 30
+
+FINGERS = ((INDEX_FINGER_MCP, INDEX_FINGER_PIP, INDEX_FINGER_TIP, 0.45),
+           (MIDDLE_FINGER_MCP, MIDDLE_FINGER_PIP, MIDDLE_FINGER_TIP, 0.50),
+           (RING_FINGER_MCP, RING_FINGER_PIP, RING_FINGER_TIP, 0.55),
+           (PINKY_MCP, PINKY_PIP, PINKY_TIP, 0.60))
+
+# Degetele ridicate (index, mijlociu, inelar, mic) și poziția policelui pentru fiecare gest
+POSES = {"PLAY": ((1, 1, 1, 1), "extended"), "PAUSE": ((0, 0, 0, 0), "tucked"),
+         "NEXT": ((1, 1, 0, 0), "tucked"), "PREV": ((1, 0, 0, 1), "tucked"),
+         "VOL": ((1, 0, 0, 0), "pinch"), "REST": ((1, 1, 1, 0), "tucked")}
+
+# (poză, secunde, parametru); None = mâna nu e în cadru; la VOL parametrul e distanța de ciupire (px)
+SESSION_SCRIPT = [(None, 1.0, None), ("PLAY", 1.0, None), ("REST", 0.5, None), ("VOL", 1.5, 60),
+                  ("VOL", 1.5, 180), (None, 0.5, None), ("NEXT", 0.8, None), ("REST", 0.4, None),
+                  ("NEXT", 0.8, None), ("REST", 0.4, None), ("PREV", 0.8, None), (None, 0.5, None),
+                  ("PAUSE", 1.0, None), ("REST", 0.5, None), ("PLAY", 1.0, None), (None, 1.0, None)]
+
+
+def hand_pose(pose, pinch_px=100.0):
+    points = np.zeros((NUM_LANDMARKS, 3))
+    points[:, :2] = (0.5, 0.65)
+    points[WRIST, :2] = (0.52, 0.8)
+    fingers, thumb = POSES[pose]
+    for (mcp, pip, tip, x), up in zip(FINGERS, fingers):
+        points[mcp, :2] = (x, 0.6)
+        points[pip, :2] = (x, 0.5) if up else (x, 0.56)
+        points[tip, :2] = (x, 0.4) if up else (x, 0.64)
+    if thumb == "tucked":
+        points[THUMB_TIP, :2] = (0.47, 0.62)
+    elif thumb == "extended":
+        points[THUMB_TIP, :2] = (0.3, 0.55)
+    else:
+        points[THUMB_TIP, :2] = (points[INDEX_FINGER_TIP, 0] - pinch_px / IMAGE_W, 0.4)
+    return points
+
+
+def synthetic_session(script=SESSION_SCRIPT, fps=FPS, noise=0.002, glitch=0.0, seed=1):
+    """Cadre sintetice după script; întoarce (recorder, segmente (poză, început, sfârșit)).
+
+    noise: zgomot gaussian pe coordonate; glitch: probabilitatea ca un cadru să fie citit greșit
+    (altă poză aleasă la întâmplare), ca erorile izolate ale detectorului.
+    """
+    rng = np.random.default_rng(seed)
+    recorder = LandmarkRecorder(IMAGE_W, IMAGE_H)
+    segments = []
+    t = 0.0
+    names = list(POSES)
+    for pose, seconds, param in script:
+        segments.append((pose, t, t + seconds))
+        for _ in range(int(round(seconds * fps))):
+            frame_pose = pose
+            if pose is not None and glitch and rng.random() < glitch:
+                frame_pose = names[rng.integers(len(names))]
+            if frame_pose is None:
+                recorder.add(t)
+            else:
+                points = hand_pose(frame_pose, param if param is not None else 100.0)
+                points[:, :2] += rng.normal(0.0, noise, (NUM_LANDMARKS, 2))
+                recorder.add(t, points)
+            t += 1.0 / fps
+    return recorder, segments
+
+
+def print_replay(name, result):
+    fps = result.frames / result.elapsed_sec if result.elapsed_sec else float("inf")
+    speedup = result.duration_sec / result.elapsed_sec if result.elapsed_sec else float("inf")
+    print(f"{name}: {result.frames} cadre ({result.hand_frames} cu mână), {result.duration_sec:.1f} s înregistrate, "
+          f"replay în {result.elapsed_sec * 1000:.1f} ms = {fps:,.0f} cadre/s ({speedup:,.0f}x timp real)")
+    for at, command, args in result.commands:
+        print(f"  {at:7.3f} s  {command} {' '.join(str(a) for a in args)}")
+
+
+def replay_frame_by_frame(recording):
+    # Ca bucla live: trăsăturile și decizia pe fiecare cadru, unul câte unul
+    recognizer = GestureRecognizer(CommandLog())
+    for now, has_hand, points in zip(recording.timestamps.tolist(), recording.has_hand, recording.landmarks):
+        if has_hand:
+            features = extract_hand_features(points.astype(np.float64), recording.image_width, recording.image_height)
+            recognizer.update(features, now, origin=now)
+        else:
+            recognizer.update_no_hand(now, origin=now)
+    return recognizer.sink.commands
+
+
+def replay_file(path):
+    recording = load_recording(path)
+    result = replay_recording(recording, GestureRecognizer(CommandLog()))
+    print_replay(os.path.basename(path), result)
+
+
+def replay_synthetic():
+    recorder, segments = synthetic_session()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "sintetic.npz")
+        recorder.save(path)
+        size = os.path.getsize(path)
+        recording = load_recording(path)
+    print(f"Sesiune sintetică: {recorder.frames} cadre la {FPS} FPS, .npz de {size / 1024:.1f} KiB")
+    print("Segmente: " + ", ".join(f"{pose or '-'}@{start:.1f}s" for pose, start, _end in segments))
+    result = replay_recording(recording, GestureRecognizer(CommandLog()))
+    print_replay("replay", result)
+    started = time.perf_counter()
+    live_commands = replay_frame_by_frame(recording)
+    live_sec = time.perf_counter() - started
+    print(f"Cadru cu cadru: {recorder.frames / live_sec:,.0f} cadre/s, "
+          f"comenzi identice cu replay-ul pe loturi: {live_commands == result.commands}")
+
+    # Aceeași sesiune, repetată ca să se vadă throughput-ul pe un volum mai mare de cadre
+    repeats = 50
+    big, _segments = synthetic_session(SESSION_SCRIPT * repeats)
+    result = replay_recording(big.recording(), GestureRecognizer(CommandLog()))
+    print(f"x{repeats}: {result.frames} cadre în {result.elapsed_sec * 1000:.1f} ms = "
+          f"{result.frames / result.elapsed_sec:,.0f} cadre/s, {len(result.commands)} comenzi")
+
+
+def replay_video(path, inference_mode="full"):
+    # Doar aici e nevoie de OpenCV și MediaPipe
+    import cv2
+    import mediapipe as mp
+    from roi_inference import RoiHandTracker
+
+    hands = mp.solutions.hands.Hands(static_image_mode=inference_mode == "roi", max_num_hands=1,
+                                     min_detection_confidence=0.7, min_tracking_confidence=0.7)
+    detector = RoiHandTracker(hands, enabled=inference_mode == "roi")
+    cap = cv2.VideoCapture(path)
+    fps = cap.get(cv2.CAP_PROP_FPS) or FPS
+    recorder = None
+    process_ms = []
+    frame_index = 0
+    while True:
+        success, image = cap.read()
+        if not success:
+            break
+        if recorder is None:
+            recorder = LandmarkRecorder(image.shape[1], image.shape[0])
+        image_rgb = cv2.cvtColor(cv2.flip(image, 1), cv2.COLOR_BGR2RGB)
+        started = time.perf_counter()
+        results = detector.process(image_rgb)
+        process_ms.append((time.perf_counter() - started) * 1000)
+        timestamp = frame_index / fps
+        if results.multi_hand_landmarks:
+            recorder.add(timestamp, landmarks_to_array(results.multi_hand_landmarks[0].landmark))
+        else:
+            recorder.add(timestamp)
+        frame_index += 1
+    cap.release()
+    hands.close()
+    if not process_ms:
+        print(f"{path}: niciun cadru citit")
+        return
+    ordered = sorted(process_ms)
+    print(f"{os.path.basename(path)} ({inference_mode}): {len(ordered)} cadre, hands.process "
+          f"p50={ordered[len(ordered) // 2]:.1f}ms p95={ordered[int(len(ordered) * 0.95)]:.1f}ms "
+          f"max={ordered[-1]:.1f}ms, {len(ordered) / (sum(ordered) / 1000):.1f} cadre/s | {detector.stats()}")
+    recorder.save(path + ".npz")
+    replay_file(path + ".npz")
+
+
+def main():
+    paths = sys.argv[1:]
+    if not paths:
+        replay_synthetic()
+    for path in paths:
+        if path.endswith(".npz"):
+            replay_file(path)
+        else:
+            for mode in ("full", "roi"):
+                replay_video(path, mode)
+
+
+if __name__ == "__main__":
+    main()
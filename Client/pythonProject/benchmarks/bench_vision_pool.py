@@ -0,0 +1,187 @@
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+
+CLIENT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, CLIENT_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_replay import hand_pose  # noqa: E402
+from gestures import GestureRecognizer  # noqa: E402
+from hand_arbiter import HandArbiter  # noqa: E402
+from hand_features import extract_hand_features  # noqa: E402
+from vision_pipeline import LatestFrameSlot, StageRate, run_capture_stage, run_worker_stage, start_stage_thread  # noqa: E402
+from vision_pool import CvCamera, VisionService, mediapipe_detector  # noqa: E402
+
+# Utilizare:
+#   python bench_vision_pool.py [secunde pe test]                camere și detector sintetice
+#   python bench_vision_pool.py --mediapipe clip1.mp4 clip2.mp4  MediaPipe pe clipuri, ca pe camere
+# Pentru 1, 2, 4 camere (640x480, 30 FPS) se compară:
+#   thread-uri  ca run_vision_pipeline, câte o captură + o inferență pe cameră, în același proces
+#   procese     vision_pool.VisionService: captura în procesul principal, cadrele în SharedMemory,
+#               câte un proces worker pe cameră
+# Detectorul sintetic costă DETECTOR_PYTHON_MS de cod Python (ține GIL-ul, ca pre/post-procesarea
+# și conversia landmark-urilor) plus DETECTOR_NUMPY_REPS treceri numpy peste cadru. FPS = cadre
+# trecute prin inferență pe secundă, însumat pe camere; latența = captură -> decizia arbitrului.
+# Pe o mașină cu mai puține nuclee decât camere, procesele nu au cum să câștige.
+CAMERA_COUNTS = (1, 2, 4)
+IMAGE_W, IMAGE_H = 640, 480
+CAMERA_FPS = 30
+DETECTOR_PYTHON_MS = 8.0
+DETECTOR_NUMPY_REPS = 6
+WARMUP_SEC = 2.0
+
+
+class SyntheticCamera:
+    """Cameră cu ritm fix: fiecare cadru are o altă valoare uniformă, ca detectorul să citească ceva."""
+
+    def __init__(self, fps=CAMERA_FPS, shape=(IMAGE_H, IMAGE_W, 3)):
+        self.shape = shape
+        self.interval = 1.0 / fps
+        self.frames = 0
+        self._next = time.monotonic()
+        self.open = True
+
+    def _wait(self):
+        self._next += self.interval
+        delay = self._next - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        else:
+            self._next = time.monotonic()
+        self.frames += 1
+
+    def is_open(self):
+        return self.open
+
+    isOpened = is_open
+
+    def read_into(self, out):
+        self._wait()
+        out.fill(self.frames % 200)
+        return True
+
+    def read(self):
+        self._wait()
+        return True, np.full(self.shape, self.frames % 200, np.uint8)
+
+    def release(self):
+        self.open = False
+
+
+def synthetic_detector(python_ms=DETECTOR_PYTHON_MS, numpy_reps=DETECTOR_NUMPY_REPS):
+    def detect(image):
+        level = 0.0
+        for _ in range(numpy_reps):
+            level = float(image[::2, ::2].astype(np.float32).mean())
+        until = time.perf_counter() + python_ms / 1000
+        while time.perf_counter() < until:
+            pass
+        points = hand_pose("PLAY")
+        points[:, 0] += level / 10000
+        return [points]
+
+    return detect
+
+
+class ResultCollector:
+    """Latența captură -> decizie și numărul de cadre pe cameră, după încălzire; rezultatele trec
+    prin HandArbiter ca în main.py."""
+
+    def __init__(self, cameras):
+        self.lock = threading.Lock()
+        self.measuring = False
+        self.latencies = []
+        self.counts = [0] * cameras
+        self.commands = []
+        self.arbiter = HandArbiter(GestureRecognizer(lambda command, *args, origin=None: self.commands.append(command)))
+
+    def on_result(self, camera_id, hands, captured_at):
+        with self.lock:
+            self.arbiter.update(camera_id, [features for _points, features in hands], time.monotonic(), captured_at)
+            if self.measuring:
+                self.latencies.append(time.monotonic() - captured_at)
+                self.counts[camera_id] += 1
+
+
+def run_threads(cameras, collector, detector_factory, detector_args):
+    stop_event = threading.Event()
+    threads = []
+    for camera_id, camera in enumerate(cameras):
+        detect = detector_factory(*detector_args)
+        capture_slot, output_slot = LatestFrameSlot(), LatestFrameSlot()
+
+        def inference_step(item, camera_id=camera_id, detect=detect):
+            image, captured_at = item
+            hands = [(points, extract_hand_features(points, IMAGE_W, IMAGE_H)) for points in detect(image)]
+            collector.on_result(camera_id, hands, captured_at)
+
+        threads.append(start_stage_thread(f"capture-cam{camera_id}", run_capture_stage, camera, capture_slot,
+                                          stop_event, StageRate("capture")))
+        threads.append(start_stage_thread(f"inference-cam{camera_id}", run_worker_stage, capture_slot, output_slot,
+                                          inference_step, stop_event, StageRate("inference")))
+
+    def close():
+        stop_event.set()
+        for thread in threads:
+            thread.join(timeout=1.0)
+
+    return close
+
+
+def run_processes(cameras, collector, detector_factory, detector_args):
+    service = VisionService(cameras, collector.on_result, detector_factory, detector_args).start()
+    return service.close
+
+
+def measure(mode, cameras, collector, detector_factory, detector_args, seconds):
+    runner = run_threads if mode == "thread-uri" else run_processes
+    close = runner(cameras, collector, detector_factory, detector_args)
+    time.sleep(WARMUP_SEC)
+    captured = [getattr(camera, "frames", 0) for camera in cameras]
+    cpu_started = time.process_time()
+    with collector.lock:
+        collector.measuring = True
+    time.sleep(seconds)
+    with collector.lock:
+        collector.measuring = False
+    cpu_sec = time.process_time() - cpu_started
+    captured = [getattr(camera, "frames", 0) - before for camera, before in zip(cameras, captured)]
+    close()
+    ordered = sorted(collector.latencies) or [float("nan")]
+    inferred = sum(collector.counts)
+    dropped = sum(captured) - inferred if all(captured) else None
+    print(f"{mode:<11} {len(cameras)} camere: {inferred / seconds:6.1f} FPS total "
+          f"(min {min(collector.counts) / seconds:5.1f}/cameră), latență p50 {ordered[len(ordered) // 2] * 1000:6.1f} ms "
+          f"p95 {ordered[int(len(ordered) * 0.95)] * 1000:6.1f} ms, cadre pierdute {dropped}, "
+          f"CPU proces principal {cpu_sec / seconds * 100:5.1f}%, arbitru {collector.arbiter.stats()}")
+
+
+def main():
+    args = sys.argv[1:]
+    print(f"Nuclee disponibile: {os.cpu_count()}")
+    if args and args[0] == "--mediapipe":
+        paths = args[1:]
+        for count in range(1, len(paths) + 1):
+            for mode in ("thread-uri", "procese"):
+                cameras = [CvCamera(path, flip=False) for path in paths[:count]]
+                measure(mode, cameras, ResultCollector(count), mediapipe_detector, (2,), 10.0)
+                for camera in cameras:
+                    camera.release()
+        return
+    seconds = float(args[0]) if args else 5.0
+    print(f"Detector sintetic: {DETECTOR_PYTHON_MS} ms Python + {DETECTOR_NUMPY_REPS} treceri numpy pe cadru, "
+          f"camere {IMAGE_W}x{IMAGE_H} la {CAMERA_FPS} FPS")
+    for count in CAMERA_COUNTS:
+        for mode in ("thread-uri", "procese"):
+            cameras = [SyntheticCamera() for _ in range(count)]
+            measure(mode, cameras, ResultCollector(count), synthetic_detector, (), seconds)
+            for camera in cameras:
+                camera.release()
+
+
+if __name__ == "__main__":
+    main()
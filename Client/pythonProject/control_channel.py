@@ -0,0 +1,307 @@
+import random
+import socket
+import struct
+import threading
+import time
+from collections import OrderedDict, deque
+
+# Cadru binar de control, identic cu Server/control_protocol.py:
+#   magic (0xA5), opcode, sesiune, secvență uint16, apoi payload-ul opcode-ului.
+# Textul ASCII începe mereu cu o literă, deci Pico deosebește cele două formate după primul octet.
+CONTROL_MAGIC = 0xA5
+CONTROL_HEADER_FORMAT = "<BBBH"
+CONTROL_HEADER_SIZE = 5
+CONFIG_PAYLOAD_FORMAT = "<IBBB"  # rată, biți, canale, flag-uri
+START_PAYLOAD_FORMAT = "<II"  # momentul pornirii pe ceasul ticks_us al Pico-ului, sample_pos-ul primului eșantion
+TICKS_PERIOD = 1 << 30  # time.ticks_us() de pe Pico se reia de la 0 după 2^30 µs
+
+OP_CONFIG = 1
+OP_VOL = 2
+OP_PLAY = 3
+OP_PAUSE = 4
+OP_STOP = 5
+OP_NEXT = 6
+OP_PREV = 7
+OP_GC = 8
+OP_STATS = 9
+OP_SYNC = 10
+OP_START = 11
+OP_ACK = 0x80
+
+CONFIG_FLAG_SEQ = 1
+CONFIG_FLAG_ADPCM = 2
+CONFIG_FLAG_GAIN = 4  # stream la câștig unitar, volumul îl aplică Pico
+
+COMMAND_OPCODES = {"PLAY": OP_PLAY, "PAUSE": OP_PAUSE, "STOP": OP_STOP, "NEXT": OP_NEXT, "PREV": OP_PREV,
+                   "GC": OP_GC, "STATS": OP_STATS, "SYNC": OP_SYNC}
+
+SEQ_MASK = 0xFFFF
+SEQ_HALF = 0x8000
+RTT_WINDOW = 256  # ultimele N RTT-uri confirmate, pentru percentile
+
+
+def pack_control_frame(opcode, session, seq, payload=b""):
+    return struct.pack(CONTROL_HEADER_FORMAT, CONTROL_MAGIC, opcode, session, seq & SEQ_MASK) + payload
+
+
+def parse_control_frame(data):
+    """Întoarce (opcode, sesiune, secvență, payload) sau None dacă nu e un cadru binar."""
+    if len(data) < CONTROL_HEADER_SIZE or data[0] != CONTROL_MAGIC:
+        return None
+    _magic, opcode, session, seq = struct.unpack_from(CONTROL_HEADER_FORMAT, data, 0)
+    return opcode, session, seq, data[CONTROL_HEADER_SIZE:]
+
+
+def config_payload(rate, bits, channels, framed=False, adpcm=False, gain=False):
+    flags = (CONFIG_FLAG_SEQ if framed else 0) | (CONFIG_FLAG_ADPCM if adpcm else 0) | (CONFIG_FLAG_GAIN if gain else 0)
+    return struct.pack(CONFIG_PAYLOAD_FORMAT, rate, bits, channels, flags)
+
+
+def parse_stats_reply(text):
+    """"STATS:rx=10:drop=0:...:loop_hist=1/2/0/0/0" -> dict, cu valorile numerice ca int."""
+    fields = {}
+    for part in text.split(":")[1:]:
+        key, _, value = part.partition("=")
+        fields[key] = int(value) if value.lstrip("-").isdigit() else value
+    return fields
+
+
+def config_text(rate, bits, channels, framed=False, adpcm=False, gain=False):
+    message = f"CONFIG:{rate}:{bits}:{channels}"
+    if framed:
+        message += ":SEQ"
+    if adpcm:
+        message += ":ADPCM"
+    if gain:
+        message += ":GAIN"
+    return message
+
+
+class ControlChannel:
+    """Trimite comenzile de control către Pico, în format binar sau text.
+
+    În modul "binary" fiecare cadru are o secvență; Pico răspunde cu un ACK cumulativ
+    (ultima secvență aplicată în ordine), iar cadrele neconfirmate se retrimit toate, în
+    ordine, când expiră timeout-ul, cu timeout dublat la fiecare încercare. După
+    max_retries se renunță și se începe o sesiune nouă, ca Pico să se resincronizeze.
+    Modul "text" păstrează mesajele ASCII vechi, fără confirmare.
+    Cererile cu răspuns text (STATS, GC, SYNC) merg prin query(), în ambele moduri.
+    """
+
+    def __init__(self, sock, addr, protocol="binary", rto=0.05, max_rto=0.8, max_retries=6, timings=None):
+        self.sock = sock
+        self.addr = addr
+        self.protocol = protocol
+        self.base_rto = rto
+        self.max_rto = max_rto
+        self.max_retries = max_retries
+        self.session = random.randrange(256)
+        self._next_seq = 0
+        self._unacked = OrderedDict()  # seq -> [cadru, momentul primei trimiteri]
+        self._rto = rto
+        self._last_send = 0.0
+        self._retries = 0
+        self._cond = threading.Condition()
+        self._acked_up_to = None
+        self._thread = None
+        self._closed = False
+        self._replies = {}  # "STATS" -> ultimul răspuns text de la Pico
+        self.timings = timings
+        self.frames_sent = 0
+        self.retransmits = 0
+        self.acks = 0
+        self.given_up = 0
+        self.rtt_samples = deque(maxlen=RTT_WINDOW)
+
+    def send_command(self, name):
+        if self.protocol != "binary":
+            return self._send_text(name)
+        return self._send_frame(COMMAND_OPCODES[name])
+
+    def send_volume(self, level):
+        if self.protocol != "binary":
+            return self._send_text(f"VOL:{level}")
+        return self._send_frame(OP_VOL, struct.pack("<B", max(0, min(100, int(level)))))
+
+    def send_config(self, rate, bits, channels, framed=False, adpcm=False, gain=False, timeout=1.0):
+        """Trimite CONFIG și așteaptă confirmarea; întoarce True dacă Pico l-a aplicat."""
+        seq = self.post_config(rate, bits, channels, framed, adpcm, gain)
+        return True if seq is None else self.wait_acked(seq, timeout)
+
+    def post_config(self, rate, bits, channels, framed=False, adpcm=False, gain=False):
+        """Ca send_config, dar fără așteptare: întoarce secvența de confirmat (None în modul text)."""
+        if self.protocol != "binary":
+            # Tranziție: fără ACK, CONFIG text se repetă ca înainte.
+            message = config_text(rate, bits, channels, framed, adpcm, gain)
+            for i in range(3):
+                self._send_text(message)
+                time.sleep(0.05 + i * 0.02)
+            return None
+        return self._send_frame(OP_CONFIG, config_payload(rate, bits, channels, framed, adpcm, gain))
+
+    def send_start(self, deadline_ticks, start_pos):
+        """START: Pico ține audio-ul până la deadline_ticks (ceasul lui) și pornește cu eșantionul start_pos.
+
+        Întoarce secvența de confirmat (None în modul text). Vezi fanout.ControlGroup.send_start.
+        """
+        deadline_ticks %= TICKS_PERIOD
+        start_pos &= 0xFFFFFFFF
+        if self.protocol != "binary":
+            return self._send_text(f"START:{deadline_ticks}:{start_pos}")
+        return self._send_frame(OP_START, struct.pack(START_PAYLOAD_FORMAT, deadline_ticks, start_pos))
+
+    def query(self, name, timeout=0.5):
+        """Trimite o cerere cu răspuns text (STATS, GC, SYNC); întoarce răspunsul sau None la timeout."""
+        with self._cond:
+            self._replies.pop(name, None)
+        self.send_command(name)
+        self._start_reader()
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while name not in self._replies:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                self._cond.wait(remaining)
+            return self._replies.pop(name)
+
+    def query_stats(self, timeout=0.5):
+        reply = self.query("STATS", timeout)
+        return parse_stats_reply(reply) if reply else None
+
+    def _send_text(self, message):
+        started = time.perf_counter()
+        self.sock.sendto(message.encode(), self.addr)
+        self.frames_sent += 1
+        if self.timings:
+            self.timings.stop("control_send", started)
+        return None
+
+    def _send_frame(self, opcode, payload=b""):
+        started = time.perf_counter()
+        with self._cond:
+            seq = self._next_seq
+            self._next_seq = (seq + 1) & SEQ_MASK
+            frame = pack_control_frame(opcode, self.session, seq, payload)
+            now = time.monotonic()
+            if not self._unacked:
+                self._last_send = now
+                self._rto = self.base_rto
+                self._retries = 0
+            self._unacked[seq] = [frame, now]
+            self.sock.sendto(frame, self.addr)
+            self.frames_sent += 1
+        if self.timings:
+            self.timings.stop("control_send", started)
+        self._start_reader()
+        return seq
+
+    def _start_reader(self):
+        if self._thread is None:
+            # Socket-ul are port local abia după primul sendto; de acum se pot citi ACK-urile.
+            self._thread = threading.Thread(target=self._ack_loop, daemon=True)
+            self._thread.start()
+
+    def is_acked(self, seq):
+        with self._cond:
+            return seq not in self._unacked
+
+    def wait_acked(self, seq, timeout):
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while seq in self._unacked:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+            return True
+
+    def pending(self):
+        with self._cond:
+            return len(self._unacked)
+
+    def _handle_ack(self, session, ack_seq):
+        now = time.monotonic()
+        with self._cond:
+            if session != self.session:
+                return
+            self.acks += 1
+            released = False
+            for seq in list(self._unacked):
+                if ((ack_seq - seq) & SEQ_MASK) >= SEQ_HALF:
+                    break
+                _frame, first_sent = self._unacked.pop(seq)
+                self.rtt_samples.append(now - first_sent)
+                released = True
+            if released:
+                self._rto = self.base_rto
+                self._retries = 0
+                self._last_send = now
+                self._cond.notify_all()
+
+    def _handle_reply(self, text):
+        with self._cond:
+            self._replies[text.partition(":")[0]] = text
+            self._cond.notify_all()
+
+    def _retransmit_if_due(self):
+        with self._cond:
+            if not self._unacked:
+                return
+            now = time.monotonic()
+            if now - self._last_send < self._rto:
+                return
+            if self._retries >= self.max_retries:
+                print(f"Control: Pico nu confirmă, se renunță la {len(self._unacked)} cadre.")
+                self.given_up += len(self._unacked)
+                self._unacked.clear()
+                # Sesiune nouă, numerotată din nou de la 0: Pico o ia de la capăt la primul cadru.
+                self.session = (self.session + 1) & 0xFF
+                self._next_seq = 0
+                self._cond.notify_all()
+                return
+            for frame, _first_sent in self._unacked.values():
+                self.sock.sendto(frame, self.addr)
+                self.retransmits += 1
+            self._retries += 1
+            self._rto = min(self._rto * 2, self.max_rto)
+            self._last_send = now
+
+    def _ack_loop(self):
+        self.sock.settimeout(self.base_rto / 2)
+        while not self._closed:
+            try:
+                data, _addr = self.sock.recvfrom(512)
+                frame = parse_control_frame(data)
+                if frame and frame[0] == OP_ACK:
+                    self._handle_ack(frame[1], frame[2])
+                elif frame is None and data:
+                    self._handle_reply(data.decode("ascii", "replace"))
+            except socket.timeout:
+                pass
+            except OSError:
+                if self._closed:
+                    break
+                time.sleep(self.base_rto / 2)
+            self._retransmit_if_due()
+
+    def close(self, flush_timeout=0.5):
+        # Lasă întâi cadrele rămase (de ex. STOP) să fie confirmate sau retrimise
+        deadline = time.monotonic() + flush_timeout
+        with self._cond:
+            while self._unacked and self._thread is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+        self._closed = True
+        if self._thread:
+            self._thread.join(timeout=1.0)
+
+    def stats(self):
+        with self._cond:
+            rtts = sorted(self.rtt_samples)
+        rtt_p50 = rtts[len(rtts) // 2] * 1000 if rtts else 0.0
+        return {"protocol": self.protocol, "sent": self.frames_sent, "retransmits": self.retransmits,
+                "acks": self.acks, "given_up": self.given_up, "pending": self.pending(),
+                "rtt_p50_ms": round(rtt_p50, 2)}
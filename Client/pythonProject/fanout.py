@@ -0,0 +1,181 @@
+import socket
+import time
+
+from control_channel import TICKS_PERIOD
+from packetizer import Packetizer
+
+# Multi-room: aceeași melodie pe mai multe Pico-uri. Stream-ul e citit, scalat și codat o singură
+# dată; fiecare pachet pleacă apoi la toți receptorii (sau o singură dată, la un grup multicast).
+CLOCK_SYNC_SAMPLES = 5
+CLOCK_SYNC_MAX_AGE_SEC = 30.0  # cristalele diferă cu ~50 ppm, deci ~1.5 ms în 30 s
+START_DELAY_MS = 120  # START -> pornire: cât să ajungă START-ul și ACK-urile de la toate Pico-urile
+START_LEAD_MS = 60  # audio trimis înainte de pornire; trebuie să încapă în jitter buffer-ul Pico-ului
+MULTICAST_TTL = 1  # grupul nu iese din rețeaua locală
+
+
+def local_us():
+    return time.monotonic_ns() // 1000
+
+
+def open_audio_socket(multicast_group=None, ttl=MULTICAST_TTL):
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    if multicast_group:
+        sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_TTL, ttl)
+    return sock
+
+
+class FanoutPacketizer(Packetizer):
+    """Ca Packetizer, dar către mai mulți receptori: datagrama se compune o singură dată.
+
+    Un receptor la care sendto eșuează (de ex. Pico oprit, ICMP unreachable) e doar numărat;
+    excepția ajunge la streamer numai dacă a eșuat la toți.
+    """
+
+    def __init__(self, sock, addrs, max_datagram_bytes=2048):
+        super().__init__(sock, addrs[0], max_datagram_bytes)
+        self.addrs = list(addrs)
+        self.errors = [0] * len(self.addrs)
+
+    def send(self, payload, header=None):
+        datagram = self._join(header, payload) if header else payload
+        sent = 0
+        last_error = None
+        for i, addr in enumerate(self.addrs):
+            try:
+                sent = self.sock.sendto(datagram, addr)
+            except OSError as e:
+                self.errors[i] += 1
+                last_error = e
+        if not sent and last_error is not None:
+            raise last_error
+        self.packets += 1
+        self.bytes_sent += sent
+        return sent
+
+    def stats(self):
+        stats = super().stats()
+        stats["receivers"] = len(self.addrs)
+        stats["errors"] = {f"{addr[0]}:{addr[1]}": n for addr, n in zip(self.addrs, self.errors) if n}
+        return stats
+
+
+class ClockSync:
+    """Diferența dintre ceasul ticks_us al unui Pico și local_us(), din cereri SYNC.
+
+    Din câteva măsurători se păstrează cea cu RTT minim, cea mai puțin întârziată de cozi;
+    eroarea ei e cel mult RTT/2.
+    """
+
+    def __init__(self):
+        self.offset_us = None
+        self.rtt_us = None
+        self.measured_at = None
+
+    def stale(self, now=None):
+        now = time.monotonic() if now is None else now
+        return self.measured_at is None or now - self.measured_at > CLOCK_SYNC_MAX_AGE_SEC
+
+    def measure(self, channel, samples=CLOCK_SYNC_SAMPLES, timeout=0.2):
+        best = None
+        for _ in range(samples):
+            sent = local_us()
+            reply = channel.query("SYNC", timeout)
+            received = local_us()
+            if not reply:
+                continue
+            try:
+                ticks = int(reply.partition(":")[2])
+            except ValueError:
+                continue
+            rtt = received - sent
+            if best is None or rtt < best[0]:
+                best = (rtt, (ticks - (sent + received) // 2) % TICKS_PERIOD)
+        if best is None:
+            return False
+        self.rtt_us, self.offset_us = best
+        self.measured_at = time.monotonic()
+        return True
+
+    def to_device(self, local_time_us):
+        return (local_time_us + self.offset_us) % TICKS_PERIOD
+
+
+class ControlGroup:
+    """Aceeași interfață ca ControlChannel, pentru mai multe Pico-uri.
+
+    Fiecare Pico are propriul ControlChannel (sesiune, secvențe, ACK, retransmisii), deci un
+    dispozitiv care nu răspunde nu le întârzie pe celelalte. Comenzile pleacă la toate; CONFIG și
+    START așteaptă ACK-ul fiecăruia, iar cele care nu au confirmat rămân în last_missing.
+    """
+
+    def __init__(self, channels, names=None):
+        self.channels = list(channels)
+        self.names = names or [f"{ch.addr[0]}:{ch.addr[1]}" for ch in self.channels]
+        self.protocol = self.channels[0].protocol
+        self.clocks = [ClockSync() for _ in self.channels]
+        self.last_missing = []
+
+    def send_command(self, name):
+        return [ch.send_command(name) for ch in self.channels]
+
+    def send_volume(self, level):
+        return [ch.send_volume(level) for ch in self.channels]
+
+    def send_config(self, rate, bits, channels, framed=False, adpcm=False, gain=False, timeout=1.0):
+        """CONFIG la toate Pico-urile; True dacă l-au confirmat toate."""
+        seqs = [ch.post_config(rate, bits, channels, framed, adpcm, gain) for ch in self.channels]
+        return self._wait_all(seqs, timeout)
+
+    def sync_clocks(self, force=False):
+        """Măsoară ceasurile vechi (sau pe toate, cu force); întoarce numele celor fără răspuns."""
+        now = time.monotonic()
+        missing = []
+        for name, clock, ch in zip(self.names, self.clocks, self.channels):
+            if (force or clock.stale(now)) and not clock.measure(ch) and clock.offset_us is None:
+                missing.append(name)
+        return missing
+
+    def send_start(self, start_pos, delay_ms=START_DELAY_MS, timeout=0.5):
+        """Pornire sincronă: același moment pentru toate Pico-urile, tradus pe ceasul fiecăruia.
+
+        Fiecare Pico ține audio-ul primit până atunci și redă eșantionul start_pos exact la acel
+        moment (plus latența fixă a I2S-ului, aceeași pe toate). Întoarce momentul pornirii pe
+        ceasul time.monotonic(), ca streamer-ul să înceapă să trimită cu START_LEAD_MS înainte,
+        sau None dacă niciun Pico nu a primit START. Cele din last_missing pornesc la primul
+        pachet audio, ca înainte, fără garanția aceluiași eșantion.
+        """
+        unsynced = set(self.sync_clocks())
+        start_us = local_us() + delay_ms * 1000
+        seqs = []
+        for name, clock, ch in zip(self.names, self.clocks, self.channels):
+            seqs.append(None if name in unsynced else ch.send_start(clock.to_device(start_us), start_pos))
+        self._wait_all(seqs, timeout, skip=unsynced)
+        self.last_missing = sorted(unsynced) + self.last_missing
+        if self.last_missing:
+            print(f"Multi-room: fără pornire sincronă pe {', '.join(self.last_missing)}")
+        return None if len(self.last_missing) == len(self.channels) else start_us / 1_000_000
+
+    def _wait_all(self, seqs, timeout, skip=()):
+        deadline = time.monotonic() + timeout
+        self.last_missing = []
+        for name, ch, seq in zip(self.names, self.channels, seqs):
+            if name in skip or seq is None:
+                continue
+            if not ch.wait_acked(seq, max(0.0, deadline - time.monotonic())):
+                self.last_missing.append(name)
+        return not self.last_missing
+
+    def query_stats(self, timeout=0.5):
+        return {name: ch.query_stats(timeout) for name, ch in zip(self.names, self.channels)}
+
+    def close(self, flush_timeout=0.5):
+        for ch in self.channels:
+            ch.close(flush_timeout)
+
+    def stats(self):
+        stats = {}
+        for name, clock, ch in zip(self.names, self.clocks, self.channels):
+            stats[name] = ch.stats()
+            if clock.rtt_us is not None:
+                stats[name]["sync_rtt_ms"] = round(clock.rtt_us / 1000, 2)
+        return stats
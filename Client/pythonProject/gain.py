@@ -0,0 +1,117 @@
+import numpy as np
+
+Q15_ONE = 1 << 15
+
+
+def scale_volume(audio_data_bytes, volume_percentage, sampwidth):
+    if not audio_data_bytes: return audio_data_bytes
+    if sampwidth != 2: return audio_data_bytes
+    if volume_percentage == 100: return audio_data_bytes
+    try:
+        audio_samples = np.frombuffer(audio_data_bytes, dtype=np.int16)
+        volume_factor = volume_percentage / 100.0
+        scaled_samples = np.clip(audio_samples * volume_factor, -32768, 32767).astype(np.int16)
+        return scaled_samples.tobytes()
+    except Exception as e:
+        print(f"Eroare la scalarea volumului: {e}")
+        return audio_data_bytes
+
+
+def volume_to_q15(volume_percentage):
+    volume_percentage = max(0, min(100, volume_percentage))
+    return (volume_percentage * Q15_ONE + 50) // 100
+
+
+def _shift_q15(work, scratch, sign_shift):
+    # work >> 15 trunchiat spre zero: negativele primesc Q15_ONE - 1 înainte de shift
+    np.right_shift(work, sign_shift, out=scratch)
+    np.bitwise_and(scratch, Q15_ONE - 1, out=scratch)
+    np.add(work, scratch, out=work)
+    np.right_shift(work, 15, out=work)
+
+
+class GainStage:
+    """Aplică volumul în virgulă fixă Q15, fără alocări per chunk.
+
+    Bufferele de lucru (int32 pentru 8/16 biți, int64 pentru 24 de biți) și
+    bufferul de ieșire se alocă o singură dată și cresc doar dacă apare un chunk
+    mai mare. Produsul se trunchiază spre zero, ca la scale_volume (diferă cel mult
+    1 LSB, din cuantizarea factorului în Q15). process() întoarce un memoryview peste bufferul de ieșire, valid
+    până la următorul apel, care poate fi dat direct la sendto.
+    """
+
+    def __init__(self, max_samples=4096):
+        self._capacity = 0
+        self._ensure_capacity(max_samples)
+
+    def _ensure_capacity(self, num_samples):
+        if num_samples <= self._capacity:
+            return
+        self._capacity = num_samples
+        self._work32 = np.empty(num_samples, dtype=np.int32)
+        self._scratch32 = np.empty(num_samples, dtype=np.int32)
+        self._work64 = np.empty(num_samples, dtype=np.int64)
+        self._scratch64 = np.empty(num_samples, dtype=np.int64)
+        self._out = bytearray(num_samples * 3)
+        self._out_view = memoryview(self._out)
+        self._out_u8 = np.frombuffer(self._out, dtype=np.uint8)
+        self._out_i16 = np.frombuffer(self._out, dtype=np.int16, count=len(self._out) // 2)
+
+    def process(self, audio_data, volume_percentage, sampwidth):
+        if not audio_data or volume_percentage >= 100:
+            return audio_data
+        if sampwidth not in (1, 2, 3):
+            return audio_data
+
+        num_samples = len(audio_data) // sampwidth
+        self._ensure_capacity(num_samples)
+        gain_q15 = volume_to_q15(volume_percentage)
+
+        if sampwidth == 2:
+            self._scale_16bit(audio_data, num_samples, gain_q15)
+        elif sampwidth == 1:
+            self._scale_8bit(audio_data, num_samples, gain_q15)
+        else:
+            self._scale_24bit(audio_data, num_samples, gain_q15)
+        return self._out_view[:num_samples * sampwidth]
+
+    def _scale_16bit(self, audio_data, n, gain_q15):
+        src = np.frombuffer(audio_data, dtype=np.int16, count=n)
+        work = self._work32[:n]
+        np.copyto(work, src)
+        np.multiply(work, gain_q15, out=work)
+        _shift_q15(work, self._scratch32[:n], 31)
+        np.copyto(self._out_i16[:n], work, casting='unsafe')
+
+    def _scale_8bit(self, audio_data, n, gain_q15):
+        # WAV pe 8 biți este fără semn, cu zero la 128.
+        src = np.frombuffer(audio_data, dtype=np.uint8, count=n)
+        work = self._work32[:n]
+        np.copyto(work, src)
+        np.subtract(work, 128, out=work)
+        np.multiply(work, gain_q15, out=work)
+        _shift_q15(work, self._scratch32[:n], 31)
+        np.add(work, 128, out=work)
+        np.copyto(self._out_u8[:n], work, casting='unsafe')
+
+    def _scale_24bit(self, audio_data, n, gain_q15):
+        src = np.frombuffer(audio_data, dtype=np.uint8, count=n * 3).reshape(n, 3)
+        work = self._work64[:n]
+        scratch = self._scratch64[:n]
+        # Reconstruiește eșantionul little-endian pe 24 de biți cu extensie de semn.
+        np.copyto(work, src[:, 2])
+        np.left_shift(work, 56, out=work)
+        np.right_shift(work, 40, out=work)
+        np.copyto(scratch, src[:, 1])
+        np.left_shift(scratch, 8, out=scratch)
+        np.bitwise_or(work, scratch, out=work)
+        np.copyto(scratch, src[:, 0])
+        np.bitwise_or(work, scratch, out=work)
+
+        np.multiply(work, gain_q15, out=work)
+        _shift_q15(work, scratch, 63)
+
+        out = self._out_u8[:n * 3].reshape(n, 3)
+        for byte_index in range(3):
+            np.copyto(out[:, byte_index], work, casting='unsafe')
+            np.right_shift(work, 8, out=work)
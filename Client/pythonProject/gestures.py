@@ -0,0 +1,189 @@
+import numpy as np
+
+from hand_features import is_volume_pose
+
+# Gestul recunoscut pe un cadru, ca cod mic (se poate calcula vectorizat pe un lot de cadre)
+GESTURE_NONE, GESTURE_PLAY, GESTURE_PAUSE, GESTURE_NEXT, GESTURE_PREV = 0, 1, 2, 3, 4
+GESTURE_VOLUME = 5  # poza de volum, doar ca etichetă în debouncer
+GESTURE_NAMES = (None, "PLAY", "PAUSE", "NEXT", "PREV", "VOL")
+
+GESTURE_CONFIRM_FRAMES = 4  # gestul se confirmă când apare în N ...
+GESTURE_WINDOW_FRAMES = 6  # ... din ultimele M cadre
+VOLUME_MIN_DIST_PX = 20  # distanța police-index pentru volum 0
+VOLUME_MAX_DIST_PX = 220  # ... și pentru volum 100
+VOLUME_SMOOTHING = 0.35  # ponderea cadrului nou în media exponențială a volumului
+VOLUME_MIN_STEP = 3  # se trimite doar o schimbare de cel puțin atâtea procente
+VOLUME_MAX_SEND_HZ = 10
+
+
+def classify_gesture(features):
+    index_up, middle_up, ring_up, pinky_up = features.index_up, features.middle_up, features.ring_up, features.pinky_up
+    thumb_tckd = features.thumb_tucked
+    if features.thumb_extended and index_up and middle_up and ring_up and pinky_up:
+        return GESTURE_PLAY
+    if not index_up and not middle_up and not ring_up and not pinky_up and thumb_tckd:
+        return GESTURE_PAUSE
+    if index_up and middle_up and not ring_up and not pinky_up and thumb_tckd:
+        return GESTURE_NEXT
+    if index_up and not middle_up and not ring_up and pinky_up and thumb_tckd:
+        return GESTURE_PREV
+    return GESTURE_NONE
+
+
+def classify_gesture_batch(features):
+    """classify_gesture pe rezultatul lui extract_hand_features_batch; întoarce un vector de coduri."""
+    index_up, middle_up, ring_up, pinky_up = features.index_up, features.middle_up, features.ring_up, features.pinky_up
+    tucked = features.thumb_tucked
+    play = features.thumb_extended & index_up & middle_up & ring_up & pinky_up
+    pause = ~index_up & ~middle_up & ~ring_up & ~pinky_up & tucked
+    next_ = index_up & middle_up & ~ring_up & ~pinky_up & tucked
+    prev = index_up & ~middle_up & ~ring_up & pinky_up & tucked
+    return np.select([play, pause, next_, prev], [GESTURE_PLAY, GESTURE_PAUSE, GESTURE_NEXT, GESTURE_PREV],
+                     GESTURE_NONE).astype(np.int8)
+
+
+def volume_pose_batch(features):
+    return (features.thumb_extended & features.index_up & ~features.middle_up
+            & ~features.ring_up & ~features.pinky_up)
+
+
+def pinch_to_volume(pinch_px):
+    # Ca map_value, dar fără rotunjire, pentru medierea volumului
+    pinch_px = max(VOLUME_MIN_DIST_PX, min(pinch_px, VOLUME_MAX_DIST_PX))
+    return (pinch_px - VOLUME_MIN_DIST_PX) * 100.0 / (VOLUME_MAX_DIST_PX - VOLUME_MIN_DIST_PX)
+
+
+class GestureDebouncer:
+    """Filtru temporal peste etichetele pe cadru, într-un buffer circular de `window` cadre.
+
+    O etichetă devine stabilă când apare în cel puțin `confirm` din ultimele `window` cadre;
+    gestul se declanșează o singură dată, la trecerea în starea stabilă. Se rearmează când
+    altă poză (inclusiv „niciun gest” sau mâna ieșită din cadru) devine stabilă, deci un
+    cadru citit greșit nici nu declanșează, nici nu rearmează.
+    """
+
+    def __init__(self, confirm=GESTURE_CONFIRM_FRAMES, window=GESTURE_WINDOW_FRAMES):
+        if not window // 2 < confirm <= window:
+            raise ValueError("confirm trebuie să fie majoritar în fereastră")
+        self.confirm = confirm
+        self._labels = bytearray(window)
+        self._counts = [0] * len(GESTURE_NAMES)
+        self.reset()
+
+    def reset(self):
+        # Fereastra plină de GESTURE_NONE, ca la pornire
+        window = len(self._labels)
+        self._labels[:] = bytes(window)
+        self._counts[:] = [0] * len(GESTURE_NAMES)
+        self._counts[GESTURE_NONE] = window
+        self._pos = 0
+        self.stable = GESTURE_NONE
+
+    def push(self, label):
+        """Întoarce eticheta dacă tocmai a devenit stabilă, altfel GESTURE_NONE."""
+        self._counts[self._labels[self._pos]] -= 1
+        self._labels[self._pos] = label
+        self._counts[label] += 1
+        self._pos = (self._pos + 1) % len(self._labels)
+        if label != self.stable and self._counts[label] >= self.confirm:
+            self.stable = label
+            return label
+        return GESTURE_NONE
+
+
+class VolumeStream:
+    """Volumul din distanța de ciupire, mediat exponențial; trimis doar la schimbări de cel
+    puțin min_step procente și de cel mult max_send_hz ori pe secundă."""
+
+    def __init__(self, volume, smoothing=VOLUME_SMOOTHING, min_step=VOLUME_MIN_STEP, max_send_hz=VOLUME_MAX_SEND_HZ):
+        self.volume = volume
+        self.smoothing = smoothing
+        self.min_step = min_step
+        self.min_interval = 1.0 / max_send_hz
+        self._smoothed = None
+        self._last_sent_at = float("-inf")
+
+    def start(self):
+        # Poza de volum tocmai a fost confirmată: media pornește de la prima măsurătoare
+        self._smoothed = None
+
+    def update(self, pinch_px, now):
+        """Întoarce volumul de trimis sau None."""
+        target = pinch_to_volume(pinch_px)
+        self._smoothed = target if self._smoothed is None else self._smoothed + self.smoothing * (target - self._smoothed)
+        level = int(round(self._smoothed))
+        if level == self.volume or now - self._last_sent_at < self.min_interval:
+            return None
+        if abs(level - self.volume) < self.min_step and level not in (0, 100):
+            return None
+        return self._send(level, now)
+
+    def finish(self, now):
+        # Mâna a ieșit din poza de volum: se trimite și ultimul pas mai mic decât min_step
+        if self._smoothed is None:
+            return None
+        level = int(round(self._smoothed))
+        self._smoothed = None
+        return self._send(level, now) if level != self.volume else None
+
+    def _send(self, level, now):
+        self.volume = level
+        self._last_sent_at = now
+        return level
+
+
+class GestureRecognizer:
+    """Transformă gesturile de pe fiecare cadru în comenzi pentru `sink` (PlayerActor.post sau un înlocuitor).
+
+    Timpul vine din afară (`now`), ca aceeași logică să ruleze și pe sesiuni înregistrate,
+    mai repede decât în timp real. sink(command, *args, origin=...) primește ca origin
+    momentul capturii cadrului care a declanșat comanda. Cadrele fără mână trebuie și ele
+    raportate (update_no_hand), ca debouncer-ul să vadă schimbarea de poză.
+    """
+
+    def __init__(self, sink, volume=75, confirm=GESTURE_CONFIRM_FRAMES, window=GESTURE_WINDOW_FRAMES,
+                 smoothing=VOLUME_SMOOTHING, min_step=VOLUME_MIN_STEP, max_send_hz=VOLUME_MAX_SEND_HZ):
+        self.sink = sink
+        self.debouncer = GestureDebouncer(confirm, window)
+        self.volume_stream = VolumeStream(volume, smoothing, min_step, max_send_hz)
+
+    @property
+    def volume(self):
+        return self.volume_stream.volume
+
+    def update(self, features, now, origin=None):
+        """Întoarce (gestul trimis sau None, volumul curent)."""
+        return self.update_code(classify_gesture(features), is_volume_pose(features), features.pinch_px, now, origin)
+
+    def update_no_hand(self, now, origin=None):
+        return self.update_code(GESTURE_NONE, False, 0.0, now, origin)
+
+    def reset(self, now, origin=None):
+        """Controlul trece la altă mână (vezi hand_arbiter.py): pozele vechi se uită, iar un volum
+        în curs se încheie cu ultima valoare mediată."""
+        if self.debouncer.stable == GESTURE_VOLUME:
+            new_volume = self.volume_stream.finish(now)
+            if new_volume is not None:
+                self.sink("VOL", new_volume, origin=origin)
+        self.debouncer.reset()
+
+    def update_code(self, code, volume_pose, pinch_px, now, origin=None):
+        was_volume = self.debouncer.stable == GESTURE_VOLUME
+        confirmed = self.debouncer.push(code or (GESTURE_VOLUME if volume_pose else GESTURE_NONE))
+        action = None
+        if confirmed == GESTURE_VOLUME:
+            self.volume_stream.start()
+        elif confirmed:
+            action = GESTURE_NAMES[confirmed]
+            self.sink(action, origin=origin)
+
+        new_volume = None
+        if self.debouncer.stable == GESTURE_VOLUME:
+            # Cadrele izolate cu altă poză nu intră în medie
+            if volume_pose:
+                new_volume = self.volume_stream.update(pinch_px, now)
+        elif was_volume:
+            new_volume = self.volume_stream.finish(now)
+        if new_volume is not None:
+            self.sink("VOL", new_volume, origin=origin)
+        return action, self.volume
@@ -0,0 +1,138 @@
+import math
+from collections import deque
+
+from gestures import GESTURE_NONE, GESTURE_WINDOW_FRAMES, classify_gesture
+from hand_features import MIDDLE_FINGER_MCP, WRIST, is_volume_pose
+
+ARBITER_CLAIM_FRAMES = 3  # o mână cere controlul ținând un gest (sau poza de volum) atâtea cadre la rând
+ARBITER_RELEASE_SEC = 0.7  # controlul se eliberează când mâna lipsește atât
+ARBITER_IDLE_HANDOVER_SEC = 1.5  # altă mână îl poate prelua dacă cea cu controlul stă atât fără gest
+ARBITER_MATCH_PX = 120  # aceeași mână de la un cadru la altul: încheietura s-a mutat cu cel mult atât
+
+
+class HandTrack:
+    """O mână urmărită pe o cameră, cu ultimele etichete pe cadru (ca istoria debouncer-ului)."""
+
+    def __init__(self, track_id, camera_id, history=GESTURE_WINDOW_FRAMES):
+        self.id = track_id
+        self.camera_id = camera_id
+        self.features = None
+        self.wrist = (0, 0)
+        self.last_seen = float("-inf")
+        self.last_active = float("-inf")
+        self.active_run = 0
+        self.seen_now = False
+        self.history = deque(maxlen=history)  # (cod, poză de volum, ciupire px, moment)
+
+    def observe(self, features, now):
+        self.features = features
+        self.wrist = tuple(features.points_px[WRIST].tolist())
+        self.last_seen = now
+        self.seen_now = True
+        code = classify_gesture(features)
+        volume_pose = is_volume_pose(features)
+        self.history.append((code, volume_pose, features.pinch_px, now))
+        if code != GESTURE_NONE or volume_pose:
+            self.active_run += 1
+            self.last_active = now
+        else:
+            self.active_run = 0
+
+    def distance_px(self, wrist):
+        return math.hypot(self.wrist[0] - wrist[0], self.wrist[1] - wrist[1])
+
+    def size_px(self):
+        # Încheietură - baza degetului mijlociu: mâna cea mai mare e cea mai aproape de cameră
+        dx, dy = (self.features.points_px[MIDDLE_FINGER_MCP] - self.features.points_px[WRIST]).tolist()
+        return math.hypot(dx, dy)
+
+    def name(self):
+        return f"cam{self.camera_id}#{self.id}"
+
+
+class HandArbiter:
+    """Alege mâna (utilizatorul) care comandă player-ul, dintre mâinile de pe toate camerele.
+
+    Mâinile sunt urmărite pe fiecare cameră după poziția încheieturii; între camere nu există
+    identitate, deci aceeași persoană văzută de două camere înseamnă două mâini. Controlul e al
+    uneia singure: îl ia prima care ține un gest claim_frames cadre la rând (la egalitate, cea mai
+    apropiată de cameră) și îl păstrează până lipsește release_sec, sau până îl cere alta după ce
+    a stat idle_handover_sec fără gest. Doar cadrele ei ajung la recognizer (GestureRecognizer);
+    la preluare acesta primește istoria noii mâini, ca gestul cu care a cerut controlul să nu
+    aștepte încă o confirmare.
+    """
+
+    def __init__(self, recognizer, claim_frames=ARBITER_CLAIM_FRAMES, release_sec=ARBITER_RELEASE_SEC,
+                 idle_handover_sec=ARBITER_IDLE_HANDOVER_SEC, match_px=ARBITER_MATCH_PX):
+        self.recognizer = recognizer
+        self.claim_frames = claim_frames
+        self.release_sec = release_sec
+        self.idle_handover_sec = idle_handover_sec
+        self.match_px = match_px
+        self.tracks = {}  # camera -> [HandTrack]
+        self.controller = None
+        self._next_id = 0
+        self.frames = 0
+        self.claims = 0
+        self.handovers = 0
+        self.ignored_hands = 0
+
+    def update(self, camera_id, hands, now, origin=None):
+        """hands: HandFeatures pentru fiecare mână din cadrul camerei; întoarce gestul trimis sau None."""
+        self.frames += 1
+        tracks = self._match(camera_id, hands, now)
+        controller = self.controller
+        if controller is not None and now - controller.last_seen > self.release_sec:
+            self.recognizer.reset(now, origin)
+            self.controller = controller = None
+        if controller is None or now - controller.last_active > self.idle_handover_sec:
+            candidates = [t for t in tracks if t.seen_now and t is not controller
+                          and t.active_run >= self.claim_frames]
+            if candidates:
+                return self._hand_over(max(candidates, key=HandTrack.size_px), now, origin)
+
+        controller = self.controller
+        self.ignored_hands += sum(1 for t in tracks if t.seen_now and t is not controller)
+        if controller is None or controller.camera_id != camera_id:
+            return None
+        if controller.seen_now:
+            code, volume_pose, pinch_px, _at = controller.history[-1]
+            action, _volume = self.recognizer.update_code(code, volume_pose, pinch_px, now, origin)
+        else:
+            action, _volume = self.recognizer.update_no_hand(now, origin)
+        return action
+
+    def _match(self, camera_id, hands, now):
+        tracks = [t for t in self.tracks.get(camera_id, ()) if now - t.last_seen <= self.release_sec]
+        for track in tracks:
+            track.seen_now = False
+        free = list(tracks)
+        for features in hands:
+            wrist = features.points_px[WRIST].tolist()
+            track = min(free, key=lambda t: t.distance_px(wrist), default=None)
+            if track is None or track.distance_px(wrist) > self.match_px:
+                track = HandTrack(self._next_id, camera_id)
+                self._next_id += 1
+                tracks.append(track)
+            else:
+                free.remove(track)
+            track.observe(features, now)
+        self.tracks[camera_id] = tracks
+        return tracks
+
+    def _hand_over(self, track, now, origin):
+        if self.controller is not None:
+            self.handovers += 1
+        self.claims += 1
+        self.controller = track
+        self.recognizer.reset(now, origin)
+        action = None
+        for code, volume_pose, pinch_px, at in track.history:
+            result, _volume = self.recognizer.update_code(code, volume_pose, pinch_px, at, origin)
+            action = result or action
+        return action
+
+    def stats(self):
+        return {"frames": self.frames, "hands": sum(len(t) for t in self.tracks.values()),
+                "controller": self.controller.name() if self.controller else None, "claims": self.claims,
+                "handovers": self.handovers, "ignored_hands": self.ignored_hands}
@@ -0,0 +1,140 @@
+import math
+from collections import namedtuple
+from functools import lru_cache
+
+import numpy as np
+
+# Indicii landmark-urilor MediaPipe Hands (aceleași valori ca mp.solutions.hands.HandLandmark),
+# definiți aici ca modulul să poată fi folosit fără MediaPipe (benchmark-uri, replay).
+WRIST = 0
+THUMB_TIP = 4
+INDEX_FINGER_MCP, INDEX_FINGER_PIP, INDEX_FINGER_TIP = 5, 6, 8
+MIDDLE_FINGER_MCP, MIDDLE_FINGER_PIP, MIDDLE_FINGER_TIP = 9, 10, 12
+RING_FINGER_MCP, RING_FINGER_PIP, RING_FINGER_TIP = 13, 14, 16
+PINKY_MCP, PINKY_PIP, PINKY_TIP = 17, 18, 20
+NUM_LANDMARKS = 21
+
+# Rândurile: vârf, PIP, MCP; coloanele: index, mijlociu, inelar, deget mic.
+FINGER_JOINTS = np.array([
+    [INDEX_FINGER_TIP, MIDDLE_FINGER_TIP, RING_FINGER_TIP, PINKY_TIP],
+    [INDEX_FINGER_PIP, MIDDLE_FINGER_PIP, RING_FINGER_PIP, PINKY_PIP],
+    [INDEX_FINGER_MCP, MIDDLE_FINGER_MCP, RING_FINGER_MCP, PINKY_MCP]])
+
+# Perechile de puncte ale căror distanțe sunt necesare: police-MCP index, police-MCP mijlociu,
+# police-MCP deget mic (police extins) și police-vârf index (ciupire pentru volum).
+DISTANCE_PAIRS_A = np.array([THUMB_TIP, THUMB_TIP, THUMB_TIP, THUMB_TIP])
+DISTANCE_PAIRS_B = np.array([INDEX_FINGER_MCP, MIDDLE_FINGER_MCP, PINKY_MCP, INDEX_FINGER_TIP])
+
+# Aceleași tabele ca tupluri Python, pentru calculul scalar pe o singură mână
+FINGER_TRIPLES = tuple(zip(*FINGER_JOINTS.tolist()))  # (vârf, PIP, MCP) pe deget
+DISTANCE_PAIRS = tuple(zip(DISTANCE_PAIRS_A.tolist(), DISTANCE_PAIRS_B.tolist()))
+
+THUMB_TUCKED_THRESHOLD_PX = 45
+THUMB_EXTENDED_THRESHOLD_PX = 75
+
+HandFeatures = namedtuple("HandFeatures", [
+    "points_px", "index_up", "middle_up", "ring_up", "pinky_up",
+    "thumb_tucked", "thumb_extended", "thumb_pinky_px", "pinch_px"])
+
+
+def get_distance_2d(p1, p2, image_width, image_height):
+    x1, y1 = int(p1.x * image_width), int(p1.y * image_height)
+    x2, y2 = int(p2.x * image_width), int(p2.y * image_height)
+    return np.sqrt((x1 - x2) ** 2 + (y1 - y2) ** 2)
+
+
+def map_value(value, in_min, in_max, out_min, out_max):
+    value = max(in_min, min(value, in_max))
+    if in_min == in_max: return out_min
+    return int((value - in_min) * (out_max - out_min) / (in_max - in_min) + out_min)
+
+
+def is_finger_up(landmarks, finger_tip_id, finger_pip_id, finger_mcp_id):
+    tip_y = landmarks[finger_tip_id].y
+    pip_y = landmarks[finger_pip_id].y
+    mcp_y = landmarks[finger_mcp_id].y
+    return tip_y < pip_y and pip_y < (mcp_y + 0.02)
+
+
+def is_thumb_tucked(landmarks, image_width, image_height, threshold_px=50):
+    thumb_tip = landmarks[THUMB_TIP]
+    index_mcp = landmarks[INDEX_FINGER_MCP]
+    middle_mcp = landmarks[MIDDLE_FINGER_MCP]
+    distance_to_index_mcp = get_distance_2d(thumb_tip, index_mcp, image_width, image_height)
+    distance_to_middle_mcp = get_distance_2d(thumb_tip, middle_mcp, image_width, image_height)
+    return distance_to_index_mcp < threshold_px or distance_to_middle_mcp < threshold_px
+
+
+def is_thumb_extended(landmarks, image_width, image_height, threshold_px=70):
+    thumb_tip = landmarks[THUMB_TIP]
+    pinky_mcp = landmarks[PINKY_MCP]
+    distance_pixels = get_distance_2d(thumb_tip, pinky_mcp, image_width, image_height)
+    return distance_pixels > threshold_px
+
+
+def landmarks_to_array(landmarks):
+    return np.array([(lm.x, lm.y, lm.z) for lm in landmarks], dtype=np.float64)
+
+
+def _compute_features(points, image_width, image_height, tucked_threshold_px, extended_threshold_px):
+    # Funcționează atât pe un cadru (21, 3), cât și pe un lot (N, 21, 3).
+    # Trunchierea la int reproduce conversia per punct din get_distance_2d.
+    points_px = (points[..., :2] * (image_width, image_height)).astype(np.int64)
+
+    finger_y = points[..., FINGER_JOINTS, 1]
+    fingers_up = ((finger_y[..., 0, :] < finger_y[..., 1, :])
+                  & (finger_y[..., 1, :] < finger_y[..., 2, :] + 0.02))
+
+    deltas = points_px[..., DISTANCE_PAIRS_A, :] - points_px[..., DISTANCE_PAIRS_B, :]
+    distances = np.sqrt((deltas * deltas).sum(axis=-1))
+
+    thumb_tucked = (distances[..., 0] < tucked_threshold_px) | (distances[..., 1] < tucked_threshold_px)
+    thumb_extended = distances[..., 2] > extended_threshold_px
+    return points_px, fingers_up, thumb_tucked, thumb_extended, distances
+
+
+@lru_cache(maxsize=4)
+def _pixel_scale(image_width, image_height):
+    return np.array((image_width, image_height), dtype=np.float64)
+
+
+def extract_hand_features(landmarks, image_width, image_height,
+                          tucked_threshold_px=THUMB_TUCKED_THRESHOLD_PX,
+                          extended_threshold_px=THUMB_EXTENDED_THRESHOLD_PX):
+    # Pe un singur cadru, apelurile NumPy mici costă mai mult decât calculul: doar points_px (pentru
+    # desen și arbitraj) rămâne vectorizat, restul e aritmetică scalară pe punctele necesare.
+    # Rezultatul e identic cu _compute_features (aceeași trunchiere la int, sqrt pe întregi).
+    if isinstance(landmarks, np.ndarray):
+        coords = landmarks[:, :2]
+        ys = landmarks[:, 1].tolist()
+    else:
+        ys = [lm.y for lm in landmarks]
+        coords = np.empty((len(ys), 2))
+        coords[:, 0] = [lm.x for lm in landmarks]
+        coords[:, 1] = ys
+    points_px = (coords * _pixel_scale(image_width, image_height)).astype(np.int64)
+    px = points_px.tolist()
+    index_up, middle_up, ring_up, pinky_up = [ys[tip] < ys[pip] < ys[mcp] + 0.02 for tip, pip, mcp in FINGER_TRIPLES]
+    distances = []
+    for a, b in DISTANCE_PAIRS:
+        dx, dy = px[a][0] - px[b][0], px[a][1] - px[b][1]
+        distances.append(math.sqrt(dx * dx + dy * dy))
+    to_index_mcp, to_middle_mcp, thumb_pinky_px, pinch_px = distances
+    return HandFeatures(points_px, index_up, middle_up, ring_up, pinky_up,
+                        to_index_mcp < tucked_threshold_px or to_middle_mcp < tucked_threshold_px,
+                        thumb_pinky_px > extended_threshold_px, thumb_pinky_px, pinch_px)
+
+
+def extract_hand_features_batch(points, image_width, image_height,
+                                tucked_threshold_px=THUMB_TUCKED_THRESHOLD_PX,
+                                extended_threshold_px=THUMB_EXTENDED_THRESHOLD_PX):
+    """Varianta pe lot: points are forma (N, 21, 3), câmpurile rezultatului sunt vectori de lungime N."""
+    points_px, fingers_up, thumb_tucked, thumb_extended, distances = _compute_features(
+        points, image_width, image_height, tucked_threshold_px, extended_threshold_px)
+    return HandFeatures(points_px, fingers_up[:, 0], fingers_up[:, 1], fingers_up[:, 2], fingers_up[:, 3],
+                        thumb_tucked, thumb_extended, distances[:, 2], distances[:, 3])
+
+
+def is_volume_pose(features):
+    return (features.thumb_extended and features.index_up and not features.middle_up
+            and not features.ring_up and not features.pinky_up)
@@ -0,0 +1,110 @@
+import time
+from collections import namedtuple
+
+import numpy as np
+
+from gestures import GESTURE_NONE, classify_gesture_batch, volume_pose_batch
+from hand_features import NUM_LANDMARKS, extract_hand_features_batch
+
+# Fișierul .npz al unei înregistrări:
+#   timestamps  float64 (N,)        secunde de la primul cadru (momentul capturii)
+#   landmarks   float32 (N, 21, 3)  prima mână din cadru, coordonate normalizate; NaN fără mână
+#   has_hand    bool (N,)
+#   image_size  int32 (2,)          lățime, înălțime (pragurile recunoașterii sunt în pixeli)
+REPLAY_BATCH_FRAMES = 1024
+
+LandmarkRecording = namedtuple("LandmarkRecording", ["timestamps", "landmarks", "has_hand", "image_width",
+                                                     "image_height"])
+ReplayResult = namedtuple("ReplayResult", ["frames", "hand_frames", "duration_sec", "elapsed_sec", "commands"])
+
+
+class LandmarkRecorder:
+    """Strânge landmark-urile și momentul capturii pentru fiecare cadru procesat, pentru replay offline."""
+
+    def __init__(self, image_width, image_height, capacity=4096):
+        self.image_width = image_width
+        self.image_height = image_height
+        self.frames = 0
+        self._start = None
+        self._timestamps = np.zeros(capacity, dtype=np.float64)
+        self._landmarks = np.full((capacity, NUM_LANDMARKS, 3), np.nan, dtype=np.float32)
+
+    def add(self, captured_at, points=None):
+        # points: (21, 3) pentru mâna găsită sau None pentru un cadru fără mână
+        if self.frames == len(self._timestamps):
+            self._grow()
+        if self._start is None:
+            self._start = captured_at
+        self._timestamps[self.frames] = captured_at - self._start
+        if points is not None:
+            self._landmarks[self.frames] = points
+        self.frames += 1
+
+    def _grow(self):
+        capacity = len(self._timestamps) * 2
+        timestamps = np.zeros(capacity, dtype=np.float64)
+        timestamps[:self.frames] = self._timestamps
+        landmarks = np.full((capacity, NUM_LANDMARKS, 3), np.nan, dtype=np.float32)
+        landmarks[:self.frames] = self._landmarks
+        self._timestamps, self._landmarks = timestamps, landmarks
+
+    def recording(self):
+        landmarks = self._landmarks[:self.frames]
+        return LandmarkRecording(self._timestamps[:self.frames], landmarks, ~np.isnan(landmarks[:, 0, 0]),
+                                 self.image_width, self.image_height)
+
+    def save(self, path):
+        recording = self.recording()
+        np.savez_compressed(path, timestamps=recording.timestamps, landmarks=recording.landmarks,
+                            has_hand=recording.has_hand,
+                            image_size=np.array([self.image_width, self.image_height], dtype=np.int32))
+
+
+def load_recording(path):
+    with np.load(path) as data:
+        image_width, image_height = (int(v) for v in data["image_size"])
+        return LandmarkRecording(data["timestamps"], data["landmarks"], data["has_hand"], image_width, image_height)
+
+
+class CommandLog:
+    """Înlocuitor pentru PlayerActor.post: păstrează (momentul cadrului, comanda, argumentele)."""
+
+    def __init__(self):
+        self.commands = []
+
+    def __call__(self, command, *args, origin=None):
+        self.commands.append((origin, command, args))
+
+
+def replay_recording(recording, recognizer, batch_frames=REPLAY_BATCH_FRAMES):
+    """Trece înregistrarea prin recunoaștere, cât de repede se poate.
+
+    Trăsăturile și gestul fiecărui cadru se calculează vectorizat, pe loturi de batch_frames
+    cadre; doar decizia (debouncer, volum) rulează cadru cu cadru, ca în bucla live.
+    Comenzile ajung în recognizer.sink (de obicei un CommandLog) cu origin = momentul cadrului.
+    """
+    started = time.perf_counter()
+    hand_frames = 0
+    for begin in range(0, len(recording.timestamps), batch_frames):
+        end = begin + batch_frames
+        has_hand = recording.has_hand[begin:end]
+        # Cadrele fără mână rămân GESTURE_NONE: și ele contează pentru debouncer
+        codes = np.full(len(has_hand), GESTURE_NONE, dtype=np.int8)
+        volume_poses = np.zeros(len(has_hand), dtype=bool)
+        pinches = np.zeros(len(has_hand))
+        if has_hand.any():
+            points = recording.landmarks[begin:end][has_hand].astype(np.float64)
+            features = extract_hand_features_batch(points, recording.image_width, recording.image_height)
+            codes[has_hand] = classify_gesture_batch(features)
+            volume_poses[has_hand] = volume_pose_batch(features)
+            pinches[has_hand] = features.pinch_px
+        timestamps = recording.timestamps[begin:end].tolist()
+        for code, volume_pose, pinch_px, now in zip(codes.tolist(), volume_poses.tolist(), pinches.tolist(),
+                                                    timestamps):
+            recognizer.update_code(code, volume_pose, pinch_px, now, origin=now)
+        hand_frames += int(has_hand.sum())
+    elapsed = time.perf_counter() - started
+    frames = len(recording.timestamps)
+    duration = float(recording.timestamps[-1]) if frames else 0.0
+    commands = list(recognizer.sink.commands) if isinstance(recognizer.sink, CommandLog) else []
+    return ReplayResult(frames, hand_frames, duration, elapsed, commands)
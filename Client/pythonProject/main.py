@@ -1,35 +1,95 @@
 import cv2
 import mediapipe as mp
-import numpy as np
 import socket
 import time
 import wave
 import os
 import threading
 
+from adpcm import AdpcmEncoder, adpcm_max_frames
+from control_channel import ControlChannel, config_text
+from fanout import START_LEAD_MS, ControlGroup, FanoutPacketizer, open_audio_socket
+from gain import GainStage
+from gestures import GestureRecognizer
+from hand_arbiter import HandArbiter
+from hand_features import INDEX_FINGER_TIP, THUMB_TIP, extract_hand_features, is_volume_pose, landmarks_to_array
+from landmark_replay import LandmarkRecorder
+from normalizer import stream_bandwidth_bytes
+from pacing import make_pacer
+from packetizer import AUDIO_HEADER_SIZE, AudioFramer, Packetizer, choose_chunk_frames, max_datagram_payload
+from player_actor import PlayerActor
+from playlist import PlaylistStream, PreparedTrack, TrackPrefetcher, TransitionStats
+from roi_inference import RoiHandTracker
+from stage_timing import StageTimings
+from stats_dump import StatsDumper
+from track_index import TrackIndex
+from track_source import TrackLibrary, WavTrackSource
+from vision_pipeline import (FrameTimeStats, LatestFrameSlot, StageRate, format_stage_rates, run_capture_stage,
+                             run_worker_stage, start_stage_thread)
+from vision_pool import CvCamera, VisionService, mediapipe_detector
+
 
 mp_hands = mp.solutions.hands
-hands = mp_hands.Hands(
-    static_image_mode=False, max_num_hands=1,
-    min_detection_confidence=0.7, min_tracking_confidence=0.7)
 mp_drawing = mp.solutions.drawing_utils
 mp_drawing_styles = mp.solutions.drawing_styles
+hands = None  # create în blocul __main__: worker-ii din vision_pool reimportă modulul acesta
+hand_detector = None
+
+INFERENCE_MODE = "roi"  # "roi" = decupare în jurul mâinii + micșorare, "full" = cadrul complet
+ROI_WORK_WIDTH = 256
+ROI_MARGIN = 0.35
 
 
 PICO_IP = "192.168.57.15"
+PICO_IPS = [PICO_IP]  # multi-room: toate Pico-urile, ex. [PICO_IP, "192.168.57.16"]
 PICO_AUDIO_PORT = 12345
 PICO_CONTROL_PORT = 12346
-sock_audio = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+AUDIO_MULTICAST_GROUP = None  # ex. "239.0.0.57" (același în Server/main.py): un singur sendto pe pachet
+MULTIROOM_SYNC_START = True  # START cu moment comun, ca toate Pico-urile să pornească pe același eșantion
+STATS_DUMP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "stats.jsonl")
+STATS_DUMP_INTERVAL_SEC = 10  # 0 = fără fișier de statistici
+STATS_QUERY_TIMEOUT_SEC = 0.5
+stage_timings = StageTimings()
+sock_audio = open_audio_socket(AUDIO_MULTICAST_GROUP)
 sock_control = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+CONTROL_PROTOCOL = "binary"  # "binary" = cadre cu secvență confirmate de Pico (ACK), "text" = mesajele ASCII vechi
+# Un socket și un canal de control pe Pico: fiecare își primește singur ACK-urile
+control_sockets = [sock_control] + [socket.socket(socket.AF_INET, socket.SOCK_DGRAM) for _ in PICO_IPS[1:]]
+control_channels = [ControlChannel(sock, (ip, PICO_CONTROL_PORT), CONTROL_PROTOCOL, timings=stage_timings)
+                    for sock, ip in zip(control_sockets, PICO_IPS)]
+control = control_channels[0] if len(control_channels) == 1 else ControlGroup(control_channels)
 
 
 AUDIO_FILES_DIR = "C:/SM/WAV"
+TRACK_INDEX_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "track_index.json")
 AUDIO_CHUNK_SIZE_FRAMES = 256
+AUDIO_PACKET_SIZING = "adaptive"  # "adaptive" = după format/MTU/buffer Pico, "fixed" = AUDIO_CHUNK_SIZE_FRAMES
+AUDIO_MTU = 1500
+PICO_RECV_BUFFER_BYTES = 2048
+AUDIO_TARGET_PACKET_RATE = 50
+AUDIO_NORMALIZE = False  # True = downmix + 16 biți + resampling la formatul fix de mai jos, Pico configurat o dată
+NORMALIZE_TARGET_RATE = 22050
+NORMALIZE_TARGET_CHANNELS = 1
+AUDIO_CODEC = "pcm"  # "pcm" sau "adpcm" (IMA-ADPCM 4:1, doar pentru stream-uri pe 16 biți, 1-2 canale)
+AUDIO_FRAMING = True  # header cu secvență + poziție (CONFIG ...:SEQ), pentru jitter buffer-ul de pe Pico
+VOLUME_ON_PICO = True  # Pico aplică volumul (Q15, cu rampă) chiar înainte de I2S; clientul trimite la câștig unitar
+AUDIO_PACING_MODE = "deadline"  # "deadline" sau "sleep" (comportamentul vechi, pentru comparație)
+AUDIO_PACING_MAX_BURST = 8
+PLAYLIST_GAPLESS = True  # NEXT/PREV și sfârșitul melodiei fără repornirea streamer-ului, cu melodia pregătită în fundal
+PLAYLIST_PREBUFFER_MS = 300
+PLAYLIST_CROSSFADE_MS = 0  # > 0 = crossfade între melodii (doar PCM pe 16 biți)
 
 song_list = []
+track_library = TrackLibrary()
+track_index = TrackIndex(TRACK_INDEX_PATH)
 current_song_index = 0
-current_wave_file = None
+current_track = None
+current_stream = None
 current_song_params = {"framerate": 44100, "channels": 1, "sampwidth": 2}
+track_prefetcher = None
+transition_stats = TransitionStats()
+pending_transition = None  # (tip, index, momentul cererii) pentru primul pachet al unui streamer repornit
+last_audio_sent_at = None
 
 is_streaming_allowed = False
 playback_paused_by_gesture = True
@@ -37,47 +97,24 @@ audio_thread_obj = None
 audio_thread_stop_event = threading.Event()
 
 
-last_gesture_command_time = 0
-GESTURE_COMMAND_COOLDOWN = 1.5
-last_volume_command_time = 0
-VOLUME_COMMAND_COOLDOWN = 1.5
+GESTURE_CONFIRM_FRAMES = 4  # gest confirmat în 4 din ultimele 6 cadre (~100 ms la 30 FPS)
+GESTURE_WINDOW_FRAMES = 6
+VOLUME_SMOOTHING = 0.35
+VOLUME_MIN_STEP = 3
+VOLUME_MAX_SEND_HZ = 10
 current_volume_level = 75
+gesture_recognizer = None
+LANDMARK_RECORD_PATH = None  # ex. "sesiune.npz": landmark-urile fiecărui cadru, pentru benchmarks/bench_replay.py
+landmark_recorder = None
 
-
-
-def get_distance_2d(p1, p2, image_width, image_height):
-    x1, y1 = int(p1.x * image_width), int(p1.y * image_height)
-    x2, y2 = int(p2.x * image_width), int(p2.y * image_height)
-    return np.sqrt((x1 - x2) ** 2 + (y1 - y2) ** 2)
-
-
-def map_value(value, in_min, in_max, out_min, out_max):
-    value = max(in_min, min(value, in_max))
-    if in_min == in_max: return out_min
-    return int((value - in_min) * (out_max - out_min) / (in_max - in_min) + out_min)
-
-
-def is_finger_up(landmarks, finger_tip_id, finger_pip_id, finger_mcp_id):
-    tip_y = landmarks[finger_tip_id].y
-    pip_y = landmarks[finger_pip_id].y
-    mcp_y = landmarks[finger_mcp_id].y
-    return tip_y < pip_y and pip_y < (mcp_y + 0.02)
-
-
-def is_thumb_tucked(landmarks, image_width, image_height, threshold_px=50):
-    thumb_tip = landmarks[mp_hands.HandLandmark.THUMB_TIP]
-    index_mcp = landmarks[mp_hands.HandLandmark.INDEX_FINGER_MCP]
-    middle_mcp = landmarks[mp_hands.HandLandmark.MIDDLE_FINGER_MCP]
-    distance_to_index_mcp = get_distance_2d(thumb_tip, index_mcp, image_width, image_height)
-    distance_to_middle_mcp = get_distance_2d(thumb_tip, middle_mcp, image_width, image_height)
-    return distance_to_index_mcp < threshold_px or distance_to_middle_mcp < threshold_px
-
-
-def is_thumb_extended(landmarks, image_width, image_height, threshold_px=70):
-    thumb_tip = landmarks[mp_hands.HandLandmark.THUMB_TIP]
-    pinky_mcp = landmarks[mp_hands.HandLandmark.PINKY_MCP]
-    distance_pixels = get_distance_2d(thumb_tip, pinky_mcp, image_width, image_height)
-    return distance_pixels > threshold_px
+VISION_PIPELINE_MODE = True  # False = bucla inițială, totul secvențial pe un singur thread
+VISION_CAMERAS = [0]  # surse cv2.VideoCapture; cu mai multe, inferența rulează câte un proces pe cameră
+VISION_POOL_MODE = len(VISION_CAMERAS) > 1
+VISION_MAX_HANDS = 2  # mâini căutate pe fiecare cameră în modul cu mai multe camere
+RENDER_TARGET_FPS = 30
+PIPELINE_STATS_INTERVAL_SEC = 5.0
+hand_arbiter = None
+vision_service = None
 
 
 def load_song_list_from_dir():
@@ -88,124 +125,324 @@ def load_song_list_from_dir():
         return
     print(f"Se scanează directorul: '{AUDIO_FILES_DIR}'")
     try:
-        for f_name in sorted(os.listdir(AUDIO_FILES_DIR)):
-            if f_name.lower().endswith(".wav"):
-                song_list.append(os.path.join(AUDIO_FILES_DIR, f_name))
+        scan_start = time.perf_counter()
+        reindexed = track_index.refresh(AUDIO_FILES_DIR)
+        song_list = track_index.playable_paths()
         if song_list:
-            print(f"S-au încărcat {len(song_list)} melodii.")
+            print(f"S-au încărcat {len(song_list)} melodii ({reindexed} re-indexate) "
+                  f"în {(time.perf_counter() - scan_start) * 1000:.1f} ms.")
         else:
             print(f"Niciun fișier .wav găsit în {AUDIO_FILES_DIR}")
     except Exception as e:
         print(f"Eroare la scanarea directorului '{AUDIO_FILES_DIR}': {e}")
 
 
+def get_song_metadata(song_index):
+    if not (0 <= song_index < len(song_list)):
+        return None
+    return track_index.get(song_list[song_index])
+
+
+def get_song_header(song_index):
+    metadata = get_song_metadata(song_index)
+    if not metadata:
+        return None
+    # Formatul e deja cunoscut din index, fără a deschide fișierul.
+    return ({"framerate": metadata["framerate"], "channels": metadata["channels"],
+             "sampwidth": metadata["sampwidth"], "block_align": metadata["block_align"]},
+            metadata["data_offset"], metadata["data_size"])
+
+
+def prepare_track(song_index, shared=False):
+    # shared=True: sursa din track_library (PLAY sincron); altfel o sursă proprie, pentru prefetch.
+    filepath = song_list[song_index]
+    header = get_song_header(song_index)
+    source = track_library.open(filepath, header) if shared else WavTrackSource(filepath, header)
+    return PreparedTrack(song_index, source, get_stream_params(source.params()), AUDIO_NORMALIZE,
+                         owns_source=not shared)
+
+
+def prefetch_neighbours(song_index):
+    if not (PLAYLIST_GAPLESS and track_prefetcher and len(song_list) > 1):
+        return
+    neighbours = {(song_index + 1) % len(song_list), (song_index - 1) % len(song_list)}
+    track_prefetcher.keep_only(neighbours)
+    for index in sorted(neighbours, key=lambda i: i != (song_index + 1) % len(song_list)):
+        track_prefetcher.prefetch(index)
+
+
+def next_track_for_stream(song_index):
+    # Rulează pe thread-ul de streaming, la sfârșitul melodiei curente.
+    if not song_list:
+        return None
+    try:
+        return track_prefetcher.take_or_prepare((song_index + 1) % len(song_list))
+    except Exception as e:
+        print(f"Thread: Melodia următoare nu s-a putut deschide: {e}")
+        return None
+
+
+def get_stream_params(song_params):
+    if AUDIO_NORMALIZE:
+        return {"framerate": NORMALIZE_TARGET_RATE, "channels": NORMALIZE_TARGET_CHANNELS, "sampwidth": 2}
+    return song_params
+
+
+def get_stream_codec(stream_params):
+    if AUDIO_CODEC == "adpcm" and stream_params["sampwidth"] == 2 and stream_params["channels"] <= 2:
+        return "adpcm"
+    return "pcm"
+
+
+def uses_pico_gain(stream_params):
+    # Pico scalează doar ieșirea pe 16 biți (PCM sau ADPCM decodat); restul rămâne pe client.
+    return VOLUME_ON_PICO and stream_params["sampwidth"] == 2
+
+
+def get_audio_addrs():
+    if AUDIO_MULTICAST_GROUP:
+        return [(AUDIO_MULTICAST_GROUP, PICO_AUDIO_PORT)]
+    return [(ip, PICO_AUDIO_PORT) for ip in PICO_IPS]
+
+
+def get_stream_config(song_params):
+    return (song_params['framerate'], song_params['sampwidth'] * 8, song_params['channels'], AUDIO_FRAMING,
+            get_stream_codec(song_params) == "adpcm", uses_pico_gain(song_params))
+
+
 def open_song_for_streaming(song_index):
-    global current_wave_file, current_song_params, song_list
+    global current_track, current_stream, current_song_params, song_list
     if not (0 <= song_index < len(song_list)):
         print(f"Index melodie invalid: {song_index}. Lista are {len(song_list)} melodii.")
         return False
     filepath = song_list[song_index]
     try:
-        if current_wave_file:
-            current_wave_file.close()
-            current_wave_file = None
-        current_wave_file = wave.open(filepath, 'rb')
-        current_song_params["framerate"] = current_wave_file.getframerate()
-        current_song_params["channels"] = current_wave_file.getnchannels()
-        current_song_params["sampwidth"] = current_wave_file.getsampwidth()
+        current_track = None
+        prepared = prepare_track(song_index, shared=True)
+        current_track = prepared.source
+        current_stream = PlaylistStream(prepared, next_track_for_stream if PLAYLIST_GAPLESS else None,
+                                        PLAYLIST_CROSSFADE_MS)
+        prefetch_neighbours(song_index)
+        current_song_params.update(current_track.params())
         print(f"Deschis '{os.path.basename(filepath)}': {current_song_params['framerate']}Hz, "
               f"{current_song_params['sampwidth'] * 8}-bit, {current_song_params['channels']}ch")
-        config_msg = f"CONFIG:{current_song_params['framerate']}:{current_song_params['sampwidth'] * 8}:{current_song_params['channels']}"
-        for i in range(3):
-            try:
-                sock_control.sendto(config_msg.encode(), (PICO_IP, PICO_CONTROL_PORT))
-                print(f"Trimis la Pico ({i + 1}/3): {config_msg}")
-                time.sleep(0.05 + i * 0.02)
-            except Exception as e_send:
-                print(f"Eroare la trimiterea CONFIG ({i + 1}/3): {e_send}")
-                time.sleep(0.1)
+        stream_params = get_stream_params(current_song_params)
+        if AUDIO_NORMALIZE:
+            src_bw = stream_bandwidth_bytes(current_song_params["framerate"], current_song_params["sampwidth"],
+                                            current_song_params["channels"])
+            dst_bw = stream_bandwidth_bytes(stream_params["framerate"], stream_params["sampwidth"],
+                                            stream_params["channels"])
+            print(f"Normalizare la {stream_params['framerate']}Hz/16-bit/{stream_params['channels']}ch: "
+                  f"{src_bw / 1000:.1f} kB/s -> {dst_bw / 1000:.1f} kB/s")
+        stream_config = get_stream_config(stream_params)
+        try:
+            if control.send_config(*stream_config):
+                print(f"Trimis la Pico ({control.protocol}): {config_text(*stream_config)}")
+            else:
+                where = f" ({', '.join(control.last_missing)})" if isinstance(control, ControlGroup) else ""
+                print(f"AVERTISMENT: Pico{where} nu a confirmat {config_text(*stream_config)}, se continuă oricum.")
+        except Exception as e_send:
+            print(f"Eroare la trimiterea CONFIG: {e_send}")
         return True
     except wave.Error as e_wave:
         print(f"Eroare specifică WAV la deschiderea '{filepath}': {e_wave}")
-        current_wave_file = None
+        current_track = None
         return False
     except Exception as e:
         print(f"Eroare generală la deschiderea fișierului WAV {filepath}: {e}")
-        current_wave_file = None
+        current_track = None
         return False
 
 
-def scale_volume(audio_data_bytes, volume_percentage, sampwidth):
-    if not audio_data_bytes: return audio_data_bytes
-    if sampwidth != 2: return audio_data_bytes
-    if volume_percentage == 100: return audio_data_bytes
-    try:
-        audio_samples = np.frombuffer(audio_data_bytes, dtype=np.int16)
-        volume_factor = volume_percentage / 100.0
-        scaled_samples = np.clip(audio_samples * volume_factor, -32768, 32767).astype(np.int16)
-        return scaled_samples.tobytes()
-    except Exception as e:
-        print(f"Eroare la scalarea volumului: {e}")
-        return audio_data_bytes
+def record_transition(transition, sent_at, chunk_duration_ns):
+    # Măsurat la trimiterea primului pachet al melodiei noi: cât a trecut de la comandă și cât a
+    # întârziat pachetul față de ritmul stream-ului. O repornire cu CONFIG mai golește și jitter
+    # buffer-ul de pe Pico, deci golul auzit acolo e mai mare (vezi benchmarks/bench_playlist.py).
+    kind, song_index, requested_at = transition
+    to_audio_ms = (sent_at - requested_at) * 1000 if requested_at else 0.0
+    gap_ms = 0.0
+    if last_audio_sent_at is not None:
+        gap_ms = max(0.0, (sent_at - last_audio_sent_at) * 1000 - chunk_duration_ns / 1_000_000)
+    transition_stats.record(kind, to_audio_ms, gap_ms)
+    print(f"Thread: Tranziție {kind} la melodia {song_index}: comandă -> primul pachet {to_audio_ms:.1f} ms, "
+          f"gol {gap_ms:.1f} ms")
 
 
 def audio_streamer_thread():
-    global is_streaming_allowed, playback_paused_by_gesture, current_wave_file, current_song_params, audio_thread_stop_event, current_volume_level
+    global is_streaming_allowed, playback_paused_by_gesture, current_stream, audio_thread_stop_event, current_volume_level, pending_transition, last_audio_sent_at
 
     print("Thread streamer audio pornit.")
-    if not current_wave_file:
+    stream = current_stream
+    if not stream:
         print("Thread: Niciun fișier audio deschis. Oprire thread.")
         audio_thread_stop_event.set()
         return
 
-    if current_song_params["framerate"] <= 0:
-        print(f"Thread: Framerate invalid ({current_song_params['framerate']}). Oprire thread.")
+    stream_params = stream.out_params
+    if stream_params["framerate"] <= 0:
+        print(f"Thread: Framerate invalid ({stream_params['framerate']}). Oprire thread.")
         audio_thread_stop_event.set()
         return
 
-    frames_per_chunk = AUDIO_CHUNK_SIZE_FRAMES
-    chunk_duration_sec = frames_per_chunk / current_song_params["framerate"]
+    frame_size = stream_params["channels"] * stream_params["sampwidth"]
+    codec = get_stream_codec(stream_params)
+    encoder = AdpcmEncoder(stream_params["channels"]) if codec == "adpcm" else None
+    if codec == "pcm" and AUDIO_CODEC != "pcm":
+        print(f"Thread: Codec {AUDIO_CODEC} indisponibil pentru acest format, se trimite PCM.")
+    if AUDIO_PACKET_SIZING == "adaptive":
+        max_payload = max_datagram_payload(AUDIO_MTU, PICO_RECV_BUFFER_BYTES,
+                                           AUDIO_HEADER_SIZE if AUDIO_FRAMING else 0)
+        max_frames = adpcm_max_frames(max_payload, stream_params["channels"]) - 2 if encoder else None
+        # Stream-ul dă deja frame-uri în formatul de ieșire (normalizate), deci mărimea e exactă.
+        frames_per_chunk = choose_chunk_frames(frame_size, stream_params["framerate"], AUDIO_MTU,
+                                               PICO_RECV_BUFFER_BYTES,
+                                               header_bytes=AUDIO_HEADER_SIZE if AUDIO_FRAMING else 0,
+                                               target_packet_rate=AUDIO_TARGET_PACKET_RATE, max_frames=max_frames)
+    else:
+        frames_per_chunk = AUDIO_CHUNK_SIZE_FRAMES
+    print(f"Thread: {frames_per_chunk} frame-uri/pachet, codec {codec}, "
+          f"~{stream_params['framerate'] / frames_per_chunk:.0f} pachete/s")
+    chunk_duration_ns = frames_per_chunk * 1_000_000_000 // stream_params["framerate"]
+    pacer = make_pacer(AUDIO_PACING_MODE, chunk_duration_ns, AUDIO_PACING_MAX_BURST)
+    was_paused = False
+    gain_stage = None if uses_pico_gain(stream_params) else GainStage(frames_per_chunk * stream_params["channels"])
+    # Un singur stream (citire, gain, codare) pentru toate Pico-urile; doar sendto se repetă
+    audio_addrs = get_audio_addrs()
+    if len(audio_addrs) > 1:
+        packetizer = FanoutPacketizer(sock_audio, audio_addrs, PICO_RECV_BUFFER_BYTES)
+    else:
+        packetizer = Packetizer(sock_audio, audio_addrs[0], PICO_RECV_BUFFER_BYTES)
+    framer = AudioFramer()
+    if MULTIROOM_SYNC_START and AUDIO_FRAMING and isinstance(control, ControlGroup):
+        start_at = control.send_start(framer.sample_pos)
+        if start_at is not None:
+            # Până la pornire Pico-urile doar adună pachete: se trimite doar cât încape în jitter buffer
+            time.sleep(max(0.0, start_at - START_LEAD_MS / 1000 - time.monotonic()))
+    pacer.start()
 
     while not audio_thread_stop_event.is_set():
         if not is_streaming_allowed or playback_paused_by_gesture:
+            was_paused = True
+            last_audio_sent_at = None
             time.sleep(0.05)
             continue
+        if was_paused:
+            pacer.start()
+            packetizer.reset_stats()
+            was_paused = False
 
-        if not current_wave_file:
+        if not current_stream:
             print("Thread: Fișierul audio a devenit None. Oprire.")
             break
 
+        # Citirea vine după termen, ca un NEXT primit între timp să intre chiar în pachetul acesta.
+        pacer.wait()
+        stage_started = time.perf_counter()
         try:
-            audio_frames = current_wave_file.readframes(frames_per_chunk)
+            audio_frames = stream.read(frames_per_chunk)
         except (wave.Error, Exception) as e_read:
             print(f"Thread: Eroare la citirea frame-urilor WAV: {e_read}")
             break
+        stage_timings.stop("stream_read", stage_started)
 
         if not audio_frames:
-            print("Thread: Sfârșitul melodiei.")
+            if stream.ended_with is not None and stream.ended_with >= 0:
+                # Melodia următoare are alt format: e nevoie de CONFIG nou și de un streamer nou.
+                print("Thread: Sfârșitul melodiei, următoarea are alt format.")
+                pending_transition = ("restart", stream.ended_with, None)
+                player.post("ADVANCE", stream.ended_with)
+            else:
+                print("Thread: Sfârșitul melodiei.")
             audio_thread_stop_event.set()
             break
 
-        processed_audio_frames = scale_volume(audio_frames, current_volume_level, current_song_params["sampwidth"])
+        transition = stream.last_transition
+        if transition is None and pending_transition is not None:
+            transition, pending_transition = pending_transition, None
+        processed_audio_frames = audio_frames
+        if gain_stage:
+            stage_started = time.perf_counter()
+            processed_audio_frames = gain_stage.process(audio_frames, current_volume_level, stream_params["sampwidth"])
+            stage_timings.stop("stream_scale", stage_started)
+        sent_frames = len(audio_frames) // frame_size
+        if encoder:
+            stage_started = time.perf_counter()
+            processed_audio_frames = encoder.encode(processed_audio_frames)
+            sent_frames = encoder.last_frames
+            stage_timings.stop("stream_encode", stage_started)
+        stage_started = time.perf_counter()
         try:
-            sock_audio.sendto(processed_audio_frames, (PICO_IP, PICO_AUDIO_PORT))
+            header = framer.next_header(sent_frames) if AUDIO_FRAMING else None
+            packetizer.send(processed_audio_frames, header)
         except (socket.error, Exception) as e_sock:
             print(f"Thread: Eroare socket la trimiterea datelor audio: {e_sock}")
             audio_thread_stop_event.set()
             break
+        stage_timings.stop("stream_send", stage_started)
+        sent_at = time.monotonic()
+        if transition:
+            record_transition(transition, sent_at, chunk_duration_ns)
+            if transition[0] == "auto":
+                player.post("TRACK_CHANGED", transition[1])
+        last_audio_sent_at = sent_at
+
+    print(f"Thread streamer audio oprit. Pacing ({pacer.mode}): {pacer.stats.as_dict()}")
+    print(f"Thread: Pachete audio: {packetizer.stats()}")
+
+
+def switch_track_gapless(action):
+    """NEXT/PREV fără oprirea streamer-ului: melodia pregătită în fundal intră la următorul pachet."""
+    global current_song_index, current_track, current_song_params
+    if not (PLAYLIST_GAPLESS and song_list and current_stream and audio_thread_obj and audio_thread_obj.is_alive()
+            and is_streaming_allowed and not playback_paused_by_gesture):
+        return False
+    step = 1 if action == "NEXT" else -1
+    song_index = (current_song_index + step) % len(song_list)
+    try:
+        prepared = track_prefetcher.take_or_prepare(song_index)
+    except Exception as e:
+        print(f"MANAGE_AUDIO: Melodia {song_index} nu s-a putut pregăti: {e}")
+        return False
+    if not current_stream.compatible(prepared):
+        # Alt format: Pico are nevoie de CONFIG nou, deci calea veche cu repornire.
+        prepared.close()
+        return False
+    current_stream.switch_to(prepared, player.current_posted_at)
+    current_song_index = song_index
+    current_track = prepared.source
+    current_song_params.update(prepared.source.params())
+    print(f"MANAGE_AUDIO: {action} fără întrerupere la melodia {song_index} "
+          f"(prefetch: {track_prefetcher.stats()})")
+    try:
+        control.send_command(action)
+    except Exception as e:
+        print(f"Eroare trimitere {action} la Pico: {e}")
+    prefetch_neighbours(song_index)
+    return True
 
 
-        sleep_time = chunk_duration_sec
-        time.sleep(sleep_time)
-
-    print("Thread streamer audio oprit.")
+def follow_auto_advance(song_index, restart=False):
+    """Streamer-ul a trecut singur la melodia următoare; restart=True dacă aceasta are alt format."""
+    global current_song_index, current_track, current_song_params
+    current_song_index = song_index
+    if restart:
+        manage_audio_thread("PLAY")
+        return
+    if current_stream:
+        current_track = current_stream.current.source
+        current_song_params.update(current_track.params())
+    print(f"PLAYLIST: Trecere automată la melodia {song_index}")
+    prefetch_neighbours(song_index)
 
 
 def manage_audio_thread(action):
-    global audio_thread_obj, audio_thread_stop_event, is_streaming_allowed, playback_paused_by_gesture, current_song_index, current_wave_file
+    global audio_thread_obj, audio_thread_stop_event, is_streaming_allowed, playback_paused_by_gesture, current_song_index, current_track, current_stream, pending_transition
 
     print(f"MANAGE_AUDIO: Acțiune = {action}")
 
+    if action in ("NEXT", "PREV") and switch_track_gapless(action):
+        return
+
     if audio_thread_obj and audio_thread_obj.is_alive():
         print("MANAGE_AUDIO: Se semnalizează oprirea thread-ului audio existent...")
         audio_thread_stop_event.set()
@@ -214,12 +451,11 @@ def manage_audio_thread(action):
             print("MANAGE_AUDIO: AVERTISMENT - Thread-ul audio nu s-a oprit la timp!")
     audio_thread_obj = None
 
-    if current_wave_file:
-        try:
-            current_wave_file.close()
-        except wave.Error:
-            pass
-        current_wave_file = None
+    # Sursa rămâne deschisă în track_library, pentru comutare instantanee la următorul PLAY.
+    current_track = None
+    if current_stream:
+        current_stream.close()
+    current_stream = None
 
     is_streaming_allowed = False
     playback_paused_by_gesture = True
@@ -227,7 +463,7 @@ def manage_audio_thread(action):
 
     if action == "PLAY":
         if not open_song_for_streaming(current_song_index): return
-        if current_wave_file:
+        if current_track:
             is_streaming_allowed = True
             playback_paused_by_gesture = False
             audio_thread_obj = threading.Thread(target=audio_streamer_thread)
@@ -235,7 +471,7 @@ def manage_audio_thread(action):
             audio_thread_obj.start()
             print("MANAGE_AUDIO: Stream audio pornit/reluat.")
             try:
-                sock_control.sendto("PLAY".encode(), (PICO_IP, PICO_CONTROL_PORT))
+                control.send_command("PLAY")
             except Exception as e:
                 print(f"Eroare trimitere PLAY la Pico: {e}")
         else:
@@ -246,7 +482,7 @@ def manage_audio_thread(action):
         playback_paused_by_gesture = True
         print("MANAGE_AUDIO: Stream audio pe pauză.")
         try:
-            sock_control.sendto("PAUSE".encode(), (PICO_IP, PICO_CONTROL_PORT))
+            control.send_command("PAUSE")
         except Exception as e:
             print(f"Eroare trimitere PAUSE la Pico: {e}")
 
@@ -255,9 +491,10 @@ def manage_audio_thread(action):
             current_song_index = (current_song_index + 1) % len(song_list)
             print(f"MANAGE_AUDIO: Trecere la melodia următoare (index {current_song_index})")
             try:
-                sock_control.sendto("NEXT".encode(), (PICO_IP, PICO_CONTROL_PORT))
+                control.send_command("NEXT")
             except Exception as e:
                 print(f"Eroare trimitere NEXT la Pico: {e}")
+            pending_transition = ("restart", current_song_index, player.current_posted_at)
             manage_audio_thread("PLAY")
 
     elif action == "PREV":
@@ -265,9 +502,10 @@ def manage_audio_thread(action):
             current_song_index = (current_song_index - 1 + len(song_list)) % len(song_list)
             print(f"MANAGE_AUDIO: Trecere la melodia anterioară (index {current_song_index})")
             try:
-                sock_control.sendto("PREV".encode(), (PICO_IP, PICO_CONTROL_PORT))
+                control.send_command("PREV")
             except Exception as e:
                 print(f"Eroare trimitere PREV la Pico: {e}")
+            pending_transition = ("restart", current_song_index, player.current_posted_at)
             manage_audio_thread("PLAY")
 
     elif action == "STOP_FULL":
@@ -275,138 +513,128 @@ def manage_audio_thread(action):
         playback_paused_by_gesture = False
         print("MANAGE_AUDIO: Stream audio oprit complet.")
         try:
-            sock_control.sendto("STOP".encode(), (PICO_IP, PICO_CONTROL_PORT))
+            control.send_command("STOP")
         except Exception as e:
             print(f"Eroare trimitere STOP la Pico: {e}")
 
 
-def recognize_gestures_and_volume(hand_landmarks, image_width, image_height):
-    global last_gesture_command_time, last_volume_command_time, current_volume_level
-    landmarks = hand_landmarks.landmark
-    L = mp_hands.HandLandmark
-
-    thumb_tckd = is_thumb_tucked(landmarks, image_width, image_height, threshold_px=45)
-    thumb_xtnd = is_thumb_extended(landmarks, image_width, image_height, threshold_px=75)
-    index_up = is_finger_up(landmarks, L.INDEX_FINGER_TIP, L.INDEX_FINGER_PIP, L.INDEX_FINGER_MCP)
-    middle_up = is_finger_up(landmarks, L.MIDDLE_FINGER_TIP, L.MIDDLE_FINGER_PIP, L.MIDDLE_FINGER_MCP)
-    ring_up = is_finger_up(landmarks, L.RING_FINGER_TIP, L.RING_FINGER_PIP, L.RING_FINGER_MCP)
-    pinky_up = is_finger_up(landmarks, L.PINKY_TIP, L.PINKY_PIP, L.PINKY_MCP)
-
-    gesture_action_taken = None
-    current_time = time.time()
-
-    if current_time - last_gesture_command_time > GESTURE_COMMAND_COOLDOWN:
-        if thumb_xtnd and index_up and middle_up and ring_up and pinky_up:
-            manage_audio_thread("PLAY");
-            gesture_action_taken = "PLAY"
-        elif not index_up and not middle_up and not ring_up and not pinky_up and thumb_tckd:
-            manage_audio_thread("PAUSE");
-            gesture_action_taken = "PAUSE"
-        elif index_up and middle_up and not ring_up and not pinky_up and thumb_tckd:
-            manage_audio_thread("NEXT");
-            gesture_action_taken = "NEXT"
-        elif index_up and not middle_up and not ring_up and pinky_up and thumb_tckd:
-            manage_audio_thread("PREV");
-            gesture_action_taken = "PREV"
-
-        if gesture_action_taken:
-            print(f"Gesture Action: {gesture_action_taken}")
-            last_gesture_command_time = current_time
-
-    if current_time - last_volume_command_time > VOLUME_COMMAND_COOLDOWN:
-        if thumb_xtnd and index_up and not middle_up and not ring_up and not pinky_up:
-            thumb_lm = landmarks[L.THUMB_TIP]
-            index_lm = landmarks[L.INDEX_FINGER_TIP]
-            distance_pixels = get_distance_2d(thumb_lm, index_lm, image_width, image_height)
-
-            min_expected_dist = 20
-            max_expected_dist = 220
-            new_volume = map_value(distance_pixels, min_expected_dist, max_expected_dist, 0, 100)
-
-            if abs(new_volume - current_volume_level) > 2 or new_volume == 0 or new_volume == 100:
-                current_volume_level = new_volume
-                print(f"Laptop Volume Level: {current_volume_level}% (Dist: {distance_pixels:.0f}px)")
-                last_volume_command_time = current_time
-
-                vol_msg = f"VOL:{current_volume_level}"
-                try:
-                    sock_control.sendto(vol_msg.encode(), (PICO_IP, PICO_CONTROL_PORT))
-                    print(f"Sent to Pico: {vol_msg}")
-                except Exception as e_send_vol:
-                    print(f"Error sending volume to Pico: {e_send_vol}")
+def handle_player_command(command, *args):
+    # Rulează doar pe thread-ul PlayerActor.
+    if command == "VOL":
+        try:
+            control.send_volume(args[0])
+            print(f"Sent to Pico: VOL:{args[0]}")
+        except Exception as e_send_vol:
+            print(f"Error sending volume to Pico: {e_send_vol}")
+    elif command == "TRACK_CHANGED":
+        follow_auto_advance(args[0])
+    elif command == "ADVANCE":
+        follow_auto_advance(args[0], restart=True)
+    else:
+        manage_audio_thread(command)
+
 
+def recognize_gestures_and_volume(features, captured_at=None):
+    # features=None: cadru fără mână, tot trimis debouncer-ului ca schimbare de poză
+    global current_volume_level
+    previous_volume = gesture_recognizer.volume
+    if features is None:
+        gesture_action_taken, new_volume = gesture_recognizer.update_no_hand(time.monotonic(), captured_at)
+    else:
+        gesture_action_taken, new_volume = gesture_recognizer.update(features, time.monotonic(), captured_at)
+    if gesture_action_taken:
+        print(f"Gesture Action: {gesture_action_taken}")
+    if new_volume != previous_volume:
+        current_volume_level = new_volume
+        print(f"Laptop Volume Level: {current_volume_level}%")
     return gesture_action_taken, current_volume_level
 
 
-load_song_list_from_dir()
-if not song_list: print("Nicio melodie găsită. Programul se va opri."); exit()
-
-cap = cv2.VideoCapture(0)
-if not cap.isOpened(): print("Cannot open camera"); exit()
-ret, frame_test = cap.read()
-if not ret: print("Cannot get frame dimensions"); cap.release(); exit()
-image_h, image_w, _ = frame_test.shape
-print(f"Camera resolution: {image_w}x{image_h}")
-print(f"Streaming audio to {PICO_IP}:{PICO_AUDIO_PORT}")
-print(f"Sending control commands to {PICO_IP}:{PICO_CONTROL_PORT}")
-print("Gesturi:")
-print("- Palma deschisă (toate degetele extinse): PLAY")
-print("- Pumn strâns (degetele strânse, police ascuns): PAUSE")
-print("- Index și Mijlociu sus (police ascuns): NEXT")
-print("- Index și Deget Mic sus (police ascuns): PREV")
-print("- Police și Index extinse (celelalte strânse), distanța variază: Volum")
-
-active_command_display = "INIT"
-
-if not open_song_for_streaming(current_song_index):
-    print("Nu s-a putut deschide prima melodie pentru configurare. Ieșire.")
-    if cap.isOpened(): cap.release()
-    exit()
-manage_audio_thread("PAUSE")
-time.sleep(0.2)
-try:
-
-    initial_vol_msg = f"VOL:{current_volume_level}"
-    sock_control.sendto(initial_vol_msg.encode(), (PICO_IP, PICO_CONTROL_PORT))
-    print(f"Sent initial volume to Pico: {initial_vol_msg}")
-except Exception as e:
-    print(f"Error sending initial volume: {e}")
-
-while cap.isOpened():
-    success, image = cap.read()
-    if not success:
-        print("Ignored empty camera frame.")
-        continue
-    image = cv2.flip(image, 1)
+def collect_stats():
+    # Rulează pe thread-ul StatsDumper; cererea STATS așteaptă răspunsul Pico cel mult STATS_QUERY_TIMEOUT_SEC.
+    try:
+        pico_stats = control.query_stats(STATS_QUERY_TIMEOUT_SEC)
+    except Exception as e:
+        print(f"Stats: Eroare la cererea STATS: {e}")
+        pico_stats = None
+    inference_stats = vision_service.stats() if vision_service else hand_detector.stats()
+    return {"stages": stage_timings.snapshot(), "player": player.stats(), "control": control.stats(),
+            "transitions": transition_stats.summary(), "inference": inference_stats,
+            "arbiter": hand_arbiter.stats() if hand_arbiter else None, "pico": pico_stats}
+
+
+def detect_and_decide(image, captured_at):
+    # Conversie de culoare, hands.process și decizia de gest, fiecare cu timpul ei în stage_timings.
+    global active_command_display
+    stage_started = time.perf_counter()
     image_rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-    results = hands.process(image_rgb)
-
-    if results.multi_hand_landmarks:
+    stage_timings.stop("color_convert", stage_started)
+    stage_started = time.perf_counter()
+    results = hand_detector.process(image_rgb)
+    stage_timings.stop("hands_process", stage_started)
+    hands_with_features = []
+    if not results.multi_hand_landmarks:
+        if landmark_recorder:
+            landmark_recorder.add(captured_at)
+        recognize_gestures_and_volume(None, captured_at)
+    else:
         for hand_landmarks in results.multi_hand_landmarks:
-            mp_drawing.draw_landmarks(image, hand_landmarks, mp_hands.HAND_CONNECTIONS,
-                                      mp_drawing_styles.get_default_hand_landmarks_style(),
-                                      mp_drawing_styles.get_default_hand_connections_style())
-
-            recognized_gesture_action, _ = recognize_gestures_and_volume(hand_landmarks, image_w, image_h)
+            stage_started = time.perf_counter()
+            # extract_hand_features citește direct landmark-urile; ndarray-ul e necesar doar pentru înregistrare
+            points = hand_landmarks.landmark
+            if landmark_recorder and not hands_with_features:
+                points = landmarks_to_array(points)
+                landmark_recorder.add(captured_at, points)
+            features = extract_hand_features(points, image_w, image_h)
+            hands_with_features.append((hand_landmarks, features))
+            recognized_gesture_action, _ = recognize_gestures_and_volume(features, captured_at)
             if recognized_gesture_action:
                 active_command_display = recognized_gesture_action
-
-            L = mp_hands.HandLandmark
-            thumb_xtnd_draw = is_thumb_extended(hand_landmarks.landmark, image_w, image_h)
-            index_up_draw = is_finger_up(hand_landmarks.landmark, L.INDEX_FINGER_TIP, L.INDEX_FINGER_PIP,
-                                         L.INDEX_FINGER_MCP)
-            middle_up_draw = is_finger_up(hand_landmarks.landmark, L.MIDDLE_FINGER_TIP, L.MIDDLE_FINGER_PIP,
-                                          L.MIDDLE_FINGER_MCP)
-            ring_up_draw = is_finger_up(hand_landmarks.landmark, L.RING_FINGER_TIP, L.RING_FINGER_PIP,
-                                        L.RING_FINGER_MCP)
-            pinky_up_draw = is_finger_up(hand_landmarks.landmark, L.PINKY_TIP, L.PINKY_PIP, L.PINKY_MCP)
-
-            if thumb_xtnd_draw and index_up_draw and not middle_up_draw and not ring_up_draw and not pinky_up_draw:
-                thumb_tip_pt = hand_landmarks.landmark[L.THUMB_TIP]
-                index_tip_pt = hand_landmarks.landmark[L.INDEX_FINGER_TIP]
-                cv2.line(image, (int(thumb_tip_pt.x * image_w), int(thumb_tip_pt.y * image_h)),
-                         (int(index_tip_pt.x * image_w), int(index_tip_pt.y * image_h)), (255, 0, 255), 3)
-
+            stage_timings.stop("gesture_decision", stage_started)
+    return hands_with_features
+
+
+def on_pool_result(camera_id, hands_with_features, captured_at):
+    # Rulează pe thread-ul colector al VisionService, pentru fiecare cadru al fiecărei camere
+    global active_command_display, current_volume_level
+    stage_started = time.perf_counter()
+    gesture_action_taken = hand_arbiter.update(camera_id, [features for _points, features in hands_with_features],
+                                               time.monotonic(), captured_at)
+    stage_timings.stop("gesture_decision", stage_started)
+    if gesture_action_taken:
+        print(f"Gesture Action: {gesture_action_taken} ({hand_arbiter.controller.name()})")
+        active_command_display = gesture_action_taken
+    if gesture_recognizer.volume != current_volume_level:
+        current_volume_level = gesture_recognizer.volume
+        print(f"Laptop Volume Level: {current_volume_level}%")
+
+
+WINDOW_TITLE = 'Hand Gesture Music Streamer - Laptop'
+
+
+def draw_hand_overlay(image, hand_landmarks, features):
+    mp_drawing.draw_landmarks(image, hand_landmarks, mp_hands.HAND_CONNECTIONS,
+                              mp_drawing_styles.get_default_hand_landmarks_style(),
+                              mp_drawing_styles.get_default_hand_connections_style())
+    if is_volume_pose(features):
+        thumb_tip_pt = tuple(features.points_px[THUMB_TIP].tolist())
+        index_tip_pt = tuple(features.points_px[INDEX_FINGER_TIP].tolist())
+        cv2.line(image, thumb_tip_pt, index_tip_pt, (255, 0, 255), 3)
+
+
+def draw_hand_points(image, features, color):
+    # Ca draw_hand_overlay, dar din punctele în pixeli: în modul cu mai multe camere nu există
+    # obiectele landmark ale MediaPipe în procesul principal
+    points = [tuple(point) for point in features.points_px.tolist()]
+    for start, end in mp_hands.HAND_CONNECTIONS:
+        cv2.line(image, points[start], points[end], color, 2)
+    for point in points:
+        cv2.circle(image, point, 3, color, -1)
+    if is_volume_pose(features):
+        cv2.line(image, points[THUMB_TIP], points[INDEX_FINGER_TIP], (255, 0, 255), 3)
+
+
+def draw_status_text(image, extra_text=None):
     current_display_items = []
     if not is_streaming_allowed:
         state_text = "STOPPED"
@@ -424,17 +652,225 @@ while cap.isOpened():
 
     display_text_on_screen = " | ".join(current_display_items)
     cv2.putText(image, display_text_on_screen, (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2, cv2.LINE_AA)
+    if extra_text:
+        cv2.putText(image, extra_text, (10, 60), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 255), 1, cv2.LINE_AA)
+
+
+def run_vision_pipeline():
+    global active_command_display
+    stop_event = threading.Event()
+    capture_slot = LatestFrameSlot()
+    render_slot = LatestFrameSlot()
+    capture_rate = StageRate("Capture")
+    inference_rate = StageRate("Inference")
+    render_rate = StageRate("Render")
+    stage_rates = (capture_rate, inference_rate, render_rate)
+    render_frame_times = FrameTimeStats()
+
+    def inference_step(item):
+        image, captured_at = item
+        return image, detect_and_decide(image, captured_at), captured_at
+
+    capture_thread = start_stage_thread("capture", run_capture_stage, cap, capture_slot, stop_event, capture_rate,
+                                        lambda img: cv2.flip(img, 1), stage_timings)
+    inference_thread = start_stage_thread("inference", run_worker_stage, capture_slot, render_slot, inference_step,
+                                          stop_event, inference_rate)
+    print("Pipeline viziune pornit: captură / inferență / randare pe thread-uri separate.")
+
+    last_output = None
+    last_stats_report = time.monotonic()
+    while not stop_event.is_set():
+        output = render_slot.get(timeout=1.0 / RENDER_TARGET_FPS)
+        if output is not None:
+            last_output = output
+        elif render_slot.closed:
+            break
+
+        if last_output is not None:
+            image, hands_with_features, captured_at = last_output
+            frame = image.copy()
+            for hand_landmarks, features in hands_with_features:
+                draw_hand_overlay(frame, hand_landmarks, features)
+            age_ms = (time.monotonic() - captured_at) * 1000
+            draw_status_text(frame, f"{format_stage_rates(stage_rates)} | Age: {age_ms:.0f}ms")
+            cv2.imshow(WINDOW_TITLE, frame)
+            render_rate.tick()
+            render_frame_times.tick()
+        if cv2.waitKey(1) & 0xFF == ord('q'):
+            break
 
-    cv2.imshow('Hand Gesture Music Streamer - Laptop', image)
-    if cv2.waitKey(5) & 0xFF == ord('q'):
-        break
-
-print("Se oprește stream-ul audio...")
-manage_audio_thread("STOP_FULL")
-print("Se eliberează resursele...")
-if cap.isOpened(): cap.release()
-cv2.destroyAllWindows()
-if 'hands' in globals() and hands: hands.close()
-if sock_audio: sock_audio.close()
-if sock_control: sock_control.close()
-print("Program laptop încheiat.")
\ No newline at end of file
+        now = time.monotonic()
+        if now - last_stats_report >= PIPELINE_STATS_INTERVAL_SEC:
+            print(f"Pipeline: {format_stage_rates(stage_rates)} | "
+                  f"Cadre suprascrise: captură={capture_slot.overwritten}, randare={render_slot.overwritten} | "
+                  f"Timp cadru: {render_frame_times.format()}")
+            last_stats_report = now
+
+    stop_event.set()
+    capture_thread.join(timeout=1.0)
+    inference_thread.join(timeout=1.0)
+    print(f"Pipeline viziune oprit. {format_stage_rates(stage_rates)} | Timp cadru: {render_frame_times.format()}")
+    print(f"Inferență ({INFERENCE_MODE}): {hand_detector.stats()}")
+    print(f"Etape: {stage_timings.format()}")
+
+
+def tile_camera_frames(frames):
+    # Cadrele alăturate, la înălțimea primei camere
+    height = frames[0].shape[0]
+    resized = [frame if frame.shape[0] == height
+               else cv2.resize(frame, (frame.shape[1] * height // frame.shape[0], height)) for frame in frames]
+    return resized[0] if len(resized) == 1 else cv2.hconcat(resized)
+
+
+def run_vision_pool(cameras):
+    global vision_service
+    vision_service = VisionService(cameras, on_pool_result, mediapipe_detector,
+                                   (VISION_MAX_HANDS, ROI_WORK_WIDTH, ROI_MARGIN), timings=stage_timings).start()
+    render_rate = StageRate("Render")
+    render_frame_times = FrameTimeStats()
+    print(f"Viziune pe {len(cameras)} camere: câte un proces de inferență pe cameră, "
+          f"o singură mână are controlul player-ului.")
+
+    last_stats_report = time.monotonic()
+    while True:
+        controller = hand_arbiter.controller
+        tiles = []
+        for camera_id in range(len(cameras)):
+            frame = vision_service.frame(camera_id)
+            latest = vision_service.latest[camera_id]
+            if frame is None or latest is None:
+                continue
+            for _points, features in latest[0]:
+                in_control = controller is not None and features is controller.features
+                draw_hand_points(frame, features, (0, 255, 0) if in_control else (160, 160, 160))
+            tiles.append(frame)
+        if tiles:
+            frame = tile_camera_frames(tiles)
+            control_text = controller.name() if controller else "-"
+            draw_status_text(frame, f"{format_stage_rates(vision_service.rates())} | Control: {control_text}")
+            cv2.imshow(WINDOW_TITLE, frame)
+            render_rate.tick()
+            render_frame_times.tick()
+        if cv2.waitKey(max(1, 1000 // RENDER_TARGET_FPS)) & 0xFF == ord('q'):
+            break
+
+        now = time.monotonic()
+        if now - last_stats_report >= PIPELINE_STATS_INTERVAL_SEC:
+            print(f"Pipeline: {format_stage_rates(vision_service.rates() + [render_rate])} | "
+                  f"Timp cadru: {render_frame_times.format()} | Arbitru: {hand_arbiter.stats()}")
+            last_stats_report = now
+
+    vision_service.close()
+    for camera in cameras:
+        camera.release()
+    print(f"Viziune oprită. Camere: {vision_service.stats()} | Arbitru: {hand_arbiter.stats()}")
+    print(f"Etape: {stage_timings.format()}")
+
+
+if __name__ == "__main__":
+    # Doar la rularea directă: cu VISION_POOL_MODE, procesele worker reimportă acest modul
+    load_song_list_from_dir()
+    if not song_list: print("Nicio melodie găsită. Programul se va opri."); exit()
+
+    cap = None
+    cameras = []
+    if VISION_POOL_MODE:
+        for source in VISION_CAMERAS:
+            cameras.append(CvCamera(source))
+            if cameras[-1].shape is None: print(f"Cannot open camera {source}"); exit()
+            print(f"Camera {source} resolution: {cameras[-1].shape[1]}x{cameras[-1].shape[0]}")
+        image_h, image_w, _ = cameras[0].shape
+    else:
+        # Modul ROI decupează singur în jurul mâinii, deci MediaPipe nu trebuie să mai urmărească
+        hands = mp_hands.Hands(
+            static_image_mode=INFERENCE_MODE == "roi", max_num_hands=1,
+            min_detection_confidence=0.7, min_tracking_confidence=0.7)
+        hand_detector = RoiHandTracker(hands, work_width=ROI_WORK_WIDTH, margin=ROI_MARGIN,
+                                       enabled=INFERENCE_MODE == "roi")
+        cap = cv2.VideoCapture(0)
+        if not cap.isOpened(): print("Cannot open camera"); exit()
+        ret, frame_test = cap.read()
+        if not ret: print("Cannot get frame dimensions"); cap.release(); exit()
+        image_h, image_w, _ = frame_test.shape
+        print(f"Camera resolution: {image_w}x{image_h}")
+    print(f"Streaming audio to {', '.join(f'{ip}:{port}' for ip, port in get_audio_addrs())}")
+    print(f"Sending control commands to {', '.join(PICO_IPS)} (port {PICO_CONTROL_PORT})")
+    print("Gesturi:")
+    print("- Palma deschisă (toate degetele extinse): PLAY")
+    print("- Pumn strâns (degetele strânse, police ascuns): PAUSE")
+    print("- Index și Mijlociu sus (police ascuns): NEXT")
+    print("- Index și Deget Mic sus (police ascuns): PREV")
+    print("- Police și Index extinse (celelalte strânse), distanța variază: Volum")
+
+    active_command_display = "INIT"
+
+    track_prefetcher = TrackPrefetcher(prepare_track, PLAYLIST_PREBUFFER_MS)
+    if not open_song_for_streaming(current_song_index):
+        print("Nu s-a putut deschide prima melodie pentru configurare. Ieșire.")
+        if cap and cap.isOpened(): cap.release()
+        exit()
+    # De aici încolo doar thread-ul player-ului atinge fișierul, streamer-ul și canalul de control
+    # (în afară de cererile STATS ale stats_dumper, care nu schimbă starea player-ului).
+    player = PlayerActor(handle_player_command, timings=stage_timings)
+    player.post("PAUSE")
+    player.post("VOL", current_volume_level)
+    gesture_recognizer = GestureRecognizer(player.post, current_volume_level, GESTURE_CONFIRM_FRAMES,
+                                           GESTURE_WINDOW_FRAMES, VOLUME_SMOOTHING, VOLUME_MIN_STEP, VOLUME_MAX_SEND_HZ)
+    if VISION_POOL_MODE:
+        hand_arbiter = HandArbiter(gesture_recognizer)
+    elif LANDMARK_RECORD_PATH:
+        landmark_recorder = LandmarkRecorder(image_w, image_h)
+        print(f"Se înregistrează landmark-urile în {LANDMARK_RECORD_PATH}")
+    stats_dumper = None
+    if STATS_DUMP_INTERVAL_SEC > 0:
+        stats_dumper = StatsDumper(STATS_DUMP_PATH, STATS_DUMP_INTERVAL_SEC, collect_stats)
+        stats_dumper.start()
+        print(f"Statistici în {STATS_DUMP_PATH} la fiecare {STATS_DUMP_INTERVAL_SEC} s")
+
+    if VISION_POOL_MODE:
+        run_vision_pool(cameras)
+    elif VISION_PIPELINE_MODE:
+        run_vision_pipeline()
+    else:
+        loop_frame_times = FrameTimeStats()
+        while cap.isOpened():
+            read_started = time.perf_counter()
+            success, image = cap.read()
+            stage_timings.stop("camera_read", read_started)
+            if not success:
+                print("Ignored empty camera frame.")
+                continue
+            captured_at = time.monotonic()
+            image = cv2.flip(image, 1)
+            for hand_landmarks, features in detect_and_decide(image, captured_at):
+                draw_hand_overlay(image, hand_landmarks, features)
+
+            draw_status_text(image)
+            cv2.imshow(WINDOW_TITLE, image)
+            loop_frame_times.tick()
+            if cv2.waitKey(5) & 0xFF == ord('q'):
+                break
+
+    if not VISION_POOL_MODE and not VISION_PIPELINE_MODE:
+        print(f"Inferență ({INFERENCE_MODE}): {hand_detector.stats()} | Timp cadru: {loop_frame_times.format()}")
+        print(f"Etape: {stage_timings.format()}")
+    print("Se oprește stream-ul audio...")
+    player.post("STOP_FULL")
+    player.close()
+    print(f"Player: {player.stats()}")
+    print(f"Playlist: tranziții {transition_stats.summary()} | prefetch {track_prefetcher.stats()}")
+    if stats_dumper:
+        stats_dumper.close()
+    if landmark_recorder:
+        landmark_recorder.save(LANDMARK_RECORD_PATH)
+        print(f"Înregistrare: {landmark_recorder.frames} cadre salvate în {LANDMARK_RECORD_PATH}")
+    control.close()
+    print(f"Canal de control: {control.stats()}")
+    print("Se eliberează resursele...")
+    if cap and cap.isOpened(): cap.release()
+    cv2.destroyAllWindows()
+    if 'hands' in globals() and hands: hands.close()
+    track_library.close_all()
+    if sock_audio: sock_audio.close()
+    for sock in control_sockets: sock.close()
+    print("Program laptop încheiat.")
\ No newline at end of file
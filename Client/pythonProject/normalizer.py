@@ -0,0 +1,104 @@
+import numpy as np
+
+
+def stream_bandwidth_bytes(framerate, sampwidth, channels):
+    return framerate * sampwidth * channels
+
+
+def decode_pcm(audio_data, sampwidth, channels):
+    """Întoarce eșantioanele ca float32 în [-1, 1), cu forma (frame-uri, canale)."""
+    if sampwidth == 1:
+        samples = (np.frombuffer(audio_data, dtype=np.uint8).astype(np.float32) - 128.0) / 128.0
+    elif sampwidth == 2:
+        samples = np.frombuffer(audio_data, dtype='<i2').astype(np.float32) / 32768.0
+    elif sampwidth == 3:
+        raw = np.frombuffer(audio_data, dtype=np.uint8).reshape(-1, 3).astype(np.int32)
+        ints = (raw[:, 0] | (raw[:, 1] << 8) | (raw[:, 2] << 16)) << 8 >> 8
+        samples = ints.astype(np.float32) / 8388608.0
+    elif sampwidth == 4:
+        samples = np.frombuffer(audio_data, dtype='<i4').astype(np.float32) / 2147483648.0
+    else:
+        raise ValueError(f"Lățime de eșantion nesuportată: {sampwidth}")
+    return samples.reshape(-1, channels)
+
+
+def lowpass_taps(cutoff_ratio, num_taps=31):
+    # Filtru FIR sinc cu fereastră Hann; cutoff_ratio este relativ la frecvența de eșantionare de intrare.
+    n = np.arange(num_taps) - (num_taps - 1) / 2
+    taps = 2 * cutoff_ratio * np.sinc(2 * cutoff_ratio * n) * np.hanning(num_taps)
+    return (taps / taps.sum()).astype(np.float32)
+
+
+class StreamNormalizer:
+    """Aduce orice WAV la un format fix (rată, 16 biți, canale), bloc cu bloc.
+
+    Starea filtrului anti-aliasing și faza interpolării se păstrează între
+    chunk-uri, așa că ieșirea este continuă indiferent de mărimea blocurilor.
+    """
+
+    def __init__(self, src_rate, src_channels, src_sampwidth, dst_rate=22050, dst_channels=1, num_taps=31):
+        self.src_rate = src_rate
+        self.src_channels = src_channels
+        self.src_sampwidth = src_sampwidth
+        self.dst_rate = dst_rate
+        self.dst_channels = dst_channels
+        self.dst_sampwidth = 2
+        self.step = src_rate / dst_rate
+        self.taps = lowpass_taps(0.5 / self.step * 0.9, num_taps) if self.step > 1 else None
+        self.reset()
+
+    def reset(self):
+        self._history = np.zeros((len(self.taps) - 1 if self.taps is not None else 0, self.dst_channels),
+                                 dtype=np.float32)
+        self._prev = np.zeros((1, self.dst_channels), dtype=np.float32)
+        self._t = 1.0
+
+    def is_passthrough(self):
+        return (self.src_rate == self.dst_rate and self.src_channels == self.dst_channels
+                and self.src_sampwidth == self.dst_sampwidth)
+
+    def output_frames_for(self, src_frames):
+        return int(src_frames / self.step) + 1
+
+    def process(self, audio_data):
+        if not audio_data:
+            return b""
+        if self.is_passthrough():
+            return audio_data
+        x = decode_pcm(audio_data, self.src_sampwidth, self.src_channels)
+
+        if self.src_channels != self.dst_channels:
+            if self.dst_channels == 1:
+                x = x.mean(axis=1, keepdims=True)
+            else:
+                x = np.repeat(x.mean(axis=1, keepdims=True), self.dst_channels, axis=1)
+
+        if self.taps is not None:
+            padded = np.concatenate((self._history, x))
+            if len(self._history):
+                self._history = padded[-len(self._history):]
+            x = np.stack([np.convolve(padded[:, c], self.taps, mode='valid')
+                          for c in range(self.dst_channels)], axis=1)
+
+        if self.step != 1.0:
+            x = self._resample_linear(x)
+
+        out = np.clip(np.rint(x * 32768.0), -32768, 32767).astype('<i2')
+        return out.tobytes()
+
+    def _resample_linear(self, x):
+        # y[0] este ultimul eșantion din chunk-ul anterior; _t e poziția următorului eșantion de ieșire în y.
+        y = np.concatenate((self._prev, x))
+        last = len(y) - 1
+        self._prev = y[-1:].copy()
+        if self._t > last:
+            self._t -= len(x)
+            return y[:0]
+        count = int((last - self._t) // self.step) + 1
+        positions = self._t + self.step * np.arange(count)
+        idx = positions.astype(np.int64)
+        frac = (positions - idx).astype(np.float32)[:, None]
+        upper = np.minimum(idx + 1, last)
+        out = y[idx] * (1.0 - frac) + y[upper] * frac
+        self._t = positions[-1] + self.step - len(x)
+        return out
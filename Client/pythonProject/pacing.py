@@ -0,0 +1,114 @@
+import time
+
+LATE_SLACK = 0.25  # fracțiune din perioadă tolerată înainte ca un chunk să fie numărat întârziat
+
+
+class PacerStats:
+    def __init__(self, period_ns, late_slack=LATE_SLACK):
+        self.period_ns = period_ns
+        # Trezirea din sleep întârzie mereu puțin; doar ce trece de prag e întârziere reală
+        self.late_slack_ns = int(period_ns * late_slack)
+        self.reset()
+
+    def reset(self):
+        self.chunks = 0
+        self.late_chunks = 0
+        self.resyncs = 0
+        self.max_lateness_ns = 0
+        self.total_lateness_ns = 0
+        self.jitter_ns = 0.0
+        self.restart()
+
+    def restart(self):
+        # Un flux nou (sau reluare după pauză): totalurile rămân, câmpurile pe flux o iau de la zero
+        self.stream_chunks = 0
+        self._last_send_ns = None
+
+    def record(self, now_ns, deadline_ns):
+        lateness = now_ns - deadline_ns
+        self.chunks += 1
+        self.stream_chunks += 1
+        if lateness > self.max_lateness_ns:
+            self.max_lateness_ns = lateness
+        if lateness > self.late_slack_ns:
+            self.late_chunks += 1
+            self.total_lateness_ns += lateness
+        if self._last_send_ns is not None:
+            # Jitter netezit ca în RFC 3550: J += (|D| - J) / 16
+            deviation = abs((now_ns - self._last_send_ns) - self.period_ns)
+            self.jitter_ns += (deviation - self.jitter_ns) / 16.0
+        self._last_send_ns = now_ns
+
+    def as_dict(self):
+        return {
+            "chunks": self.chunks,
+            "late_chunks": self.late_chunks,
+            "resyncs": self.resyncs,
+            "max_lateness_ms": self.max_lateness_ns / 1e6,
+            "avg_lateness_ms": (self.total_lateness_ns / self.late_chunks / 1e6) if self.late_chunks else 0.0,
+            "jitter_ms": self.jitter_ns / 1e6,
+        }
+
+
+class SleepPacer:
+    """Comportamentul inițial: doarme o durată fixă de chunk, fără a scădea timpul de lucru."""
+
+    mode = "sleep"
+
+    def __init__(self, period_ns):
+        self.period_ns = period_ns
+        self.stats = PacerStats(period_ns)
+        self._origin_ns = 0
+        self._first = True
+
+    def start(self):
+        self._origin_ns = time.monotonic_ns()
+        self._first = True
+        self.stats.restart()
+
+    def wait(self):
+        if not self._first:
+            time.sleep(self.period_ns / 1e9)
+        self._first = False
+        # Lateness-ul se măsoară față de programul ideal, ca să se vadă drift-ul acumulat.
+        self.stats.record(time.monotonic_ns(), self._origin_ns + self.stats.stream_chunks * self.period_ns)
+
+
+class DeadlinePacer:
+    """Programează fiecare datagramă la un deadline absolut pe time.monotonic_ns().
+
+    După o întârziere, chunk-urile restante pleacă unul după altul, dar cel mult
+    max_burst; peste această limită programul este resincronizat la momentul curent.
+    """
+
+    mode = "deadline"
+
+    def __init__(self, period_ns, max_burst=8):
+        self.period_ns = period_ns
+        self.max_burst = max(1, max_burst)
+        self.stats = PacerStats(period_ns)
+        self.next_deadline_ns = 0
+
+    def start(self):
+        self.next_deadline_ns = time.monotonic_ns()
+        self.stats.restart()
+
+    def wait(self):
+        now = time.monotonic_ns()
+        remaining = self.next_deadline_ns - now
+        if remaining > 0:
+            time.sleep(remaining / 1e9)
+            now = time.monotonic_ns()
+        elif -remaining > self.max_burst * self.period_ns:
+            self.stats.resyncs += 1
+            self.next_deadline_ns = now - self.max_burst * self.period_ns
+        self.stats.record(now, self.next_deadline_ns)
+        self.next_deadline_ns += self.period_ns
+
+
+def make_pacer(mode, period_ns, max_burst=8):
+    if mode == "deadline":
+        return DeadlinePacer(period_ns, max_burst)
+    if mode == "sleep":
+        return SleepPacer(period_ns)
+    raise ValueError(f"Mod de pacing necunoscut: {mode}")
@@ -0,0 +1,97 @@
+import struct
+import time
+
+IPV4_UDP_HEADER_BYTES = 28
+
+# Header-ul pachetelor audio (identic cu Server/jitter_buffer.py): secvență uint16,
+# flag-uri uint16 (rezervat), poziția primului eșantion în melodie uint32.
+AUDIO_HEADER_FORMAT = "<HHI"
+AUDIO_HEADER_SIZE = struct.calcsize(AUDIO_HEADER_FORMAT)
+
+
+def max_datagram_payload(mtu=1500, receiver_max_bytes=2048, header_bytes=0):
+    # Payload-ul UDP care încape într-un MTU (fără fragmentare IP) și în bufferul de recepție al Pico-ului.
+    return min(mtu - IPV4_UDP_HEADER_BYTES, receiver_max_bytes) - header_bytes
+
+
+def choose_chunk_frames(frame_size, framerate, mtu=1500, receiver_max_bytes=2048, header_bytes=0,
+                        target_packet_rate=50, max_frames=None):
+    """Alege câte frame-uri intră într-o datagramă.
+
+    Limita de sus e dată de max_datagram_payload (sau de max_frames, pentru codecuri
+    la care mărimea nu e proporțională cu frame_size). În limita aceasta se ține
+    rata țintă de pachete pe secundă.
+    """
+    if max_frames is None:
+        max_frames = max_datagram_payload(mtu, receiver_max_bytes, header_bytes) // frame_size
+    max_frames = max(1, max_frames)
+    if not target_packet_rate:
+        return max_frames
+    wanted_frames = -(-framerate // target_packet_rate)
+    return max(1, min(max_frames, wanted_frames))
+
+
+class AudioFramer:
+    def __init__(self):
+        self._header = bytearray(AUDIO_HEADER_SIZE)
+        self.seq = 0
+        self.sample_pos = 0
+
+    def next_header(self, num_frames, flags=0):
+        struct.pack_into(AUDIO_HEADER_FORMAT, self._header, 0, self.seq, flags, self.sample_pos & 0xFFFFFFFF)
+        self.seq = (self.seq + 1) & 0xFFFF
+        self.sample_pos += num_frames
+        return self._header
+
+
+class Packetizer:
+    """Trimite header + payload într-o singură datagramă, fără a le concatena când există sendmsg."""
+
+    def __init__(self, sock, addr, max_datagram_bytes=2048):
+        self.sock = sock
+        self.addr = addr
+        self.use_sendmsg = hasattr(sock, "sendmsg")
+        self._scratch = bytearray(max_datagram_bytes)
+        self._scratch_view = memoryview(self._scratch)
+        self.packets = 0
+        self.bytes_sent = 0
+        self._start_time = time.monotonic()
+        self._start_cpu = time.thread_time()
+
+    def send(self, payload, header=None):
+        if not header:
+            sent = self.sock.sendto(payload, self.addr)
+        elif self.use_sendmsg:
+            sent = self.sock.sendmsg((header, payload), (), 0, self.addr)
+        else:
+            # Pe Windows nu există sendmsg: se copiază într-un buffer refolosit, fără alocare nouă.
+            sent = self.sock.sendto(self._join(header, payload), self.addr)
+        self.packets += 1
+        self.bytes_sent += sent
+        return sent
+
+    def _join(self, header, payload):
+        header_len = len(header)
+        total = header_len + len(payload)
+        if total > len(self._scratch):
+            self._scratch = bytearray(total)
+            self._scratch_view = memoryview(self._scratch)
+        self._scratch_view[:header_len] = header
+        self._scratch_view[header_len:total] = payload
+        return self._scratch_view[:total]
+
+    def reset_stats(self):
+        self.packets = 0
+        self.bytes_sent = 0
+        self._start_time = time.monotonic()
+        self._start_cpu = time.thread_time()
+
+    def stats(self):
+        elapsed = max(1e-9, time.monotonic() - self._start_time)
+        cpu = time.thread_time() - self._start_cpu
+        return {
+            "packets": self.packets,
+            "packets_per_sec": self.packets / elapsed,
+            "bytes_per_packet": (self.bytes_sent / self.packets) if self.packets else 0,
+            "cpu_percent": 100.0 * cpu / elapsed,
+        }
@@ -0,0 +1,57 @@
+import queue
+import threading
+import time
+
+
+class PlayerActor:
+    """Execută comenzile player-ului (PLAY, NEXT, VOL, ...) pe un thread propriu, în ordinea sosirii.
+
+    Thread-ul acesta deține fișierul audio, thread-ul de streaming și canalul de control;
+    bucla de viziune doar pune comenzi în coadă cu post(), deci nu mai așteaptă după join,
+    deschiderea fișierelor sau confirmările de la Pico.
+    """
+
+    def __init__(self, handler, name="player", timings=None):
+        self.handler = handler
+        self.timings = timings
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self.handled = 0
+        self.errors = 0
+        self.max_wait_sec = 0.0
+        self.max_run_sec = 0.0
+        self.current_posted_at = None  # când a fost postată comanda care rulează acum
+        self._thread.start()
+
+    def post(self, command, *args, origin=None):
+        # origin: momentul (time.monotonic) cadrului din care vine gestul, pentru latența gest -> comandă
+        self._queue.put((command, args, time.monotonic(), origin))
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            command, args, posted_at, origin = item
+            started_at = time.monotonic()
+            self.current_posted_at = posted_at
+            try:
+                self.handler(command, *args)
+            except Exception as e:
+                self.errors += 1
+                print(f"Player: Eroare la comanda {command}: {e}")
+            finished_at = time.monotonic()
+            if origin is not None and self.timings:
+                self.timings.record("gesture_to_command", finished_at - origin)
+            self.handled += 1
+            self.max_wait_sec = max(self.max_wait_sec, started_at - posted_at)
+            self.max_run_sec = max(self.max_run_sec, finished_at - started_at)
+
+    def close(self, timeout=5.0):
+        # Comenzile deja puse în coadă (de ex. STOP_FULL) se execută înainte de oprire.
+        self._queue.put(None)
+        self._thread.join(timeout)
+
+    def stats(self):
+        return {"handled": self.handled, "errors": self.errors, "pending": self._queue.qsize(),
+                "max_wait_ms": round(self.max_wait_sec * 1000, 1), "max_run_ms": round(self.max_run_sec * 1000, 1)}
@@ -0,0 +1,258 @@
+import threading
+import time
+
+import numpy as np
+
+from normalizer import StreamNormalizer
+
+PREPARE_READ_FRAMES = 4096
+
+
+class PreparedTrack:
+    """O melodie deschisă, cu normalizatorul ei, care produce PCM direct în formatul stream-ului.
+
+    fill() convertește în avans primele frame-uri (prebuffer), ca trecerea la melodie să nu
+    mai depindă de citirea fișierului; take() dă exact câte frame-uri se cer, cât mai are.
+    """
+
+    def __init__(self, index, source, out_params, normalize=False, owns_source=True):
+        self.index = index
+        self.source = source
+        self.owns_source = owns_source
+        self.out_params = dict(out_params)
+        self.frame_size = out_params["channels"] * out_params["sampwidth"]
+        self.normalizer = None
+        if normalize:
+            self.normalizer = StreamNormalizer(source.framerate, source.channels, source.sampwidth,
+                                               out_params["framerate"], out_params["channels"])
+        self._pending = bytearray()
+
+    def buffered_frames(self):
+        return len(self._pending) // self.frame_size
+
+    def remaining_frames(self):
+        source_left = self.source.nframes - self.source.position
+        if self.normalizer:
+            source_left = int(source_left / self.normalizer.step)
+        return self.buffered_frames() + source_left
+
+    def fill(self, out_frames):
+        step = self.normalizer.step if self.normalizer else 1.0
+        while self.buffered_frames() < out_frames and self.source.position < self.source.nframes:
+            missing = out_frames - self.buffered_frames()
+            data = self.source.read_chunk(min(PREPARE_READ_FRAMES, int(missing * step) + 1))
+            self._pending += self.normalizer.process(data) if self.normalizer else data
+
+    def take(self, out_frames):
+        if not self._pending and not self.normalizer:
+            # Fără prebuffer rămas: memoryview direct din fișier, ca înainte.
+            return self.source.read_chunk(out_frames)
+        self.fill(out_frames)
+        n = min(len(self._pending), out_frames * self.frame_size)
+        data = bytes(self._pending[:n])
+        del self._pending[:n]
+        return data
+
+    def close(self):
+        # Sursele din TrackLibrary rămân deschise pentru un PLAY ulterior.
+        if self.owns_source:
+            self.source.close()
+
+
+def crossfade_pcm16(fade_out, fade_in, channels):
+    """Mixează două bucăți PCM 16 biți de aceeași lungime cu rampe liniare complementare."""
+    a = np.frombuffer(fade_out, dtype='<i2').reshape(-1, channels).astype(np.float32)
+    b = np.frombuffer(fade_in, dtype='<i2').reshape(-1, channels).astype(np.float32)
+    n = min(len(a), len(b))
+    ramp = np.linspace(1.0, 0.0, n, endpoint=False, dtype=np.float32)[:, None]
+    mixed = a[:n] * ramp + b[:n] * (1.0 - ramp)
+    return np.clip(np.rint(mixed), -32768, 32767).astype('<i2').tobytes()
+
+
+class TransitionStats:
+    """Pentru fiecare trecere: cât a durat de la comandă până la primul pachet și golul din stream."""
+
+    def __init__(self):
+        self.events = []
+
+    def record(self, kind, request_to_audio_ms, gap_ms):
+        self.events.append((kind, request_to_audio_ms, gap_ms))
+
+    def summary(self):
+        result = {}
+        for kind in sorted({event[0] for event in self.events}):
+            latencies = sorted(event[1] for event in self.events if event[0] == kind)
+            gaps = sorted(event[2] for event in self.events if event[0] == kind)
+            result[kind] = {"n": len(latencies), "to_audio_p50_ms": round(latencies[len(latencies) // 2], 1),
+                            "to_audio_max_ms": round(latencies[-1], 1), "gap_max_ms": round(gaps[-1], 1)}
+        return result
+
+
+class PlaylistStream:
+    """Ce citește thread-ul de streaming: PCM în formatul stream-ului, peste granițele melodiilor.
+
+    La sfârșitul melodiei trece singur la următoarea dată de next_track(index) (de obicei
+    din prefetch), în același chunk, deci fără gol; switch_to() face la fel la NEXT/PREV.
+    Cu crossfade_ms > 0 și PCM pe 16 biți, trecerea mixează cele două melodii cu rampe.
+    Dacă următoarea melodie are alt format, read() se oprește la graniță și ended_with
+    spune ce melodie urmează, iar stream-ul trebuie repornit cu CONFIG nou.
+    """
+
+    def __init__(self, first, next_track=None, crossfade_ms=0):
+        self.current = first
+        self.out_params = first.out_params
+        self.next_track = next_track
+        self.crossfade_frames = 0
+        if crossfade_ms > 0 and self.out_params["sampwidth"] == 2:
+            self.crossfade_frames = int(self.out_params["framerate"] * crossfade_ms / 1000)
+        self._lock = threading.Lock()
+        self._switch = None
+        self.ended_with = None
+        self._no_fade_from = None
+        self.last_transition = None  # (tip, index, momentul cererii) pentru chunk-ul tocmai citit
+
+    def compatible(self, prepared):
+        return prepared.out_params == self.out_params
+
+    def switch_to(self, prepared, requested_at=None):
+        # Apelat din alt thread; trecerea are loc la următorul read().
+        with self._lock:
+            self._switch = (prepared, requested_at)
+
+    def _handover(self, new, kind, requested_at):
+        fade = 0
+        out = b""
+        if self.crossfade_frames:
+            tail = self.current.take(self.crossfade_frames)
+            fade = len(tail) // self.current.frame_size
+            if fade:
+                out = crossfade_pcm16(tail, new.take(fade), self.out_params["channels"])
+        self.current.close()
+        self.current = new
+        self.last_transition = (kind, new.index, requested_at)
+        return out, fade
+
+    def read(self, out_frames):
+        self.last_transition = None
+        with self._lock:
+            switch, self._switch = self._switch, None
+        chunks = []
+        frames = 0
+        if switch is not None:
+            out, frames = self._handover(switch[0], "switch", switch[1])
+            chunks.append(out)
+
+        while frames < out_frames and self.ended_with is None:
+            want = out_frames - frames
+            if (self.crossfade_frames and self.next_track and self.last_transition is None
+                    and self.current is not self._no_fade_from):
+                # Se citește doar până unde începe fade-ul, ca acesta să aibă exact crossfade_frames.
+                before_fade = self.current.remaining_frames() - self.crossfade_frames
+                if before_fade <= 0:
+                    self._no_fade_from = self.current
+                    new = self.next_track(self.current.index)
+                    if new is not None and self.compatible(new):
+                        out, faded = self._handover(new, "auto", None)
+                        chunks.append(out)
+                        frames += faded
+                        continue
+                    if new is not None:
+                        # Fără crossfade spre alt format; granița se tratează mai jos, la sfârșitul melodiei.
+                        new.close()
+                else:
+                    want = min(want, before_fade)
+            data = self.current.take(want)
+            got = len(data) // self.current.frame_size
+            if got:
+                chunks.append(data)
+                frames += got
+                continue
+            # Melodia curentă s-a terminat exact aici: se lipește următoarea, la nivel de eșantion.
+            new = self.next_track(self.current.index) if self.next_track else None
+            if new is None:
+                self.ended_with = -1
+            elif not self.compatible(new):
+                new.close()
+                self.ended_with = new.index
+            else:
+                self.current.close()
+                self.current = new
+                self.last_transition = ("auto", new.index, None)
+
+        if len(chunks) == 1:
+            return chunks[0]
+        return b"".join(chunks)
+
+    def close(self):
+        with self._lock:
+            switch, self._switch = self._switch, None
+        if switch is not None:
+            switch[0].close()
+        self.current.close()
+
+
+class TrackPrefetcher:
+    """Pregătește în fundal (deschidere + prebuffer normalizat) melodiile cerute cu prefetch()."""
+
+    def __init__(self, prepare, prebuffer_ms=300):
+        self.prepare = prepare
+        self.prebuffer_ms = prebuffer_ms
+        self._lock = threading.Lock()
+        self._ready = {}
+        self._running = set()
+        self.hits = 0
+        self.misses = 0
+        self.prepare_ms = []
+
+    def prefetch(self, index):
+        with self._lock:
+            if index in self._ready or index in self._running:
+                return
+            self._running.add(index)
+        threading.Thread(target=self._prepare, args=(index,), daemon=True).start()
+
+    def _prepare(self, index):
+        start = time.perf_counter()
+        prepared = None
+        try:
+            prepared = self.prepare(index)
+            if prepared is not None:
+                prepared.fill(prepared.out_params["framerate"] * self.prebuffer_ms // 1000)
+        except Exception as e:
+            print(f"Prefetch: Eroare la pregătirea melodiei {index}: {e}")
+            prepared = None
+        with self._lock:
+            self._running.discard(index)
+            if prepared is not None:
+                self._ready[index] = prepared
+                self.prepare_ms.append((time.perf_counter() - start) * 1000)
+
+    def take(self, index):
+        with self._lock:
+            prepared = self._ready.pop(index, None)
+        if prepared is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return prepared
+
+    def take_or_prepare(self, index):
+        prepared = self.take(index)
+        if prepared is None:
+            prepared = self.prepare(index)
+        return prepared
+
+    def keep_only(self, indices):
+        # Melodiile pregătite care nu mai sunt vecine cu cea curentă se închid.
+        with self._lock:
+            dropped = [self._ready.pop(i) for i in list(self._ready) if i not in indices]
+        for prepared in dropped:
+            prepared.close()
+
+    def clear(self):
+        self.keep_only(())
+
+    def stats(self):
+        ms = sorted(self.prepare_ms)
+        return {"hits": self.hits, "misses": self.misses,
+                "prepare_p50_ms": round(ms[len(ms) // 2], 1) if ms else 0.0}
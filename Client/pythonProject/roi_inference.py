@@ -0,0 +1,95 @@
+import cv2
+
+
+class RoiHandTracker:
+    """Rulează hands.process pe o regiune decupată în jurul mâinii din cadrul anterior.
+
+    Regiunea (cu o margine) este micșorată la work_width pixeli lățime, iar
+    landmark-urile sunt readuse în coordonate normalizate ale cadrului complet,
+    astfel încât pragurile în pixeli din recunoaștere rămân valabile. Când mâna
+    nu mai este găsită în regiune, căutarea se reia imediat pe tot cadrul, la
+    rezoluția lui nativă.
+
+    Cu enabled=True, hands trebuie creat cu static_image_mode=True: în modul de
+    urmărire MediaPipe folosește landmark-urile din apelul anterior ca regiune,
+    iar acestea nu mai corespund când decupajul își schimbă geometria de la un
+    cadru la altul. Urmărirea o face aici decupajul.
+    """
+
+    def __init__(self, hands, work_width=320, margin=0.35, min_roi_fraction=0.25, enabled=True):
+        self.hands = hands
+        self.work_width = work_width
+        self.margin = margin
+        self.min_roi_fraction = min_roi_fraction
+        self.enabled = enabled
+        self.roi = None
+        self.roi_frames = 0
+        self.full_frames = 0
+        self.tracking_lost = 0
+
+    def process(self, image_rgb):
+        if not self.enabled:
+            self.full_frames += 1
+            return self.hands.process(image_rgb)
+
+        image_height, image_width = image_rgb.shape[:2]
+        if self.roi is not None:
+            results = self._process_region(image_rgb, self.roi, image_width, image_height)
+            if results.multi_hand_landmarks:
+                self.roi_frames += 1
+                return results
+            self.tracking_lost += 1
+            self.roi = None
+
+        self.full_frames += 1
+        results = self.hands.process(image_rgb)
+        if results.multi_hand_landmarks:
+            self.roi = self._roi_from_landmarks(results.multi_hand_landmarks[0], image_width, image_height)
+        return results
+
+    def _process_region(self, image_rgb, box, image_width, image_height):
+        x0, y0, x1, y1 = box
+        crop = image_rgb[y0:y1, x0:x1]
+        crop_width, crop_height = x1 - x0, y1 - y0
+        if crop_width > self.work_width:
+            work_height = max(1, int(crop_height * self.work_width / crop_width))
+            crop = cv2.resize(crop, (self.work_width, work_height), interpolation=cv2.INTER_AREA)
+
+        results = self.hands.process(crop)
+        if not results.multi_hand_landmarks:
+            return results
+
+        for hand_landmarks in results.multi_hand_landmarks:
+            for lm in hand_landmarks.landmark:
+                lm.x = (x0 + lm.x * crop_width) / image_width
+                lm.y = (y0 + lm.y * crop_height) / image_height
+                lm.z = lm.z * crop_width / image_width
+        self.roi = self._roi_from_landmarks(results.multi_hand_landmarks[0], image_width, image_height)
+        return results
+
+    def _roi_from_landmarks(self, hand_landmarks, image_width, image_height):
+        xs = [lm.x for lm in hand_landmarks.landmark]
+        ys = [lm.y for lm in hand_landmarks.landmark]
+        min_x, max_x = min(xs) * image_width, max(xs) * image_width
+        min_y, max_y = min(ys) * image_height, max(ys) * image_height
+
+        min_side = self.min_roi_fraction * min(image_width, image_height)
+        side = max(max_x - min_x, max_y - min_y, min_side) * (1 + 2 * self.margin)
+        center_x, center_y = (min_x + max_x) / 2, (min_y + max_y) / 2
+
+        x0 = max(0, int(center_x - side / 2))
+        y0 = max(0, int(center_y - side / 2))
+        x1 = min(image_width, int(center_x + side / 2))
+        y1 = min(image_height, int(center_y + side / 2))
+        if x1 - x0 < 2 or y1 - y0 < 2:
+            return None
+        return x0, y0, x1, y1
+
+    def stats(self):
+        total = self.roi_frames + self.full_frames
+        return {
+            "roi_frames": self.roi_frames,
+            "full_frames": self.full_frames,
+            "tracking_lost": self.tracking_lost,
+            "roi_ratio": (self.roi_frames / total) if total else 0.0,
+        }
@@ -0,0 +1,75 @@
+import threading
+import time
+from collections import deque
+
+# Limitele superioare (ms) ale găleților din histogramă; ultima găleată ia tot ce e peste
+STAGE_BUCKET_LIMITS_MS = (1, 2, 5, 10, 20, 50, 100)
+STAGE_WINDOW = 1000  # ultimele N măsurători pe etapă, pentru percentile
+
+
+class StageHistogram:
+    """Duratele unei etape pe ultimele `window` măsurători; sortarea se face doar la snapshot()."""
+
+    def __init__(self, window=STAGE_WINDOW):
+        self._samples = deque(maxlen=window)
+        self.count = 0
+
+    def record(self, seconds):
+        self._samples.append(seconds)
+        self.count += 1
+
+    def snapshot(self):
+        ordered = sorted(self._samples)
+        if not ordered:
+            return {"n": self.count}
+        last = len(ordered) - 1
+        result = {"n": self.count}
+        for name, q in (("p50", 0.5), ("p95", 0.95), ("p99", 0.99)):
+            result[f"{name}_ms"] = round(ordered[min(last, int(len(ordered) * q))] * 1000, 2)
+        result["max_ms"] = round(ordered[-1] * 1000, 2)
+        result["mean_ms"] = round(sum(ordered) / len(ordered) * 1000, 2)
+        buckets = [0] * (len(STAGE_BUCKET_LIMITS_MS) + 1)
+        for seconds in ordered:
+            ms = seconds * 1000
+            i = 0
+            while i < len(STAGE_BUCKET_LIMITS_MS) and ms >= STAGE_BUCKET_LIMITS_MS[i]:
+                i += 1
+            buckets[i] += 1
+        result["hist"] = buckets
+        return result
+
+
+class StageTimings:
+    """Histograme pe etape (citire cameră, hands.process, trimitere pachet, ...), pe nume.
+
+    Pe calea critică o măsurătoare costă două perf_counter() și un append într-un deque;
+    fiecare etapă e măsurată de un singur thread, deci nu e nevoie de lock decât la crearea ei.
+    """
+
+    def __init__(self, window=STAGE_WINDOW):
+        self.window = window
+        self._stages = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def start():
+        return time.perf_counter()
+
+    def stop(self, name, started):
+        self.record(name, time.perf_counter() - started)
+
+    def record(self, name, seconds):
+        stage = self._stages.get(name)
+        if stage is None:
+            with self._lock:
+                stage = self._stages.setdefault(name, StageHistogram(self.window))
+        stage.record(seconds)
+
+    def snapshot(self):
+        with self._lock:
+            stages = list(self._stages.items())
+        return {name: stage.snapshot() for name, stage in stages}
+
+    def format(self):
+        return " | ".join(f"{name}: p50={s['p50_ms']}ms p95={s['p95_ms']}ms max={s['max_ms']}ms"
+                          for name, s in self.snapshot().items() if "p50_ms" in s)
@@ -0,0 +1,48 @@
+import json
+import threading
+import time
+
+
+class StatsDumper:
+    """Adaugă în `path`, la fiecare `interval_sec`, o linie JSON cu ce întoarce collect_fn().
+
+    collect_fn rulează pe thread-ul acesta, deci poate aștepta răspunsul STATS de la Pico
+    fără să întârzie viziunea sau streaming-ul.
+    """
+
+    def __init__(self, path, interval_sec, collect_fn):
+        self.path = path
+        self.interval_sec = interval_sec
+        self.collect_fn = collect_fn
+        self.dumps = 0
+        self.errors = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="stats-dump", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def dump(self):
+        record = {"time": round(time.time(), 3)}
+        record.update(self.collect_fn())
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record) + "\n")
+        self.dumps += 1
+
+    def _run(self):
+        while not self._stop.wait(self.interval_sec):
+            try:
+                self.dump()
+            except Exception as e:
+                self.errors += 1
+                print(f"Stats: Eroare la scrierea în {self.path}: {e}")
+
+    def close(self, final_dump=True):
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join(timeout=2.0)
+        if final_dump:
+            try:
+                self.dump()
+            except Exception as e:
+                print(f"Stats: Eroare la scrierea în {self.path}: {e}")
@@ -0,0 +1,90 @@
+import json
+import os
+import wave
+from concurrent.futures import ThreadPoolExecutor
+
+from track_source import parse_wav_header
+
+INDEX_VERSION = 1
+
+
+def read_track_metadata(path, size):
+    try:
+        with open(path, 'rb') as f:
+            fmt, data_offset, data_size = parse_wav_header(f, size)
+    except (wave.Error, OSError, ValueError) as e:
+        return {"error": str(e)}
+    frame_size = fmt["block_align"] or fmt["channels"] * fmt["sampwidth"]
+    nframes = data_size // frame_size if frame_size else 0
+    return {
+        "framerate": fmt["framerate"], "channels": fmt["channels"], "sampwidth": fmt["sampwidth"],
+        "block_align": frame_size, "data_offset": data_offset, "data_size": data_size, "nframes": nframes,
+        "duration": nframes / fmt["framerate"] if fmt["framerate"] else 0.0,
+    }
+
+
+class TrackIndex:
+    """Index persistent (JSON) cu formatul fiecărui WAV din director.
+
+    La pornire se re-citesc doar fișierele noi sau cele la care s-a schimbat
+    mărimea ori mtime; acestea sunt parsate în paralel într-un thread pool.
+    """
+
+    def __init__(self, index_path, max_workers=8):
+        self.index_path = index_path
+        self.max_workers = max_workers
+        self.entries = {}
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get("version") == INDEX_VERSION:
+                self.entries = data.get("entries", {})
+        except (OSError, ValueError):
+            self.entries = {}
+
+    def save(self):
+        tmp_path = self.index_path + ".tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({"version": INDEX_VERSION, "entries": self.entries}, f, separators=(',', ':'))
+            os.replace(tmp_path, self.index_path)
+        except OSError as e:
+            print(f"Nu s-a putut salva indexul melodiilor '{self.index_path}': {e}")
+
+    def refresh(self, directory):
+        entries = {}
+        stale = []
+        with os.scandir(directory) as it:
+            for dir_entry in it:
+                if not dir_entry.name.lower().endswith(".wav") or not dir_entry.is_file():
+                    continue
+                st = dir_entry.stat()
+                path = os.path.join(directory, dir_entry.name)
+                cached = self.entries.get(path)
+                if cached and cached["size"] == st.st_size and cached["mtime_ns"] == st.st_mtime_ns:
+                    entries[path] = cached
+                else:
+                    stale.append((path, st.st_size, st.st_mtime_ns))
+
+        if stale:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+                results = pool.map(lambda item: read_track_metadata(item[0], item[1]), stale)
+                for (path, size, mtime_ns), metadata in zip(stale, results):
+                    metadata.update({"size": size, "mtime_ns": mtime_ns})
+                    entries[path] = metadata
+
+        changed = bool(stale) or len(entries) != len(self.entries)
+        self.entries = entries
+        if changed:
+            self.save()
+        return len(stale)
+
+    def playable_paths(self):
+        return sorted((p for p, e in self.entries.items() if "error" not in e),
+                      key=lambda p: os.path.basename(p))
+
+    def get(self, path):
+        return self.entries.get(path)
@@ -0,0 +1,117 @@
+import mmap
+import os
+import struct
+import wave
+from collections import OrderedDict
+
+WAVE_FORMAT_PCM = 0x0001
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+
+def parse_wav_header(f, file_size):
+    """Parcurge chunk-urile RIFF o singură dată și întoarce formatul și poziția chunk-ului 'data'."""
+    riff = f.read(12)
+    if len(riff) < 12 or riff[0:4] != b'RIFF' or riff[8:12] != b'WAVE':
+        raise wave.Error("fișierul nu este RIFF/WAVE")
+
+    fmt = None
+    offset = 12
+    while offset + 8 <= file_size:
+        f.seek(offset)
+        chunk_id, chunk_size = struct.unpack('<4sI', f.read(8))
+        body_offset = offset + 8
+        if chunk_id == b'fmt ':
+            body = f.read(min(chunk_size, 40))
+            if len(body) < 16:
+                raise wave.Error("chunk 'fmt ' prea scurt")
+            format_tag, channels, framerate, _, block_align, bits = struct.unpack('<HHIIHH', body[:16])
+            if format_tag == WAVE_FORMAT_EXTENSIBLE and len(body) >= 26:
+                format_tag = struct.unpack('<H', body[24:26])[0]
+            if format_tag != WAVE_FORMAT_PCM:
+                raise wave.Error(f"format WAV necunoscut: {format_tag}")
+            fmt = {"framerate": framerate, "channels": channels, "sampwidth": (bits + 7) // 8,
+                   "block_align": block_align}
+        elif chunk_id == b'data':
+            if fmt is None:
+                raise wave.Error("chunk 'data' înaintea chunk-ului 'fmt '")
+            # Unele programe scriu 0xFFFFFFFF pentru stream-uri; limităm la mărimea fișierului.
+            data_size = min(chunk_size, file_size - body_offset)
+            return fmt, body_offset, data_size
+        offset = body_offset + chunk_size + (chunk_size & 1)
+    raise wave.Error("lipsește chunk-ul 'fmt ' sau 'data'")
+
+
+class WavTrackSource:
+    """Sursă de melodie WAV mapată în memorie.
+
+    Header-ul este citit o singură dată, iar read_chunk() întoarce memoryview-uri
+    direct din maparea fișierului, fără copiere până la etapa de gain.
+    """
+
+    def __init__(self, path, header=None):
+        self.path = path
+        with open(path, 'rb') as f:
+            if header is None:
+                header = parse_wav_header(f, os.fstat(f.fileno()).st_size)
+            fmt, self.data_offset, data_size = header
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.framerate = fmt["framerate"]
+        self.channels = fmt["channels"]
+        self.sampwidth = fmt["sampwidth"]
+        self.frame_size = fmt["block_align"] or self.channels * self.sampwidth
+        self.nframes = data_size // self.frame_size
+        self._data = memoryview(self._mmap)[self.data_offset:self.data_offset + self.nframes * self.frame_size]
+        self.position = 0
+
+    def params(self):
+        return {"framerate": self.framerate, "channels": self.channels, "sampwidth": self.sampwidth}
+
+    def duration_sec(self):
+        return self.nframes / self.framerate if self.framerate else 0.0
+
+    def read_chunk(self, num_frames):
+        start = self.position
+        end = min(self.nframes, start + num_frames)
+        self.position = end
+        return self._data[start * self.frame_size:end * self.frame_size]
+
+    def seek_frame(self, frame_index):
+        self.position = max(0, min(self.nframes, frame_index))
+
+    def seek_seconds(self, seconds):
+        self.seek_frame(int(seconds * self.framerate))
+
+    def close(self):
+        if self._mmap is None:
+            return
+        self._data.release()
+        try:
+            self._mmap.close()
+        except BufferError:
+            # Un memoryview dat streamer-ului este încă în uz; maparea se închide la colectare.
+            pass
+        self._mmap = None
+
+
+class TrackLibrary:
+    """Păstrează deschise ultimele melodii folosite, ca NEXT/PREV să nu mai reparseze header-ul."""
+
+    def __init__(self, max_open=8):
+        self.max_open = max_open
+        self._open = OrderedDict()
+
+    def open(self, path, header=None):
+        source = self._open.pop(path, None)
+        if source is None:
+            source = WavTrackSource(path, header)
+        self._open[path] = source
+        while len(self._open) > self.max_open:
+            _, evicted = self._open.popitem(last=False)
+            evicted.close()
+        source.seek_frame(0)
+        return source
+
+    def close_all(self):
+        for source in self._open.values():
+            source.close()
+        self._open.clear()
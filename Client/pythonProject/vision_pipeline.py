@@ -0,0 +1,114 @@
+import threading
+import time
+from collections import deque
+
+
+class LatestFrameSlot:
+    """Coadă cu un singur loc: put() suprascrie cadrul vechi, get() ia mereu cel mai nou."""
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._item = None
+        self.closed = False
+        self.overwritten = 0
+
+    def put(self, item):
+        with self._cond:
+            if self._item is not None:
+                self.overwritten += 1
+            self._item = item
+            self._cond.notify_all()
+
+    def get(self, timeout=None):
+        with self._cond:
+            if self._item is None and not self.closed:
+                self._cond.wait(timeout)
+            item, self._item = self._item, None
+            return item
+
+    def close(self):
+        with self._cond:
+            self.closed = True
+            self._cond.notify_all()
+
+
+class StageRate:
+    def __init__(self, name, window_sec=1.0):
+        self.name = name
+        self.window_sec = window_sec
+        self.fps = 0.0
+        self._count = 0
+        self._window_start = time.monotonic()
+
+    def tick(self):
+        self._count += 1
+        now = time.monotonic()
+        elapsed = now - self._window_start
+        if elapsed >= self.window_sec:
+            self.fps = self._count / elapsed
+            self._count = 0
+            self._window_start = now
+
+
+class FrameTimeStats:
+    """Intervalele dintre cadre consecutive, pe ultimele `window` cadre, ca percentile în ms."""
+
+    def __init__(self, window=900):
+        self._intervals = deque(maxlen=window)
+        self._last = None
+
+    def tick(self, now=None):
+        now = time.monotonic() if now is None else now
+        if self._last is not None:
+            self._intervals.append(now - self._last)
+        self._last = now
+
+    def percentiles(self):
+        if not self._intervals:
+            return {}
+        ordered = sorted(self._intervals)
+        last = len(ordered) - 1
+        return {name: round(ordered[min(last, int(len(ordered) * q))] * 1000, 1)
+                for name, q in (("p50", 0.5), ("p95", 0.95), ("p99", 0.99), ("max", 1.0))}
+
+    def format(self):
+        return " ".join(f"{name}={ms}ms" for name, ms in self.percentiles().items())
+
+
+def run_capture_stage(cap, out_slot, stop_event, rate, transform=None, timings=None):
+    while not stop_event.is_set() and cap.isOpened():
+        started = time.perf_counter()
+        success, image = cap.read()
+        if timings:
+            timings.stop("camera_read", started)
+        if not success:
+            time.sleep(0.005)
+            continue
+        if transform:
+            image = transform(image)
+        out_slot.put((image, time.monotonic()))
+        rate.tick()
+    out_slot.close()
+
+
+def run_worker_stage(in_slot, out_slot, work_fn, stop_event, rate):
+    while not stop_event.is_set():
+        item = in_slot.get(timeout=0.1)
+        if item is None:
+            if in_slot.closed:
+                break
+            continue
+        out_slot.put(work_fn(item))
+        rate.tick()
+    out_slot.close()
+
+
+def start_stage_thread(name, target, *args):
+    thread = threading.Thread(target=target, args=args, name=name)
+    thread.daemon = True
+    thread.start()
+    return thread
+
+
+def format_stage_rates(rates):
+    return " | ".join(f"{r.name}: {r.fps:.1f} FPS" for r in rates)
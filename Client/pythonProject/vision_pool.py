@@ -0,0 +1,247 @@
+import multiprocessing
+import threading
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from hand_features import extract_hand_features, landmarks_to_array
+from vision_pipeline import StageRate, start_stage_thread
+
+FRAME_SLOTS = 4  # captură + ultimul cadru nepreluat + cadrul în inferență + cadrul afișat
+
+
+class SharedFrameRing:
+    """Cadrele unei camere într-un bloc SharedMemory, ca worker-ul să nu le primească prin pickle.
+
+    Sloturile au roluri: cel în care scrie captura, cel mai nou cadru încă nepreluat (pending),
+    cel aflat în inferență și cel afișat. Un cadru nou suprascrie pending-ul vechi, ca la
+    LatestFrameSlot; către worker pleacă doar indicele slotului.
+    """
+
+    def __init__(self, shape, slots=FRAME_SLOTS):
+        self.shape = tuple(shape)
+        self.slots = slots
+        self.shm = shared_memory.SharedMemory(create=True, size=slots * int(np.prod(self.shape)))
+        self.frames = np.ndarray((slots,) + self.shape, np.uint8, self.shm.buf)
+        self.captured_at = [0.0] * slots
+        self._lock = threading.Lock()
+        self.pending = None
+        self.processing = None
+        self.shown = None
+        self.overwritten = 0
+
+    def acquire_write_slot(self):
+        with self._lock:
+            busy = (self.pending, self.processing, self.shown)
+        return next(slot for slot in range(self.slots) if slot not in busy)
+
+    def publish(self, slot, captured_at):
+        with self._lock:
+            if self.pending is not None:
+                self.overwritten += 1
+            self.captured_at[slot] = captured_at
+            self.pending = slot
+
+    def take_pending(self):
+        """(slot, captured_at) pentru worker, sau None dacă e ocupat ori nu are cadru nou."""
+        with self._lock:
+            if self.processing is not None or self.pending is None:
+                return None
+            self.processing, self.pending = self.pending, None
+            return self.processing, self.captured_at[self.processing]
+
+    def finish(self, slot):
+        with self._lock:
+            self.shown = slot
+            self.processing = None
+
+    def shown_frame(self):
+        # Copie: după următorul finish() slotul poate fi rescris de captură
+        with self._lock:
+            return None if self.shown is None else self.frames[self.shown].copy()
+
+    def close(self):
+        del self.frames
+        self.shm.close()
+        self.shm.unlink()
+
+
+def run_hand_worker(camera_id, shm_name, shape, slots, tasks, results, detector_factory, detector_args):
+    # Rulează în procesul worker al camerei, până primește None
+    shm = shared_memory.SharedMemory(name=shm_name)
+    frames = np.ndarray((slots,) + tuple(shape), np.uint8, shm.buf)
+    detect = detector_factory(*detector_args)
+    image_h, image_w = shape[:2]
+    try:
+        while True:
+            task = tasks.get()
+            if task is None:
+                break
+            slot, captured_at = task
+            started = time.perf_counter()
+            hands = [(points, extract_hand_features(points, image_w, image_h)) for points in detect(frames[slot])]
+            results.put((camera_id, slot, captured_at, hands, time.perf_counter() - started))
+    finally:
+        del frames
+        shm.close()
+
+
+def mediapipe_detector(max_hands=2, work_width=256, margin=0.35):
+    # Construit în worker: MediaPipe și OpenCV nu se încarcă în procesul principal pentru asta
+    import cv2
+    import mediapipe as mp
+
+    from roi_inference import RoiHandTracker
+
+    # Decuparea ROI urmărește o singură mână; cu mai multe ar ascunde mâinile noi din cadru.
+    # Când e activă, MediaPipe rulează în mod static (vezi RoiHandTracker)
+    use_roi = max_hands == 1
+    hands = mp.solutions.hands.Hands(static_image_mode=use_roi, max_num_hands=max_hands,
+                                     min_detection_confidence=0.7, min_tracking_confidence=0.7)
+    tracker = RoiHandTracker(hands, work_width=work_width, margin=margin, enabled=use_roi)
+
+    def detect(image_bgr):
+        results = tracker.process(cv2.cvtColor(image_bgr, cv2.COLOR_BGR2RGB))
+        return [landmarks_to_array(hand.landmark) for hand in results.multi_hand_landmarks or ()]
+
+    return detect
+
+
+class CvCamera:
+    """cv2.VideoCapture care scrie cadrul (oglindit) direct într-un slot din SharedFrameRing."""
+
+    def __init__(self, source, flip=True):
+        import cv2
+        self._cv2 = cv2
+        self.source = source
+        self.flip = flip
+        self.cap = cv2.VideoCapture(source)
+        success, frame = self.cap.read() if self.cap.isOpened() else (False, None)
+        self.shape = frame.shape if success else None
+
+    def is_open(self):
+        return self.cap.isOpened()
+
+    def read_into(self, out):
+        success, image = self.cap.read()
+        if not success:
+            return False
+        if self.flip:
+            self._cv2.flip(image, 1, dst=out)
+        else:
+            out[:] = image
+        return True
+
+    def release(self):
+        self.cap.release()
+
+
+class VisionService:
+    """Inferența de mâini pentru mai multe camere, câte un proces worker pe cameră.
+
+    Captura rămâne în procesul principal (un thread pe cameră) și scrie cadrul direct în
+    SharedFrameRing-ul camerei; worker-ul primește doar indicele slotului și întoarce, pe o coadă
+    comună, landmark-urile și HandFeatures pentru fiecare mână. Fiecare worker are cel mult un cadru
+    în lucru și între timp se păstrează doar cel mai nou, deci o cameră lentă pierde cadre în loc
+    să adune întârziere. Worker-ii sunt procese persistente, nu un pool de sarcini oarecare:
+    urmărirea MediaPipe are nevoie de cadrele consecutive ale aceleiași camere.
+
+    on_result(camera_id, hands, captured_at) rulează pe un singur thread (colectorul), în ordinea
+    sosirii rezultatelor, deci arbitrajul dintre camere nu are nevoie de lock-uri.
+    """
+
+    def __init__(self, cameras, on_result, detector_factory=mediapipe_detector, detector_args=(), timings=None,
+                 slots=FRAME_SLOTS):
+        self.cameras = list(cameras)
+        self.on_result = on_result
+        self.detector_factory = detector_factory
+        self.detector_args = tuple(detector_args)
+        self.timings = timings
+        # spawn și pe Linux: un fork ar copia thread-urile și socket-urile procesului principal
+        self._ctx = multiprocessing.get_context("spawn")
+        self.rings = [SharedFrameRing(camera.shape, slots) for camera in self.cameras]
+        self._tasks = [self._ctx.SimpleQueue() for _ in self.cameras]
+        self._results = self._ctx.SimpleQueue()
+        self.capture_rates = [StageRate(f"Cam{i}") for i in range(len(self.cameras))]
+        self.inference_rates = [StageRate(f"Cam{i} inferență") for i in range(len(self.cameras))]
+        self.latest = [None] * len(self.cameras)  # (mâini, momentul capturii) pe cameră
+        self._stop = threading.Event()
+        self._workers = []
+        self._threads = []
+
+    def start(self):
+        for camera_id, (ring, tasks) in enumerate(zip(self.rings, self._tasks)):
+            worker = self._ctx.Process(target=run_hand_worker, name=f"hands-cam{camera_id}", daemon=True,
+                                       args=(camera_id, ring.shm.name, ring.shape, ring.slots, tasks,
+                                             self._results, self.detector_factory, self.detector_args))
+            worker.start()
+            self._workers.append(worker)
+        self._threads.append(start_stage_thread("vision-collect", self._collect))
+        for camera_id in range(len(self.cameras)):
+            self._threads.append(start_stage_thread(f"capture-cam{camera_id}", self._capture, camera_id))
+        return self
+
+    def _capture(self, camera_id):
+        camera = self.cameras[camera_id]
+        ring = self.rings[camera_id]
+        read_stage = f"cam{camera_id}_read"
+        while not self._stop.is_set() and camera.is_open():
+            slot = ring.acquire_write_slot()
+            started = time.perf_counter()
+            success = camera.read_into(ring.frames[slot])
+            if self.timings:
+                self.timings.stop(read_stage, started)
+            if not success:
+                time.sleep(0.005)
+                continue
+            ring.publish(slot, time.monotonic())
+            self.capture_rates[camera_id].tick()
+            self._dispatch(camera_id)
+
+    def _dispatch(self, camera_id):
+        task = self.rings[camera_id].take_pending()
+        if task is not None:
+            self._tasks[camera_id].put(task)
+
+    def _collect(self):
+        while True:
+            item = self._results.get()
+            if item is None:
+                break
+            camera_id, slot, captured_at, hands, infer_sec = item
+            self.rings[camera_id].finish(slot)
+            self._dispatch(camera_id)
+            self.latest[camera_id] = (hands, captured_at)
+            self.inference_rates[camera_id].tick()
+            self.on_result(camera_id, hands, captured_at)
+            if self.timings:
+                self.timings.record(f"cam{camera_id}_infer", infer_sec)
+                self.timings.record(f"cam{camera_id}_e2e", time.monotonic() - captured_at)
+
+    def frame(self, camera_id):
+        """Copia ultimului cadru trecut prin inferență (cel la care se referă latest), sau None."""
+        return self.rings[camera_id].shown_frame()
+
+    def rates(self):
+        return [rate for pair in zip(self.capture_rates, self.inference_rates) for rate in pair]
+
+    def stats(self):
+        return {f"cam{i}": {"capture_fps": round(capture.fps, 1), "inference_fps": round(inference.fps, 1),
+                            "overwritten": ring.overwritten, "worker_alive": worker.is_alive()}
+                for i, (capture, inference, ring, worker) in enumerate(zip(
+                    self.capture_rates, self.inference_rates, self.rings, self._workers))}
+
+    def close(self, timeout=2.0):
+        self._stop.set()
+        for tasks in self._tasks:
+            tasks.put(None)
+        for worker in self._workers:
+            worker.join(timeout)
+            if worker.is_alive():
+                worker.terminate()
+        self._results.put(None)
+        for thread in self._threads:
+            thread.join(timeout)
+        for ring in self.rings:
+            ring.close()
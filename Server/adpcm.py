@@ -0,0 +1,134 @@
+# IMA-ADPCM decoder for the audio stream (4 bits/sample, 4:1 against 16-bit PCM).
+#
+# Packet payload, for C channels:
+#   C x channel header: predictor (int16 LE), step index (uint8), reserved (uint8)
+#   C x channel block:  N/2 bytes of nibbles for that channel, low nibble first
+# Every packet carries its own decoder state, so a lost packet never corrupts the next one.
+import array
+import sys
+
+CHANNEL_HEADER_SIZE = 4
+
+STEP_TABLE = array.array('H', [
+    7, 8, 9, 10, 11, 12, 13, 14, 16, 17, 19, 21, 23, 25, 28, 31, 34, 37, 41, 45,
+    50, 55, 60, 66, 73, 80, 88, 97, 107, 118, 130, 143, 157, 173, 190, 209, 230, 253, 279, 307,
+    337, 371, 408, 449, 494, 544, 598, 658, 724, 796, 876, 963, 1060, 1166, 1282, 1411, 1552, 1707, 1878, 2066,
+    2272, 2499, 2749, 3024, 3327, 3660, 4026, 4428, 4871, 5358, 5894, 6484, 7132, 7845, 8630, 9493, 10442, 11487,
+    12635, 13899, 15289, 16818, 18500, 20350, 22385, 24623, 27086, 29794, 32767])
+
+HAVE_VIPER = sys.implementation.name == "micropython"
+if HAVE_VIPER:
+    import micropython
+
+    # Viper functions take at most four arguments, so the rest travel in a small int32 array:
+    # params = [src_offset, src_bytes, dst_offset, dst_stride, predictor, step_index]
+    @micropython.viper
+    def _decode_channel_viper(src: ptr8, dst: ptr16, params: ptr32, steps: ptr16) -> int:
+        i = params[0]
+        end = i + params[1]
+        out = params[2]
+        stride = params[3]
+        predictor = params[4]
+        index = params[5]
+        while i < end:
+            byte = src[i]
+            shift = 0
+            while shift < 8:
+                code = (byte >> shift) & 15
+                step = steps[index]
+                diff = step >> 3
+                if code & 4:
+                    diff += step
+                if code & 2:
+                    diff += step >> 1
+                if code & 1:
+                    diff += step >> 2
+                if code & 8:
+                    predictor -= diff
+                else:
+                    predictor += diff
+                if predictor > 32767:
+                    predictor = 32767
+                elif predictor < -32768:
+                    predictor = -32768
+                magnitude = code & 7
+                if magnitude >= 4:
+                    index += (magnitude - 3) * 2
+                else:
+                    index -= 1
+                if index < 0:
+                    index = 0
+                elif index > 88:
+                    index = 88
+                dst[out] = predictor
+                out += stride
+                shift += 4
+            i += 1
+        return out
+
+
+def _decode_channel_py(src, dst, params, steps):
+    i, n_bytes, out, stride, predictor, index = params
+    end = i + n_bytes
+    while i < end:
+        byte = src[i]
+        for code in (byte & 15, byte >> 4):
+            step = steps[index]
+            diff = step >> 3
+            if code & 4:
+                diff += step
+            if code & 2:
+                diff += step >> 1
+            if code & 1:
+                diff += step >> 2
+            predictor = predictor - diff if code & 8 else predictor + diff
+            if predictor > 32767:
+                predictor = 32767
+            elif predictor < -32768:
+                predictor = -32768
+            magnitude = code & 7
+            index += (magnitude - 3) * 2 if magnitude >= 4 else -1
+            if index < 0:
+                index = 0
+            elif index > 88:
+                index = 88
+            dst[out] = predictor
+            out += stride
+        i += 1
+    return out
+
+
+class AdpcmDecoder:
+    """Decodes packets into one reused output buffer, ready for audio_out.write."""
+
+    def __init__(self, max_payload_bytes=2048):
+        self.out = bytearray(max_payload_bytes * 4)
+        self.out_view = memoryview(self.out)
+        self._params = array.array('i', [0, 0, 0, 0, 0, 0])
+        if HAVE_VIPER:
+            self._decode = _decode_channel_viper
+            self._dst = self.out
+        else:
+            self._decode = _decode_channel_py
+            self._dst = memoryview(self.out).cast('h')
+        self.packets = 0
+
+    def decode(self, payload, channels=1):
+        block_bytes = (len(payload) - CHANNEL_HEADER_SIZE * channels) // channels
+        if block_bytes <= 0:
+            return self.out_view[:0]
+        params = self._params
+        for ch in range(channels):
+            h = ch * CHANNEL_HEADER_SIZE
+            predictor = payload[h] | (payload[h + 1] << 8)
+            if predictor >= 32768:
+                predictor -= 65536
+            params[0] = CHANNEL_HEADER_SIZE * channels + ch * block_bytes
+            params[1] = block_bytes
+            params[2] = ch
+            params[3] = channels
+            params[4] = predictor
+            params[5] = min(payload[h + 2], 88)
+            self._decode(payload, self._dst, params, STEP_TABLE)
+        self.packets += 1
+        return self.out_view[:block_bytes * 2 * channels * 2]
@@ -0,0 +1,87 @@
+# Binary control frames, the counterpart of Client/pythonProject/control_channel.py:
+#   magic (0xA5), opcode, session, sequence (uint16 LE), then the opcode's payload.
+# Text commands always start with a letter, so the first byte tells the two formats apart.
+#
+# Frames are applied strictly in sequence order. Every frame is answered with a cumulative
+# ACK carrying the last sequence applied in order; frames that are early (one before them
+# was lost) are dropped, and the client resends everything unacknowledged (go-back-N).
+# A new session byte means the client restarted; every session starts at sequence 0.
+
+CONTROL_MAGIC = 0xA5
+CONTROL_HEADER_SIZE = 5
+CONFIG_PAYLOAD_FORMAT = "<IBBB"
+START_PAYLOAD_FORMAT = "<II"  # deadline on the Pico's ticks_us clock, sample_pos of the first sample
+
+OP_CONFIG = 1
+OP_VOL = 2
+OP_PLAY = 3
+OP_PAUSE = 4
+OP_STOP = 5
+OP_NEXT = 6
+OP_PREV = 7
+OP_GC = 8
+OP_STATS = 9
+OP_SYNC = 10
+OP_START = 11
+OP_ACK = 0x80
+
+CONFIG_FLAG_SEQ = 1
+CONFIG_FLAG_ADPCM = 2
+CONFIG_FLAG_GAIN = 4  # the client streams at unity gain and the Pico applies the volume
+
+SEQ_MASK = 0xFFFF
+SEQ_HALF = 0x8000
+
+# Minimum frame length per opcode (header + payload)
+FRAME_LENGTHS = {OP_CONFIG: CONTROL_HEADER_SIZE + 7, OP_VOL: CONTROL_HEADER_SIZE + 1, OP_START: CONTROL_HEADER_SIZE + 8}
+
+
+def is_control_frame(data):
+    return len(data) >= CONTROL_HEADER_SIZE and data[0] == CONTROL_MAGIC
+
+
+def frame_seq(data):
+    return data[3] | (data[4] << 8)
+
+
+class ControlSequencer:
+    def __init__(self):
+        self.session = -1
+        self.expected = 0
+        self.ack = bytearray(CONTROL_HEADER_SIZE)
+        self.ack[0] = CONTROL_MAGIC
+        self.ack[1] = OP_ACK
+        self.accepted = 0
+        self.duplicates = 0
+        self.early = 0
+        self.malformed = 0
+
+    def accept(self, data):
+        # True when the frame is the next one in order and must be applied; self.ack is
+        # updated either way and should be sent back to the client
+        if len(data) < FRAME_LENGTHS.get(data[1], CONTROL_HEADER_SIZE):
+            self.malformed += 1
+            return False
+        seq = frame_seq(data)
+        if data[2] != self.session:
+            self.session = data[2]
+            self.expected = 0
+        ahead = (seq - self.expected) & SEQ_MASK
+        if ahead == 0:
+            self.expected = (seq + 1) & SEQ_MASK
+            self.accepted += 1
+            applied = True
+        else:
+            if ahead >= SEQ_HALF:
+                self.duplicates += 1
+            else:
+                self.early += 1
+            applied = False
+        last = (self.expected - 1) & SEQ_MASK
+        self.ack[2] = self.session
+        self.ack[3] = last & 0xFF
+        self.ack[4] = last >> 8
+        return applied
+
+    def stats(self):
+        return {"accepted": self.accepted, "dup": self.duplicates, "early": self.early, "malformed": self.malformed}
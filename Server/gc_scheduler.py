@@ -0,0 +1,42 @@
+# Explicit garbage collection at moments the main loop chooses (right after a batch of packets,
+# or when it wakes up idle) instead of whenever an allocation happens to cross the threshold.
+# The automatic collector stays on as a backstop with a higher threshold.
+import gc
+import time
+
+
+class GcScheduler:
+    def __init__(self, collect_bytes=8192):
+        self.collect_bytes = collect_bytes
+        self.collections = 0
+        self.total_pause_us = 0
+        self.max_pause_us = 0
+        # gc.mem_alloc/threshold only exist on MicroPython; on the host nothing is ever due
+        self._mem_alloc = getattr(gc, "mem_alloc", None)
+        if hasattr(gc, "threshold"):
+            gc.threshold(collect_bytes * 4)
+        self._after_last = self.allocated()
+
+    def allocated(self):
+        return self._mem_alloc() if self._mem_alloc else 0
+
+    def maybe_collect(self, idle=False):
+        grown = self.allocated() - self._after_last
+        if grown >= self.collect_bytes or (idle and grown > 0):
+            self.collect()
+
+    def collect(self):
+        start = time.ticks_us()
+        gc.collect()
+        pause = time.ticks_diff(time.ticks_us(), start)
+        self.collections += 1
+        self.total_pause_us += pause
+        if pause > self.max_pause_us:
+            self.max_pause_us = pause
+        self._after_last = self.allocated()
+
+    def report(self):
+        # GC:collections:total_pause_us:max_pause_us:free_bytes:allocated_bytes
+        free = gc.mem_free() if hasattr(gc, "mem_free") else 0
+        return "GC:%d:%d:%d:%d:%d" % (self.collections, self.total_pause_us, self.max_pause_us,
+                                       free, self.allocated())
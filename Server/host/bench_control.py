@@ -0,0 +1,76 @@
+# Pico-side cost of parsing one control message: the text protocol (string path and the
+# byte-level path) against binary frames (sequencer + payload read).
+import struct
+import time
+
+import host_env
+
+host_env.install()
+
+from control_protocol import (CONFIG_PAYLOAD_FORMAT, CONTROL_HEADER_SIZE, CONTROL_MAGIC, OP_CONFIG,  # noqa: E402
+                              OP_VOL, ControlSequencer)
+from packet_rx import command_length, has_prefix, parse_int  # noqa: E402
+
+CALLS = 100000
+
+
+def per_call_us(fn):
+    start = time.perf_counter()
+    for _ in range(CALLS):
+        fn()
+    return (time.perf_counter() - start) / CALLS * 1e6
+
+
+def text_vol(data):
+    message = data.decode('utf-8').strip().upper()
+    if message.startswith("VOL:"):
+        return int(message.split(':')[1])
+
+
+def bytes_vol(data):
+    n = command_length(data)
+    if has_prefix(data, n, b"VOL:"):
+        return parse_int(data, 4, n)
+
+
+def text_config(data):
+    parts = data.decode('utf-8').strip().upper().split(':')
+    return int(parts[1]), int(parts[2]), int(parts[3]), "SEQ" in parts[4:], "ADPCM" in parts[4:]
+
+
+class BinaryParser:
+    def __init__(self):
+        self.sequencer = ControlSequencer()
+        self.seq = 0
+
+    def frame(self, opcode, payload):
+        return bytearray(struct.pack("<BBBH", CONTROL_MAGIC, opcode, 1, 0) + payload)
+
+    def parse(self, frame):
+        # Sequence stamped in place, so every call is the next frame in order
+        frame[3] = self.seq & 0xFF
+        frame[4] = (self.seq >> 8) & 0xFF
+        self.seq = (self.seq + 1) & 0xFFFF
+        if not self.sequencer.accept(frame):
+            raise AssertionError("frame rejected")
+        if frame[1] == OP_VOL:
+            return frame[CONTROL_HEADER_SIZE]
+        return struct.unpack_from(CONFIG_PAYLOAD_FORMAT, frame, CONTROL_HEADER_SIZE)
+
+
+def main():
+    binary = BinaryParser()
+    vol_frame = binary.frame(OP_VOL, bytes([75]))
+    config_frame = binary.frame(OP_CONFIG, struct.pack(CONFIG_PAYLOAD_FORMAT, 44100, 16, 2, 1))
+    print("VOL:75")
+    print(f"  text, string path : {per_call_us(lambda: text_vol(b'VOL:75')):.2f} us")
+    print(f"  text, byte path   : {per_call_us(lambda: bytes_vol(b'VOL:75')):.2f} us")
+    print(f"  binary frame      : {per_call_us(lambda: binary.parse(vol_frame)):.2f} us")
+    print("CONFIG:44100:16:2:SEQ")
+    print(f"  text, string path : {per_call_us(lambda: text_config(b'CONFIG:44100:16:2:SEQ')):.2f} us")
+    print(f"  binary frame      : {per_call_us(lambda: binary.parse(config_frame)):.2f} us")
+    print(f"sequencer: {binary.sequencer.stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+# Cost of one display multiplex tick: the old per-pin Timer callback against SegmentDisplay.tick,
+# which writes precomputed masks through the SIO registers (machine.mem32 stand-in on the host).
+# Also checks that both leave the pins in the same state for every volume and digit.
+# Allocations are the peak of transient memory during one callback, which is what a
+# MicroPython ISR would have to take from the heap.
+import time
+import tracemalloc
+
+import host_env
+
+host_env.install()
+
+from machine import Pin, mem32  # noqa: E402
+from seven_segment import SEGMENT_PATTERNS, SegmentDisplay  # noqa: E402
+
+SEGMENT_GPIOS = [0, 1, 2, 3, 4, 5, 6, 7]
+DIGIT_GPIOS = [16, 17, 18, 19]
+
+
+class LegacyDisplay:
+    # The callback main.py used before: per-pin value() calls and a fresh list/tuple per tick
+
+    def __init__(self):
+        self.segment_pins = [Pin(g, Pin.OUT, value=1) for g in SEGMENT_GPIOS]
+        self.digit_pins = [Pin(g, Pin.OUT, value=0) for g in DIGIT_GPIOS]
+        self.index = 0
+        self.value = 0
+
+    def tick(self, timer=None):
+        for pin in self.digit_pins: pin.value(0)
+        for pin in self.segment_pins: pin.value(1)
+        if self.index == 0:
+            char = (self.value // 1000) % 10
+        elif self.index == 1:
+            char = (self.value // 100) % 10
+        elif self.index == 2:
+            char = (self.value // 10) % 10
+        else:
+            char = self.value % 10
+        pattern = list(SEGMENT_PATTERNS.get(char, SEGMENT_PATTERNS[' ']))
+        pattern[7] = 1
+        for i, level in enumerate(tuple(pattern)):
+            self.segment_pins[i].value(level)
+        for i, pin in enumerate(self.digit_pins):
+            pin.value(1 if i == self.index else 0)
+        self.index = (self.index + 1) % len(self.digit_pins)
+
+
+def pin_state():
+    return tuple(Pin.by_id[g].value() for g in SEGMENT_GPIOS + DIGIT_GPIOS)
+
+
+def check_equivalence(legacy, display):
+    for volume in range(101):
+        legacy.value = volume
+        display.show(volume)
+        for _ in range(len(DIGIT_GPIOS)):
+            legacy.tick()
+            expected = pin_state()
+            display.tick()
+            if pin_state() != expected:
+                raise AssertionError(f"pin mismatch at volume {volume}, digit {display.index}")
+
+
+def measure(tick, calls):
+    tick()
+    tracemalloc.start()
+    allocated = 0
+    for _ in range(8):
+        current = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        tick()
+        allocated = max(allocated, tracemalloc.get_traced_memory()[1] - current)
+    tracemalloc.stop()
+    start = time.perf_counter()
+    for _ in range(calls):
+        tick()
+    return (time.perf_counter() - start) / calls * 1e6, allocated
+
+
+def main():
+    legacy = LegacyDisplay()
+    display = SegmentDisplay(SEGMENT_GPIOS, DIGIT_GPIOS)
+    check_equivalence(legacy, display)
+    print("pin states match for volumes 0..100")
+    writes_before = mem32.writes
+    display.tick()
+    register_writes = mem32.writes - writes_before
+    calls = 50000
+    mem32.drive_pins = False
+    for label, tick in (("legacy Pin.value", legacy.tick), ("SIO masks", display.tick_cb)):
+        us, allocated = measure(tick, calls)
+        print(f"{label:17s}: {us:6.2f} us/tick, peak {allocated} bytes allocated per tick")
+    print(f"SIO masks: {register_writes} register writes per tick "
+          f"(legacy: {2 * (len(SEGMENT_GPIOS) + len(DIGIT_GPIOS))} Pin.value calls)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,254 @@
+# End-to-end streaming benchmark: the client's own streaming thread (main.audio_streamer_thread,
+# with its pacer, packetizer and binary control channel) plays a WAV of tagged tone through an
+# impaired localhost link to the real firmware, whose I2S stand-in plays ibuf out in real time.
+# For each link configuration:
+#   underruns  DAC starvations while the stream was running, and the silence they caused
+#   lost       packets sent but never heard (dropped, or too late for the jitter buffer)
+#   latency    client send -> first sample of that packet leaving the DAC
+#   pps        packets/s sent by the client and reaching I2S.write
+#   cpu        firmware thread and client streaming thread, as a share of one core
+# The I2S irq handler runs on the DAC thread here, so its (small) cost is not in the firmware CPU.
+# cv2 and mediapipe are stubbed in sys.modules, as this directory stands in for machine: importing
+# the client's main.py only touches them to name the MediaPipe helpers, the streaming path never does.
+import importlib
+import os
+import socket
+import struct
+import sys
+import tempfile
+import threading
+import time
+import types
+import wave
+
+import host_env
+import machine
+import netem
+import poll_select
+from machine import I2S
+
+CLIENT_DIR = os.path.join(os.path.dirname(host_env.SERVER_DIR), "Client", "pythonProject")
+sys.path.append(CLIENT_DIR)
+
+from control_channel import ControlChannel  # noqa: E402
+
+AUDIO_ADDR = ("127.0.0.1", 12345)
+CONTROL_ADDR = ("127.0.0.1", 12346)
+RATE = 22050
+MARKER = 0x7EA5  # first sample of every packet; the second one carries its sequence number
+
+CONFIGS = [
+    netem.Impairment(),
+    netem.Impairment(loss=0.02),
+    netem.Impairment(loss=0.05),
+    netem.Impairment(delay_ms=20, jitter_ms=15),
+    netem.Impairment(reorder=0.05),
+    netem.Impairment(loss=0.02, delay_ms=20, jitter_ms=15, reorder=0.05),
+]
+
+
+def stub_vision_modules():
+    mediapipe = types.ModuleType("mediapipe")
+    mediapipe.solutions = types.SimpleNamespace(hands=types.SimpleNamespace(HAND_CONNECTIONS=()),
+                                                drawing_utils=None, drawing_styles=None)
+    sys.modules.setdefault("cv2", types.ModuleType("cv2"))
+    sys.modules.setdefault("mediapipe", mediapipe)
+
+
+def import_client_main():
+    # Server and client both have main.py and adpcm.py: the client's are imported while its
+    # directory comes first on sys.path, then dropped from sys.modules so the firmware gets its own
+    stub_vision_modules()
+    shadowed = ("main", "adpcm")
+    saved = {name: sys.modules.pop(name) for name in shadowed if name in sys.modules}
+    sys.path.insert(0, CLIENT_DIR)
+    try:
+        return importlib.import_module("main")
+    finally:
+        sys.path.remove(CLIENT_DIR)
+        for name in shadowed:
+            sys.modules.pop(name, None)
+        sys.modules.update(saved)
+
+
+class SendProbe:
+    """Stands in for the client's audio socket and notes when each sequence number was sent."""
+
+    def __init__(self, sock):
+        self.sock = sock
+        self.sent_at = {}
+
+    def _record(self, header):
+        self.sent_at.setdefault(header[0] | (header[1] << 8), time.monotonic())
+
+    def sendto(self, data, addr):
+        self._record(data)
+        return self.sock.sendto(data, addr)
+
+    def sendmsg(self, buffers, ancdata, flags, addr):
+        self._record(buffers[0])
+        return self.sock.sendmsg(buffers, ancdata, flags, addr)
+
+    def close(self):
+        self.sock.close()
+
+
+class PlayProbe:
+    def __init__(self, dac):
+        self.dac = dac
+        self.heard = {}
+        self.first_heard = None
+        self.silent_at_first = 0.0
+
+    def __call__(self, t, head):
+        if len(head) >= 4:
+            marker, seq = struct.unpack_from("<HH", head, 0)
+            if marker == MARKER and seq not in self.heard:
+                if self.first_heard is None:
+                    # Silence before the jitter buffer has prefilled is start-up, not an underrun
+                    self.first_heard = t
+                    self.silent_at_first = self.dac.silent_sec
+                self.heard[seq] = t
+
+
+def thread_cpu(thread):
+    return time.clock_gettime(time.pthread_getcpuclockid(thread.ident))
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))] if ordered else 0.0
+
+
+def chunk_frames(client):
+    # What audio_streamer_thread picks for 16-bit mono PCM, so the tags line up with its packets
+    return client.choose_chunk_frames(2, RATE, client.AUDIO_MTU, client.PICO_RECV_BUFFER_BYTES,
+                                      header_bytes=client.AUDIO_HEADER_SIZE,
+                                      target_packet_rate=client.AUDIO_TARGET_PACKET_RATE)
+
+
+def write_tagged_tone(path, packets, frames):
+    pcm = bytearray(struct.pack(f"<{frames}h", *[int(8000 * ((i * 440 * 2 // RATE) % 2 * 2 - 1))
+                                                 for i in range(frames)]))
+    with wave.open(path, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(RATE)
+        for seq in range(packets):
+            struct.pack_into("<HH", pcm, 0, MARKER, seq)
+            wav.writeframes(pcm)
+
+
+def setup_client(client, music_dir):
+    client.AUDIO_FILES_DIR = music_dir
+    client.track_index = client.TrackIndex(os.path.join(music_dir, "track_index.json"))
+    client.load_song_list_from_dir()
+    client.AUDIO_CODEC = "pcm"
+    client.AUDIO_FRAMING = True
+    client.AUDIO_NORMALIZE = False
+    client.PLAYLIST_GAPLESS = False  # one track, the stream ends with it
+    client.MULTIROOM_SYNC_START = False
+    client.AUDIO_MULTICAST_GROUP = None
+
+
+def wait_for_silence(timeout=3.0):
+    deadline = time.monotonic() + timeout
+    while I2S.instances and I2S.instances[-1].dac and time.monotonic() < deadline:
+        if I2S.instances[-1].dac.queued_sec() == 0:
+            break
+        time.sleep(0.02)
+    time.sleep(0.05)
+
+
+def run_config(client, impairment, packets, firmware, seed):
+    audio_link = netem.ImpairedLink(AUDIO_ADDR, impairment, seed)
+    control_link = netem.ImpairedLink(CONTROL_ADDR, impairment, seed + 1)
+    client.PICO_IPS = [audio_link.addr[0]]
+    client.PICO_AUDIO_PORT = audio_link.addr[1]
+    client.control = ControlChannel(socket.socket(socket.AF_INET, socket.SOCK_DGRAM), control_link.addr,
+                                    max_retries=10)
+    client.sock_audio = probe_sock = SendProbe(socket.socket(socket.AF_INET, socket.SOCK_DGRAM))
+    # Volume 100 leaves the Pico gain at unity, so the tags reach the DAC unchanged
+    client.control.send_volume(100)
+    if not client.open_song_for_streaming(0):
+        raise RuntimeError("bench: cannot open the test track")
+    i2s = I2S.instances[-1]
+    probe = PlayProbe(i2s.dac)
+    i2s.dac.on_play = probe
+    client.control.send_command("PLAY")
+    time.sleep(0.05)
+
+    client.is_streaming_allowed = True
+    client.playback_paused_by_gesture = False
+    client.audio_thread_stop_event.clear()
+    client_cpu = []
+
+    def stream():
+        client.audio_streamer_thread()
+        client_cpu.append(time.thread_time())
+
+    streamer = threading.Thread(target=stream)
+    writes0 = i2s.writes
+    fw_cpu0 = thread_cpu(firmware)
+    start = time.monotonic()
+    streamer.start()
+    streamer.join()
+    end = max(probe_sock.sent_at.values(), default=time.monotonic())
+    fw_cpu = thread_cpu(firmware) - fw_cpu0
+    # Underruns are counted from the first heard packet up to the last send; after that the
+    # stream runs dry on purpose
+    first = probe.first_heard or end
+    underruns = sum(1 for t in i2s.dac.underrun_times if first < t <= end)
+    silent_ms = (i2s.dac.silent_sec - probe.silent_at_first) * 1000 if probe.first_heard else 0.0
+    writes = i2s.writes - writes0
+    time.sleep(1.0)
+
+    client.control.send_command("PAUSE")
+    client.control.close()
+    client.current_stream.close()
+    client.current_stream = None
+    audio_link.close()
+    control_link.close()
+    probe_sock.close()
+    wait_for_silence()
+
+    sent_at = probe_sock.sent_at
+    latencies = [(probe.heard[seq] - t) * 1000 for seq, t in sent_at.items() if seq in probe.heard]
+    lost = sum(1 for seq in range(packets) if seq not in probe.heard)
+    wall = end - start
+    return {"config": impairment.describe(), "underruns": underruns, "silent_ms": silent_ms,
+            "lost": lost, "sent": len(sent_at),
+            "lat_p50": percentile(latencies, 0.5), "lat_p95": percentile(latencies, 0.95),
+            "lat_max": max(latencies) if latencies else 0.0,
+            "pps_sent": len(sent_at) / wall, "pps_i2s": writes / wall,
+            "fw_cpu": fw_cpu / wall * 100, "client_cpu": client_cpu[0] / wall * 100}
+
+
+def main():
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 6.0
+    host_env.install()
+    client = import_client_main()
+    frames = chunk_frames(client)
+    packets = int(seconds * RATE / frames)
+    music_dir = tempfile.mkdtemp(prefix="bench_e2e_")
+    write_tagged_tone(os.path.join(music_dir, "tone.wav"), packets, frames)
+    setup_client(client, music_dir)
+
+    machine.REALTIME = True
+    firmware = threading.Thread(target=host_env.run_firmware, kwargs={"select_module": poll_select}, daemon=True)
+    firmware.start()
+    time.sleep(0.3)
+
+    results = [run_config(client, impairment, packets, firmware, seed) for seed, impairment in enumerate(CONFIGS, 1)]
+    client.track_library.close_all()
+    print(f"\n{seconds:.0f} s per configuration, {RATE} Hz mono 16-bit, {frames} frames/packet")
+    print(f"{'link':40s} {'underruns':>9s} {'silent':>8s} {'lost':>9s} {'lat p50':>8s} {'p95':>7s} {'max':>7s} "
+          f"{'pps tx/i2s':>11s} {'cpu fw/cli':>11s}")
+    for r in results:
+        print(f"{r['config']:40s} {r['underruns']:9d} {r['silent_ms']:6.0f}ms {r['lost']:4d}/{r['sent']:<4d} "
+              f"{r['lat_p50']:6.1f}ms {r['lat_p95']:5.1f}ms {r['lat_max']:5.1f}ms "
+              f"{r['pps_sent']:5.1f}/{r['pps_i2s']:<5.1f} {r['fw_cpu']:4.1f}%/{r['client_cpu']:4.1f}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+# Volume on the Pico (pico_gain.py), two parts:
+#
+# 1. Cost per packet of PicoGain.apply, steady gain and during a ramp, for the packet sizes the
+#    client sends. Runs on the board too, where it times the viper routine:
+#        mpremote cp pico_gain.py : + run host/bench_gain.py
+#    Under CPython it times the pure Python fallback, which says nothing about the Pico.
+#
+# 2. (CPython only) How long a volume change takes to be heard: the firmware runs with the
+#    real-time I2S stand-in, a DC level is streamed and the volume is changed every 0.6 s, once
+#    with the gain applied by the client before sending (old path) and once with CONFIG ...:GAIN.
+#    Latency is from the VOL command to the first sample heard past halfway to the new level, so
+#    a Pico ramp that starts inside a write counts from where it crosses, not from the next write.
+#    With I2S_DRIVER_LEAD_MS = 20 on this host: client gain about 80 ms, Pico gain 20-45 ms
+#    depending on where the VOL falls against the next hand-off (median 24-40 ms across runs).
+import sys
+
+try:
+    import host_env
+except ImportError:
+    host_env = None  # on the board
+import time
+
+if host_env:
+    host_env.install()
+from pico_gain import HAVE_VIPER, Q15_ONE, PicoGain
+
+PACKET_SAMPLES = (256, 512, 1024)
+REPEATS = 200
+
+
+def ticks_us():
+    return time.ticks_us() if hasattr(time, "ticks_us") else int(time.perf_counter() * 1000000)
+
+
+def time_apply(samples, ramp):
+    buf = bytearray(samples * 2)
+    gain = PicoGain(50, ramp_frames=128)
+    view = memoryview(buf)
+    start = ticks_us()
+    for i in range(REPEATS):
+        if ramp:
+            gain.set_volume(30 if i & 1 else 70)
+        gain.apply(view)
+    return (ticks_us() - start) / REPEATS
+
+
+def check_against_client():
+    # Steady gain must match the client's GainStage (truncated toward zero), and a ramp must land on the target
+    import struct
+    samples = [(-32768 + i * 257) % 65536 - 32768 for i in range(512)]
+    buf = bytearray(struct.pack("<512h", *samples))
+    gain = PicoGain(40, ramp_frames=64)
+    gain.apply(memoryview(buf))
+    expected = [int(s * ((40 * Q15_ONE + 50) // 100) / Q15_ONE) for s in samples]
+    steady_ok = list(struct.unpack("<512h", buf)) == expected
+    gain.set_volume(90)
+    buf = bytearray(struct.pack("<512h", *([20000] * 512)))
+    gain.apply(memoryview(buf))
+    out = struct.unpack("<512h", buf)
+    ramp_ok = out[0] < out[63] and out[63] == out[511] and gain.gain() == (90 * Q15_ONE + 50) // 100
+    monotonic = all(out[i] <= out[i + 1] for i in range(511))
+    return steady_ok, ramp_ok and monotonic
+
+
+def bench_cost():
+    print("PicoGain.apply, " + ("viper" if HAVE_VIPER else "pure Python fallback (not the Pico's cost)"))
+    steady_ok, ramp_ok = check_against_client()
+    print(f"same result as the client GainStage: {steady_ok}, ramp lands on the target: {ramp_ok}")
+    for samples in PACKET_SAMPLES:
+        steady = time_apply(samples, False)
+        ramp = time_apply(samples, True)
+        print(f"{samples:5d} samples ({samples * 2:4d} B): steady {steady:8.1f} us, with ramp {ramp:8.1f} us "
+              f"({steady * 1000 / samples:6.1f} ns/sample)")
+
+
+def bench_latency():
+    import os
+    import socket
+    import statistics
+    import threading
+
+    import machine
+    import poll_select
+    from machine import I2S
+
+    sys.path.append(os.path.join(os.path.dirname(host_env.SERVER_DIR), "Client", "pythonProject"))
+    from control_channel import ControlChannel
+    from gain import GainStage
+    from pacing import make_pacer
+    from packetizer import AUDIO_HEADER_SIZE, AudioFramer, Packetizer, choose_chunk_frames
+
+    rate, level = 22050, 16000
+    volumes = [30, 90, 20, 70, 40, 100, 10, 60]
+    machine.REALTIME = True
+    machine.RealtimeDac.HEAD_BYTES = 512  # past the 128-frame ramp
+    threading.Thread(target=host_env.run_firmware, kwargs={"select_module": poll_select}, daemon=True).start()
+    time.sleep(0.3)
+
+    results = {}
+    for mode in ("client", "pico"):
+        control = ControlChannel(socket.socket(socket.AF_INET, socket.SOCK_DGRAM), ("127.0.0.1", 12346))
+        control.send_volume(100)
+        control.send_config(rate, 16, 1, True, False, mode == "pico", timeout=3.0)
+        control.send_command("PLAY")
+        dac = I2S.instances[-1].dac
+        heard = []
+        dac.on_play = lambda t, head: heard.append((t, memoryview(head).cast("h")))
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        frames = choose_chunk_frames(2, rate, header_bytes=AUDIO_HEADER_SIZE)
+        pacer = make_pacer("deadline", frames * 1_000_000_000 // rate)
+        packetizer = Packetizer(sock, ("127.0.0.1", 12345))
+        framer = AudioFramer()
+        gain_stage = GainStage(frames)
+        pcm = bytes(level.to_bytes(2, "little", signed=True) * frames)
+        changes = []
+        volume = 100
+
+        def stream(seconds):
+            until = time.monotonic() + seconds
+            while time.monotonic() < until:
+                pacer.wait()
+                payload = gain_stage.process(pcm, volume, 2) if mode == "client" else pcm
+                packetizer.send(payload, framer.next_header(frames))
+
+        pacer.start()
+        start = time.monotonic()
+        stream(1.0)
+        for volume in volumes:
+            control.send_volume(volume)
+            changes.append((time.monotonic(), volume))
+            stream(0.6)
+        latencies = []
+        for (at, vol), (_prev_at, prev_vol) in zip(changes, [(start, 100)] + changes):
+            threshold = level * (vol + prev_vol) / 200
+            rising = vol > prev_vol
+            crossed = None
+            for t, samples in heard:
+                for i, sample in enumerate(samples):
+                    heard_at = t + i / rate
+                    if heard_at > at and (sample >= threshold if rising else sample <= threshold):
+                        crossed = heard_at
+                        break
+                if crossed is not None:
+                    latencies.append((crossed - at) * 1000)
+                    break
+        results[mode] = (latencies, frames * 1000 / rate)
+        control.send_command("PAUSE")
+        control.close()
+        sock.close()
+        time.sleep(0.8)
+
+    print(f"\nVolume change -> heard at the new level ({len(volumes)} changes, {rate} Hz mono, ibuf 8192 B):")
+    for mode, (latencies, packet_ms) in results.items():
+        name = "client gain (old)" if mode == "client" else "Pico gain (:GAIN)"
+        if latencies:
+            print(f"{name:18s}: median {statistics.median(latencies):6.1f} ms, max {max(latencies):6.1f} ms "
+                  f"({len(latencies)}/{len(volumes)} heard, packet = {packet_ms:.1f} ms)")
+        else:
+            print(f"{name:18s}: no change heard")
+
+
+def main():
+    bench_cost()
+    if host_env and "--cost-only" not in sys.argv:
+        bench_latency()
+
+
+main()
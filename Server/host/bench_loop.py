@@ -0,0 +1,93 @@
+# Drives the firmware over real localhost UDP sockets and measures how soon and how fast
+# audio packets get from the network to I2S.write.
+#   latency:    paced stream (50 packets/s, VOL chatter on the control port), send -> I2S.write
+#   throughput: back-to-back burst, packets per second reaching I2S.write
+import socket
+import struct
+import sys
+import threading
+import time
+
+import host_env
+import poll_select
+from machine import I2S
+
+AUDIO_ADDR = ("127.0.0.1", 12345)
+CONTROL_ADDR = ("127.0.0.1", 12346)
+PAYLOAD_BYTES = 320
+
+
+class WriteProbe:
+    def __init__(self):
+        self.latencies = []
+        self.times = []
+
+    def __call__(self, buf):
+        now = time.perf_counter()
+        sent_at, = struct.unpack_from("<d", buf, 0)
+        self.latencies.append(now - sent_at)
+        self.times.append(now)
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def start_firmware(ctrl):
+    threading.Thread(target=host_env.run_firmware, kwargs={"select_module": poll_select}, daemon=True).start()
+    deadline = time.monotonic() + 5
+    while not I2S.instances:
+        if time.monotonic() > deadline:
+            raise RuntimeError("firmware did not accept CONFIG")
+        ctrl.sendto(b"CONFIG:8000:16:1", CONTROL_ADDR)
+        time.sleep(0.05)
+    probe = WriteProbe()
+    I2S.instances[-1].sink = probe
+    time.sleep(0.1)
+    ctrl.sendto(b"PLAY", CONTROL_ADDR)
+    time.sleep(0.1)
+    return probe
+
+
+def packet():
+    return struct.pack("<d", time.perf_counter()) + bytes(PAYLOAD_BYTES - 8)
+
+
+def main():
+    paced_packets = int(sys.argv[1]) if len(sys.argv) > 1 else 250
+    burst_packets = int(sys.argv[2]) if len(sys.argv) > 2 else 5000
+    host_env.install()
+    ctrl = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    audio = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    probe = start_firmware(ctrl)
+
+    next_send = time.perf_counter()
+    for i in range(paced_packets):
+        next_send += 0.02
+        time.sleep(max(0.0, next_send - time.perf_counter()))
+        audio.sendto(packet(), AUDIO_ADDR)
+        if i % 5 == 0:
+            ctrl.sendto(b"VOL:%d" % (i % 100), CONTROL_ADDR)
+    time.sleep(0.2)
+    latencies = [x * 1000 for x in probe.latencies]
+    print(f"latency ({len(latencies)}/{paced_packets} packets): p50 {percentile(latencies, 0.5):.2f} ms, "
+          f"p95 {percentile(latencies, 0.95):.2f} ms, max {max(latencies):.2f} ms")
+
+    probe.latencies.clear()
+    probe.times.clear()
+    for _ in range(burst_packets):
+        audio.sendto(packet(), AUDIO_ADDR)
+    time.sleep(0.5)
+    received = len(probe.times)
+    span = probe.times[-1] - probe.times[0] if received > 1 else 0
+    rate = (received - 1) / span if span else 0
+    print(f"throughput: {received}/{burst_packets} packets written, {rate:.0f} packets/s")
+
+    ctrl.settimeout(1.0)
+    ctrl.sendto(b"GC", CONTROL_ADDR)
+    print(f"GC query: {ctrl.recvfrom(128)[0].decode()}")
+
+
+if __name__ == "__main__":
+    main()
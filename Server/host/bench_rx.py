@@ -0,0 +1,91 @@
+# Per-packet cost of the receive path over a localhost UDP socket: recvfrom + struct header
+# and text control parsing (before) against PacketReceiver + byte-level parsing (now).
+# "peak" is the transient memory one packet needs, i.e. what the Pico heap would have to supply.
+import socket
+import struct
+import time
+import tracemalloc
+
+import host_env
+
+host_env.install()
+
+from jitter_buffer import AUDIO_HEADER_SIZE, packet_sample_pos, packet_seq  # noqa: E402
+from packet_rx import PacketReceiver, command_length, has_prefix, parse_int  # noqa: E402
+
+PACKETS = 2000
+PAYLOAD_BYTES = 1400
+
+
+def old_audio(sock):
+    data, _addr = sock.recvfrom(2048)
+    seq, _flags, pos = struct.unpack_from("<HHI", data, 0)
+    return memoryview(data)[AUDIO_HEADER_SIZE:]
+
+
+def new_audio(rx):
+    packet = rx.read()
+    packet_seq(packet)
+    packet_sample_pos(packet)
+    return packet[AUDIO_HEADER_SIZE:]
+
+
+def old_control(data):
+    message = data.decode('utf-8').strip().upper()
+    if message.startswith("VOL:"):
+        return int(message.split(':')[1])
+
+
+def new_control(data):
+    n = command_length(data)
+    if has_prefix(data, n, b"VOL:"):
+        return parse_int(data, 4, n)
+
+
+def measure(step, count):
+    tracemalloc.start()
+    peak = 0
+    for _ in range(count):
+        current = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        step()
+        peak = max(peak, tracemalloc.get_traced_memory()[1] - current)
+    tracemalloc.stop()
+    return peak
+
+
+def timed(step, count):
+    start = time.perf_counter()
+    for _ in range(count):
+        step()
+    return (time.perf_counter() - start) / count * 1e6
+
+
+def fill(sender, addr):
+    packet = struct.pack("<HHI", 1, 0, 12345) + bytes(PAYLOAD_BYTES)
+    for _ in range(PACKETS):
+        sender.sendto(packet, addr)
+
+
+def main():
+    receiver = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    receiver.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 1 << 22)
+    receiver.bind(("127.0.0.1", 0))
+    sender = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    addr = receiver.getsockname()
+    rx = PacketReceiver(receiver, 2048)
+
+    for label, step in (("recvfrom + struct", lambda: old_audio(receiver)), ("PacketReceiver", lambda: new_audio(rx))):
+        fill(sender, addr)
+        peak = measure(step, PACKETS // 2)
+        us = timed(step, PACKETS // 2)
+        print(f"audio   {label:18s}: {us:5.2f} us/packet, peak {peak} bytes/packet")
+
+    vol = b"VOL:73\n"
+    for label, step in (("decode/split", lambda: old_control(vol)), ("byte parse", lambda: new_control(vol))):
+        peak = measure(step, 1000)
+        print(f"control {label:18s}: {timed(step, 100000):5.2f} us/message, peak {peak} bytes/message")
+
+
+if __name__ == "__main__":
+    main()
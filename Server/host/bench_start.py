@@ -0,0 +1,80 @@
+# Synchronised start (playout_sync.py) on the firmware, under CPython with the real-time I2S stand-in.
+# The client side (fanout.ControlGroup) measures the clock offset with SYNC, sends START for a moment
+# `delay` ahead and streams a ramp whose sample values are their own positions, starting
+# START_LEAD_MS before that moment as main.py does. From the first write heard at the DAC
+# (time and first sample value) this prints when sample 0 would have been heard, relative to the
+# START moment. With a short delay the first packets arrive after the deadline, so the start has to
+# skip the frames that are already late; with 0 the Pico gets START after the moment has passed.
+# Several Picos that hit the same moment this closely play the same sample together.
+import os
+import socket
+import struct
+import sys
+import threading
+import time
+
+import host_env
+import machine
+import poll_select
+from machine import I2S
+
+sys.path.append(os.path.join(os.path.dirname(host_env.SERVER_DIR), "Client", "pythonProject"))
+
+from control_channel import ControlChannel  # noqa: E402
+from fanout import START_LEAD_MS, ControlGroup  # noqa: E402
+from pacing import make_pacer  # noqa: E402
+from packetizer import AudioFramer, Packetizer  # noqa: E402
+
+RATE = 22050
+FRAMES = 441
+DELAYS_MS = (150, 120, 60, 20, 5, 0)
+STREAM_SEC = 0.6
+
+
+def start_once(group, delay_ms):
+    dac = I2S.instances[-1].dac
+    heard = []
+    dac.on_play = lambda t, head: heard.append((t, struct.unpack_from("<h", head, 0)[0]))
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    packetizer = Packetizer(sock, ("127.0.0.1", 12345))
+    framer = AudioFramer()
+    start_at = group.send_start(framer.sample_pos, delay_ms=delay_ms)
+    time.sleep(max(0.0, start_at - START_LEAD_MS / 1000 - time.monotonic()))
+    pacer = make_pacer("deadline", FRAMES * 1_000_000_000 // RATE)
+    pacer.start()
+    until = time.monotonic() + STREAM_SEC
+    while time.monotonic() < until:
+        pacer.wait()
+        pos = framer.sample_pos
+        packetizer.send(struct.pack("<%dh" % FRAMES, *[(pos + i) % 32768 for i in range(FRAMES)]),
+                        framer.next_header(FRAMES))
+    time.sleep(0.3)
+    sock.close()
+    dac.on_play = None
+    t, first_sample = heard[0]
+    return (t - first_sample / RATE - start_at) * 1000, first_sample
+
+
+def main():
+    machine.REALTIME = True
+    threading.Thread(target=host_env.run_firmware, kwargs={"select_module": poll_select}, daemon=True).start()
+    time.sleep(0.3)
+    for protocol in ("binary", "text"):
+        channel = ControlChannel(socket.socket(socket.AF_INET, socket.SOCK_DGRAM), ("127.0.0.1", 12346), protocol)
+        group = ControlGroup([channel])
+        group.send_config(RATE, 16, 1, True, timeout=3.0)
+        group.send_command("PLAY")
+        print(f"\n{protocol} control, {RATE} Hz mono, {FRAMES} frames/packet (DAC stand-in ticks every 1 ms):")
+        for delay_ms in DELAYS_MS:
+            error_ms, first_sample = start_once(group, delay_ms)
+            late_us = group.query_stats()[group.names[0]]["sync_late_us"]
+            print(f"START {delay_ms:3d} ms ahead: sample 0 heard {error_ms:+6.2f} ms from the START moment "
+                  f"(released {late_us:6d} us late, {first_sample:4d} frames skipped)")
+            group.send_command("STOP")
+            group.send_command("PLAY")
+            time.sleep(0.2)
+        group.close()
+        print(f"SYNC RTT {group.clocks[0].rtt_us} us")
+
+
+main()
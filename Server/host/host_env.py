@@ -0,0 +1,60 @@
+# Runs the Pico firmware (Server/main.py) under CPython with the stand-in modules from this directory.
+import os
+import runpy
+import sys
+import time
+
+HOST_DIR = os.path.dirname(os.path.abspath(__file__))
+SERVER_DIR = os.path.dirname(HOST_DIR)
+FIRMWARE_PATH = os.path.join(SERVER_DIR, "main.py")
+
+_TICKS_PERIOD = 1 << 30
+_clock = time.monotonic
+
+
+def _ticks_ms():
+    return int(_clock() * 1000) & (_TICKS_PERIOD - 1)
+
+
+def _ticks_us():
+    return int(_clock() * 1000000) & (_TICKS_PERIOD - 1)
+
+
+def _ticks_diff(a, b):
+    return ((a - b + _TICKS_PERIOD // 2) & (_TICKS_PERIOD - 1)) - _TICKS_PERIOD // 2
+
+
+def _ticks_add(a, delta):
+    return (a + delta) & (_TICKS_PERIOD - 1)
+
+
+def install(clock=None):
+    # clock: seconds source behind ticks_ms/ticks_us, e.g. scripted_socket.monotonic for a virtual one
+    global _clock
+    if clock:
+        _clock = clock
+    for path in (SERVER_DIR, HOST_DIR):
+        if path not in sys.path:
+            sys.path.insert(0, path)
+    time.sleep_ms = lambda ms: time.sleep(ms / 1000)
+    time.sleep_us = lambda us: time.sleep(us / 1000000)
+    time.ticks_ms = _ticks_ms
+    time.ticks_us = _ticks_us
+    time.ticks_diff = _ticks_diff
+    time.ticks_add = _ticks_add
+
+
+def run_firmware(socket_module=None, select_module=None):
+    """Executes main.py and returns its globals; the given modules replace `socket` and `select` while it runs."""
+    install()
+    replaced = {"socket": socket_module, "select": select_module}
+    saved = {name: sys.modules.get(name) for name in replaced}
+    for name, module in replaced.items():
+        if module is not None:
+            sys.modules[name] = module
+    try:
+        return runpy.run_path(FIRMWARE_PATH, run_name="__main__")
+    finally:
+        for name, module in saved.items():
+            if module is not None:
+                sys.modules[name] = module
@@ -0,0 +1,244 @@
+# Host stand-in for MicroPython's machine module, just enough to run Server/main.py under CPython.
+#
+# By default I2S drains instantly and timers only fire when a script calls fire(), which keeps the
+# simulations deterministic. With REALTIME = True (set before the firmware creates its objects)
+# I2S plays ibuf out at the configured sample rate and timers fire from their own threads.
+import threading
+import time
+from collections import deque
+
+REALTIME = False
+
+SIO_BASE = 0xD0000000
+SIO_GPIO_OUT_SET = SIO_BASE + 0x018
+SIO_GPIO_OUT_CLR = SIO_BASE + 0x020
+
+
+class Pin:
+    IN = 0
+    OUT = 1
+
+    by_id = {}
+
+    def __init__(self, pin_id, mode=-1, value=None):
+        self.id = pin_id
+        self.mode = mode
+        self._value = value or 0
+        Pin.by_id[pin_id] = self
+
+    def value(self, v=None):
+        if v is None:
+            return self._value
+        self._value = 1 if v else 0
+
+
+class _Mem32:
+    # Word-addressed memory. Writes to the RP2350 SIO GPIO set/clear registers drive the Pin objects.
+
+    def __init__(self):
+        self.words = {}
+        self.writes = 0
+        self.drive_pins = True
+
+    def __getitem__(self, addr):
+        return self.words.get(addr, 0)
+
+    def __setitem__(self, addr, value):
+        self.words[addr] = value
+        if not self.drive_pins:
+            # Raw mode for timing: a plain store, no bookkeeping that would allocate
+            return
+        self.writes += 1
+        if addr == SIO_GPIO_OUT_SET or addr == SIO_GPIO_OUT_CLR:
+            level = 1 if addr == SIO_GPIO_OUT_SET else 0
+            for pin_id, pin in Pin.by_id.items():
+                if value >> pin_id & 1:
+                    pin._value = level
+
+
+mem32 = _Mem32()
+
+
+class RealtimeDac:
+    """Drains an I2S object's ibuf at rate * frame size on a background thread.
+
+    Queued writes move into ibuf as it frees up, and the irq handler fires once a write has been
+    taken in completely, as with the RP2 driver. An empty ibuf after the first write plays silence
+    and counts one underrun. on_play(t, head) reports when each write starts to be heard, with the
+    first bytes of that write, so a benchmark can tag its audio and time it end to end.
+    """
+
+    TICK_SEC = 0.001
+    HEAD_BYTES = 8
+
+    def __init__(self, i2s):
+        self.i2s = i2s
+        channels = 2 if i2s.format == I2S.STEREO else 1
+        self.byte_rate = i2s.rate * channels * (i2s.bits // 8)
+        self.lock = threading.Lock()
+        self.pending = deque()  # [buffer, bytes already taken into ibuf]
+        self.starts = deque()  # (stream offset of a write's first byte, its head)
+        self.fill = 0.0
+        self.queued_bytes = 0
+        self.played_bytes = 0.0
+        self.started = False
+        self.starved = False
+        self.underruns = 0
+        self.underrun_times = []
+        self.silent_sec = 0.0
+        self.on_play = None
+        self.running = True
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def write(self, buf):
+        data = bytes(buf)
+        with self.lock:
+            self.pending.append([data, 0])
+            self.starts.append((self.queued_bytes, data[:self.HEAD_BYTES]))
+            self.queued_bytes += len(data)
+            self.started = True
+        if self.i2s._handler is None:
+            # Blocking mode: return once the whole buffer is in ibuf
+            while self.running and any(item[0] is data for item in self.pending):
+                time.sleep(self.TICK_SEC)
+        return len(data)
+
+    def _run(self):
+        last = time.monotonic()
+        while self.running:
+            time.sleep(self.TICK_SEC)
+            now = time.monotonic()
+            want = (now - last) * self.byte_rate
+            last = now
+            done = 0
+            played = []
+            with self.lock:
+                drained = min(self.fill, want)
+                self.fill -= drained
+                self.played_bytes += drained
+                if self.started and drained < want:
+                    self.silent_sec += (want - drained) / self.byte_rate
+                    if not self.starved:
+                        self.starved = True
+                        self.underruns += 1
+                        self.underrun_times.append(now)
+                elif drained:
+                    self.starved = False
+                while self.pending and self.fill < self.i2s.ibuf:
+                    item = self.pending[0]
+                    take = min(len(item[0]) - item[1], self.i2s.ibuf - self.fill)
+                    self.fill += take
+                    item[1] += take
+                    if item[1] < len(item[0]):
+                        break
+                    self.pending.popleft()
+                    done += 1
+                while self.starts and self.starts[0][0] <= self.played_bytes:
+                    offset, head = self.starts.popleft()
+                    played.append((now - (self.played_bytes - offset) / self.byte_rate, head))
+            for _ in range(done):
+                handler = self.i2s._handler
+                if handler:
+                    handler(self.i2s)
+            if self.on_play:
+                for t, head in played:
+                    self.on_play(t, head)
+
+    def queued_sec(self):
+        with self.lock:
+            return (self.fill + sum(len(item[0]) - item[1] for item in self.pending)) / self.byte_rate
+
+    def stop(self):
+        self.running = False
+
+
+class I2S:
+    TX = 0
+    RX = 1
+    MONO = 0
+    STEREO = 1
+
+    instances = []
+
+    def __init__(self, i2s_id, sck=None, ws=None, sd=None, mode=TX, bits=16, format=MONO, rate=22050, ibuf=8192):
+        self.id = i2s_id
+        self.bits = bits
+        self.format = format
+        self.rate = rate
+        self.ibuf = ibuf
+        self.bytes_written = 0
+        self.writes = 0
+        self.sink = None
+        self._handler = None
+        self._pending_irqs = 0
+        self._in_irq = False
+        self.dac = RealtimeDac(self) if REALTIME else None
+        I2S.instances.append(self)
+
+    def irq(self, handler):
+        # Non-blocking mode. The instant host DAC runs the handler right after each write
+        # returns, one call per write, never nested inside another handler call.
+        self._handler = handler
+
+    def write(self, buf):
+        n = len(buf)
+        self.bytes_written += n
+        self.writes += 1
+        if self.sink:
+            self.sink(buf)
+        if self.dac:
+            return self.dac.write(buf)
+        if self._handler:
+            self._pending_irqs += 1
+            if not self._in_irq:
+                self._in_irq = True
+                while self._pending_irqs and self._handler:
+                    self._pending_irqs -= 1
+                    self._handler(self)
+                self._in_irq = False
+        return n
+
+    def deinit(self):
+        self._handler = None
+        if self.dac:
+            self.dac.stop()
+
+
+class Timer:
+    ONE_SHOT = 0
+    PERIODIC = 1
+
+    def __init__(self, timer_id=-1):
+        self.id = timer_id
+        self.callback = None
+        self.freq = None
+        self.fired = 0
+        self._thread = None
+
+    def init(self, mode=PERIODIC, freq=None, period=None, callback=None):
+        # Outside REALTIME callbacks are not fired on their own; host scripts call fire() when they need to.
+        self.freq = freq if freq else (1000 / period if period else None)
+        self.callback = callback
+        if REALTIME and self.freq and self._thread is None:
+            self._thread = threading.Thread(target=self._run, args=(mode,), daemon=True)
+            self._thread.start()
+
+    def _run(self, mode):
+        next_fire = time.monotonic()
+        while self.callback:
+            next_fire += 1 / self.freq
+            time.sleep(max(0.0, next_fire - time.monotonic()))
+            self.fire()
+            if mode == Timer.ONE_SHOT:
+                break
+        self._thread = None
+
+    def fire(self):
+        callback = self.callback
+        if callback:
+            self.fired += 1
+            callback(self)
+
+    def deinit(self):
+        self.callback = None
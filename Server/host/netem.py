@@ -0,0 +1,116 @@
+# UDP relay that impairs traffic between a client and the firmware, in the spirit of Linux netem:
+# random loss, fixed delay plus uniform jitter, and reordering by holding a datagram back so the
+# ones behind it overtake it. Both directions are impaired (audio and control one way, ACKs back).
+import heapq
+import random
+import socket
+import threading
+import time
+
+
+class Impairment:
+    def __init__(self, loss=0.0, delay_ms=0.0, jitter_ms=0.0, reorder=0.0, reorder_ms=30.0):
+        self.loss = loss
+        self.delay_ms = delay_ms
+        self.jitter_ms = jitter_ms
+        self.reorder = reorder
+        self.reorder_ms = reorder_ms
+
+    def describe(self):
+        parts = []
+        if self.loss:
+            parts.append(f"loss {self.loss:.0%}")
+        if self.delay_ms or self.jitter_ms:
+            parts.append(f"delay {self.delay_ms:.0f}+-{self.jitter_ms:.0f} ms")
+        if self.reorder:
+            parts.append(f"reorder {self.reorder:.0%}")
+        return ", ".join(parts) or "clean"
+
+
+class ImpairedLink:
+    """Listens on an ephemeral localhost port and relays to `target` through an Impairment.
+
+    Replies from the target go back to the last client address, through the same impairment.
+    """
+
+    def __init__(self, target, impairment, seed=1):
+        self.target = target
+        self.impairment = impairment
+        self.rng = random.Random(seed)
+        self.front = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.front.bind(("127.0.0.1", 0))
+        self.back = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.back.bind(("127.0.0.1", 0))
+        for sock in (self.front, self.back):
+            sock.settimeout(0.1)
+        self.addr = self.front.getsockname()
+        self.client = None
+        self.forwarded = 0
+        self.dropped = 0
+        self.reordered = 0
+        self._queue = []
+        self._count = 0
+        self._cond = threading.Condition()
+        self.running = True
+        self.threads = [threading.Thread(target=self._receive, args=(self.front, True), daemon=True),
+                        threading.Thread(target=self._receive, args=(self.back, False), daemon=True),
+                        threading.Thread(target=self._deliver, daemon=True)]
+        for thread in self.threads:
+            thread.start()
+
+    def _schedule(self, data, upstream):
+        imp = self.impairment
+        if imp.loss and self.rng.random() < imp.loss:
+            self.dropped += 1
+            return
+        delay = imp.delay_ms + (self.rng.uniform(-imp.jitter_ms, imp.jitter_ms) if imp.jitter_ms else 0.0)
+        if imp.reorder and self.rng.random() < imp.reorder:
+            delay += imp.reorder_ms
+            self.reordered += 1
+        due = time.monotonic() + max(0.0, delay) / 1000
+        with self._cond:
+            self._count += 1
+            heapq.heappush(self._queue, (due, self._count, data, upstream))
+            self._cond.notify()
+
+    def _receive(self, sock, upstream):
+        while self.running:
+            try:
+                data, addr = sock.recvfrom(4096)
+            except socket.timeout:
+                continue
+            except OSError:
+                break
+            if upstream:
+                self.client = addr
+            self._schedule(data, upstream)
+
+    def _deliver(self):
+        while self.running:
+            with self._cond:
+                while self.running and (not self._queue or self._queue[0][0] > time.monotonic()):
+                    timeout = self._queue[0][0] - time.monotonic() if self._queue else 0.1
+                    self._cond.wait(max(0.0, timeout))
+                if not self.running:
+                    break
+                _due, _n, data, upstream = heapq.heappop(self._queue)
+            try:
+                if upstream:
+                    self.back.sendto(data, self.target)
+                elif self.client:
+                    self.front.sendto(data, self.client)
+                self.forwarded += 1
+            except OSError:
+                pass
+
+    def stats(self):
+        return {"forwarded": self.forwarded, "dropped": self.dropped, "reordered": self.reordered}
+
+    def close(self):
+        self.running = False
+        with self._cond:
+            self._cond.notify_all()
+        for thread in self.threads:
+            thread.join()
+        self.front.close()
+        self.back.close()
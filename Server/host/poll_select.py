@@ -0,0 +1,35 @@
+# Stand-in for MicroPython's select module on top of CPython's select.poll.
+# Like on the Pico, poll() and ipoll() return the registered objects rather than file descriptors.
+import select as _select
+
+POLLIN = _select.POLLIN
+POLLOUT = _select.POLLOUT
+POLLERR = _select.POLLERR
+POLLHUP = _select.POLLHUP
+
+
+class _Poll:
+    def __init__(self):
+        self._poll = _select.poll()
+        self._objects = {}
+
+    def register(self, obj, eventmask=POLLIN | POLLOUT):
+        self._objects[obj.fileno()] = obj
+        self._poll.register(obj.fileno(), eventmask)
+
+    def modify(self, obj, eventmask):
+        self._poll.modify(obj.fileno(), eventmask)
+
+    def unregister(self, obj):
+        self._poll.unregister(obj.fileno())
+        self._objects.pop(obj.fileno(), None)
+
+    def poll(self, timeout=-1):
+        return [(self._objects[fd], events) for fd, events in self._poll.poll(timeout)]
+
+    def ipoll(self, timeout=-1, flags=0):
+        return self.poll(timeout)
+
+
+def poll():
+    return _Poll()
@@ -0,0 +1,112 @@
+# Stand-in socket module that replays scripted datagrams to the firmware, port by port.
+# When every queue is empty, recvfrom raises KeyboardInterrupt so main.py shuts down cleanly.
+# It doubles as the select module: poll() reports a socket as readable while its queue has data.
+#
+# A datagram fed with at=seconds arrives at that moment of a virtual clock (monotonic()). The clock
+# only moves when poll() waits: up to its timeout, or to the next arrival if that comes sooner.
+# Passing monotonic to host_env.install makes the firmware's ticks follow it, so a scripted
+# stream plays out at its own pace without the script taking that long.
+import errno
+from collections import deque
+
+AF_INET = 2
+SOCK_DGRAM = 2
+PEER_ADDR = ("127.0.0.2", 50000)
+POLLIN = 0x0001
+POLLOUT = 0x0004
+POLLERR = 0x0008
+POLLHUP = 0x0010
+
+queues = {}
+_now = 0.0
+
+
+def reset():
+    global _now
+    queues.clear()
+    _now = 0.0
+
+
+def monotonic():
+    return _now
+
+
+def feed(port, data, at=0.0):
+    queues.setdefault(port, deque()).append((at, data))
+
+
+def _ready(port):
+    queue = queues.get(port)
+    return bool(queue) and queue[0][0] <= _now
+
+
+def getaddrinfo(host, port, *args):
+    return [(AF_INET, SOCK_DGRAM, 0, "", (host, port))]
+
+
+class socket:
+    def __init__(self, family=AF_INET, sock_type=SOCK_DGRAM, *args):
+        self.port = None
+        self.timeout = None
+
+    def bind(self, addr):
+        self.port = addr[1]
+        queues.setdefault(self.port, deque())
+
+    def settimeout(self, timeout):
+        self.timeout = timeout
+
+    def setblocking(self, flag):
+        self.timeout = None if flag else 0
+
+    def recvfrom(self, bufsize):
+        if _ready(self.port):
+            return queues[self.port].popleft()[1][:bufsize], PEER_ADDR
+        if not any(queues.values()):
+            raise KeyboardInterrupt
+        raise OSError(errno.ETIMEDOUT)
+
+    def recv_into(self, buf, nbytes=0):
+        data, _addr = self.recvfrom(nbytes or len(buf))
+        buf[:len(data)] = data
+        return len(data)
+
+    def sendto(self, data, addr):
+        return len(data)
+
+    def close(self):
+        pass
+
+
+class _Poll:
+    def __init__(self):
+        self._masks = {}
+
+    def register(self, sock, eventmask=POLLIN | POLLOUT):
+        self._masks[sock] = eventmask
+
+    def modify(self, sock, eventmask):
+        self._masks[sock] = eventmask
+
+    def unregister(self, sock):
+        self._masks.pop(sock, None)
+
+    def poll(self, timeout=-1):
+        global _now
+        if not any(queues.values()):
+            raise KeyboardInterrupt
+        ready = [(sock, POLLIN) for sock, mask in self._masks.items() if mask & POLLIN and _ready(sock.port)]
+        if not ready:
+            polled = [queues[sock.port][0][0] for sock, mask in self._masks.items()
+                      if mask & POLLIN and queues.get(sock.port)]
+            wake = _now + timeout / 1000 if timeout >= 0 else float("inf")
+            _now = max(_now, min(polled + [wake]))
+            ready = [(sock, POLLIN) for sock, mask in self._masks.items() if mask & POLLIN and _ready(sock.port)]
+        return ready
+
+    def ipoll(self, timeout=-1, flags=0):
+        return self.poll(timeout)
+
+
+def poll():
+    return _Poll()
@@ -0,0 +1,53 @@
+# Feeds the firmware a sequenced stream with reordering, duplicates and loss and
+# reports what the jitter buffer did with it. Packet seq is sent at seq * PACKET_MS on a virtual
+# clock (a swapped pair arrives together, when the later one is due), so playout runs at the DAC's
+# pace without the script taking as long.
+import random
+import struct
+import sys
+
+import host_env
+import scripted_socket
+from machine import I2S
+
+AUDIO_PORT = 12345
+CONTROL_PORT = 12346
+PACKET_MS = 20  # 320 bytes of 8 kHz mono 16-bit
+
+
+def build_stream(num_packets, payload_bytes, loss, duplicate, reorder, seed):
+    rng = random.Random(seed)
+    packets = []
+    for seq in range(num_packets):
+        if rng.random() < loss:
+            continue
+        header = struct.pack("<HHI", seq & 0xFFFF, 0, seq * payload_bytes // 2)
+        packet = header + bytes([seq & 0xFF]) * payload_bytes
+        packets.append(packet)
+        if rng.random() < duplicate:
+            packets.append(packet)
+    for i in range(len(packets) - 1):
+        if rng.random() < reorder:
+            packets[i], packets[i + 1] = packets[i + 1], packets[i]
+    return packets
+
+
+def main():
+    loss, duplicate, reorder = (float(a) for a in (sys.argv[1:4] or (0.02, 0.02, 0.05)))
+    host_env.install(scripted_socket.monotonic)
+    scripted_socket.reset()
+    scripted_socket.feed(CONTROL_PORT, b"CONFIG:8000:16:1:SEQ")
+    scripted_socket.feed(CONTROL_PORT, b"PLAY")
+    for packet in build_stream(2000, 320, loss, duplicate, reorder, seed=1):
+        seq = struct.unpack_from("<H", packet, 0)[0]
+        scripted_socket.feed(AUDIO_PORT, packet, at=(seq + 1) * PACKET_MS / 1000)
+
+    firmware = host_env.run_firmware(scripted_socket, scripted_socket)
+    i2s = I2S.instances[-1]
+    print(f"loss={loss} dup={duplicate} reorder={reorder}")
+    print(f"jitter buffer: {firmware['jitter_buffer'].stats()}")
+    print(f"I2S: {i2s.writes} writes, {i2s.bytes_written} bytes")
+
+
+if __name__ == "__main__":
+    main()
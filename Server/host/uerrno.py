@@ -0,0 +1 @@
+from errno import EAGAIN, ECONNRESET, EINVAL, ETIMEDOUT  # noqa: F401
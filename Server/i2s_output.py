@@ -0,0 +1,200 @@
+# Non-blocking I2S output. The network loop copies audio into a ring of preallocated slots
+# and returns at once; the I2S irq callback hands the next slot to the driver each time the
+# previous one has been taken into ibuf, so nothing in the main loop ever waits on the DAC.
+#
+# With a gain set (pico_gain.PicoGain), each slot is scaled in place right before it goes to the
+# driver, so a volume change also reaches audio that was already waiting in the ring.
+#
+# The loop only advances _filled and the callback only advances _taken. The callback runs
+# only while a transfer is in flight (_busy), so when _busy is False the loop may start the
+# next transfer itself without racing it.
+#
+# The irq only says a buffer was copied into ibuf, not that the DAC ran dry, so starvation is
+# tracked with a playout clock: each buffer handed to the driver moves _play_end on by its
+# duration at the byte rate. Handing one over after _play_end has passed means the DAC played
+# silence in between. A gap on purpose (flush, mark_idle) restarts the clock instead.
+#
+# With a lead set, a slot goes to the driver only once the driver is down to lead_us of audio;
+# the rest waits in the ring and the main loop hands it over (refill). ibuf would otherwise take
+# everything at once, and the gain applied at hand-off would reach the DAC that much later.
+import time
+
+STARVE_SLACK_US = 2000  # irq latency and clock drift below this are not counted as starvation
+
+
+class I2sOutput:
+    def __init__(self, slots=8, slot_bytes=2048):
+        self.slots = slots
+        self.slot_bytes = slot_bytes
+        self._views = [memoryview(bytearray(slot_bytes)) for _ in range(slots)]
+        self._lens = [0] * slots
+        self.i2s = None
+        self.bytes_written = 0  # handed to the driver; audio dropped by flush() never counts
+        self.transfers = 0
+        self.ring_empty = 0
+        self.starved = 0
+        self.starved_us = 0
+        self.overruns = 0
+        self.gain = None
+        self.channels = 1
+        self._us_per_256_bytes = 0
+        self._ibuf_us = 0
+        self.lead_us = 0
+        self._on_done_cb = self._on_done
+        self._reset_ring()
+
+    def _reset_ring(self):
+        self._filled = 0
+        self._taken = 0
+        self._drop_until = 0
+        self._busy = False
+        self._play_end = None
+
+    def attach(self, i2s, byte_rate, ibuf_bytes, lead_us=0):
+        # Switches the I2S object to non-blocking mode; its write() now returns immediately.
+        # byte_rate = rate * bytes per sample * channels, for the playout clock; lead_us = 0 hands
+        # every slot to the driver as soon as ibuf takes it
+        self._reset_ring()
+        self._us_per_256_bytes = 256000000 // byte_rate
+        self._ibuf_us = self._duration_us(ibuf_bytes)
+        self.lead_us = lead_us
+        self.i2s = i2s
+        i2s.irq(self._on_done_cb)
+
+    def _duration_us(self, n):
+        # Scaled by 256 so the product stays a small int for anything up to the whole ring
+        return (n * self._us_per_256_bytes) >> 8
+
+    def set_gain(self, gain, channels=1):
+        # gain: PicoGain for 16-bit output, or None to pass audio through unchanged
+        self.gain = gain
+        self.channels = channels
+
+    def detach(self):
+        self.i2s = None
+        self._reset_ring()
+
+    def queued_slots(self):
+        taken = self._taken
+        if taken < self._drop_until:
+            taken = self._drop_until
+        return self._filled - taken
+
+    def free_slots(self):
+        # Reading _taken before _busy can only underestimate the free space if the callback runs in between
+        taken = self._taken
+        in_flight = 1 if self._busy else 0
+        return self.slots - (self._filled - taken) - in_flight
+
+    def buffered_us(self):
+        # Audio not heard yet: what the driver still holds, by the playout clock, plus the ring
+        end = self._play_end
+        held = 0 if end is None else max(0, time.ticks_diff(end, time.ticks_us()))
+        taken = self._taken
+        if taken < self._drop_until:
+            taken = self._drop_until
+        queued = 0
+        for i in range(taken, self._filled):
+            queued += self._lens[i % self.slots]
+        return held + self._duration_us(queued)
+
+    def write(self, payload):
+        n = len(payload)
+        if self.i2s is None or n == 0:
+            return False
+        needed = (n + self.slot_bytes - 1) // self.slot_bytes
+        if needed > self.free_slots():
+            self.overruns += 1
+            return False
+        src = memoryview(payload)
+        filled = self._filled
+        offset = 0
+        while offset < n:
+            idx = filled % self.slots
+            size = min(self.slot_bytes, n - offset)
+            self._views[idx][:size] = src[offset:offset + size]
+            self._lens[idx] = size
+            filled += 1
+            offset += size
+        # Published only once the copy is complete, so the callback never sees a half-filled slot
+        self._filled = filled
+        if not self._busy:
+            self._start_next()
+        return True
+
+    def flush(self):
+        # Drops everything queued; the transfer already handed to the driver still plays out.
+        self._drop_until = self._filled
+        self._play_end = None
+
+    def mark_idle(self):
+        # The stream stops on purpose (PAUSE, a new CONFIG): the DAC running dry is not starvation
+        self._play_end = None
+
+    def refill(self):
+        # Main loop: restarts the hand-off once the driver is down to lead_us (see refill_wait_us)
+        if self.i2s is not None and not self._busy:
+            self._start_next()
+
+    def refill_wait_us(self):
+        # How long until refill() has a slot to hand over, or -1 if there is nothing to wait for
+        if self._busy or self.queued_slots() == 0:
+            return -1
+        end = self._play_end
+        if end is None:
+            return 0
+        return max(0, time.ticks_diff(end, time.ticks_us()) - self.lead_us)
+
+    def _start_next(self):
+        taken = self._taken
+        if taken < self._drop_until:
+            taken = self._drop_until
+        now = time.ticks_us()
+        end = self._play_end
+        if taken == self._filled or (self.lead_us and end is not None and
+                                     time.ticks_diff(end, now) > self.lead_us):
+            # Ring empty, or the driver has enough: the slot waits, still reachable by the gain
+            self._taken = taken
+            self._busy = False
+            return False
+        idx = taken % self.slots
+        self._taken = taken + 1
+        self._busy = True
+        self.transfers += 1
+        n = self._lens[idx]
+        view = self._views[idx][:n]
+        if self.gain:
+            self.gain.apply(view, self.channels)
+        if end is None:
+            end = now
+        else:
+            late = time.ticks_diff(now, end)
+            if late > 0:
+                if late > STARVE_SLACK_US:
+                    self.starved += 1
+                    self.starved_us += late
+                end = now
+        self._play_end = time.ticks_add(end, self._duration_us(n))
+        self.bytes_written += n
+        self.i2s.write(view)
+        return True
+
+    def _on_done(self, i2s):
+        if i2s is not self.i2s:
+            return
+        flushed = self._taken < self._drop_until
+        end = self._play_end
+        if end is not None:
+            # The last buffer is all in ibuf now, so the driver cannot hold more than ibuf; this
+            # keeps the clock from running ahead of a DAC slightly faster than its nominal rate
+            latest = time.ticks_add(time.ticks_us(), self._ibuf_us)
+            if time.ticks_diff(end, latest) > 0:
+                self._play_end = latest
+        if not self._start_next() and not flushed and self._taken == self._filled:
+            # Nothing left to hand over; the DAC still has ibuf to play, so this is not starvation yet
+            self.ring_empty += 1
+
+    def stats(self):
+        return {"queued": self.queued_slots(), "transfers": self.transfers, "ring_empty": self.ring_empty,
+                "starved": self.starved, "starved_ms": self.starved_us // 1000, "overrun": self.overruns,
+                "bytes": self.bytes_written}
@@ -0,0 +1,147 @@
+# Audio header: sequence (uint16), flags (uint16, reserved), position of the first sample (uint32).
+# A 16-bit sequence stays a MicroPython small int, so handling it never allocates.
+AUDIO_HEADER_FORMAT = "<HHI"
+AUDIO_HEADER_SIZE = 8
+SEQ_MASK = 0xFFFF
+SEQ_HALF = 0x8000
+
+
+def packet_seq(packet):
+    return packet[0] | (packet[1] << 8)
+
+
+def packet_sample_pos(packet):
+    # Read byte by byte, not with struct.unpack_from, so no tuple is allocated per packet
+    return packet[4] | (packet[5] << 8) | (packet[6] << 16) | (packet[7] << 24)
+
+
+class JitterBuffer:
+    # Fixed ring of preallocated slots: packets are placed by sequence number, late ones
+    # are dropped and gaps are played back as silence.
+    # The slot count must be a power of 2 so the index stays valid when the sequence wraps.
+    #
+    # Packets only leave through pop(), which the caller drives from playout demand (the DAC
+    # needing more audio), never from arrivals. target_depth is the prefill before playout starts.
+
+    def __init__(self, slots=16, slot_bytes=2048, target_depth=4):
+        self.slots = slots
+        self.target_depth = max(1, min(target_depth, slots - 1))
+        self._bufs = [bytearray(slot_bytes) for _ in range(slots)]
+        self._views = [memoryview(b) for b in self._bufs]
+        self._lens = [0] * slots
+        self._seqs = [-1] * slots
+        self._positions = [0] * slots
+        self._silence = memoryview(bytearray(slot_bytes))
+        self.received = 0
+        self.played = 0
+        self.duplicates = 0
+        self.late = 0
+        self.lost = 0
+        self.overflows = 0
+        self.underruns = 0
+        self.reset()
+
+    def reset(self):
+        for i in range(self.slots):
+            self._seqs[i] = -1
+        self.next_seq = -1
+        self.highest_seq = -1
+        self.primed = False
+        self.last_len = 0
+        self.play_position = 0
+
+    def prime(self):
+        # Playout starts now (synchronised start), even below the target depth
+        if self.depth():
+            self.primed = True
+
+    def depth(self):
+        if self.next_seq < 0:
+            return 0
+        diff = (self.highest_seq - self.next_seq) & SEQ_MASK
+        return 0 if diff >= SEQ_HALF else diff + 1
+
+    def head_ready(self):
+        # The next packet to play has arrived
+        return self.next_seq >= 0 and self._seqs[self.next_seq % self.slots] == self.next_seq
+
+    def push(self, seq, sample_pos, payload):
+        self.received += 1
+        if self.next_seq < 0:
+            self.next_seq = seq
+            self.highest_seq = seq
+        ahead = (seq - self.next_seq) & SEQ_MASK
+        if ahead >= SEQ_HALF:
+            behind = SEQ_HALF * 2 - ahead
+            if behind > self.slots * 4:
+                # Far behind: the client restarted the stream.
+                self.reset()
+                return self.push(seq, sample_pos, payload)
+            self.late += 1
+            return False
+        if ahead > self.slots * 4:
+            # Far ahead: the client restarted the stream, or a long outage
+            self.reset()
+            return self.push(seq, sample_pos, payload)
+        if ahead >= self.slots:
+            # Too far ahead: slots that can no longer be played in time are given up as lost.
+            # At most one pass over the ring; sequences past it were never buffered.
+            self.overflows += 1
+            skip = ahead - self.slots + 1
+            for _ in range(min(skip, self.slots)):
+                idx = self.next_seq % self.slots
+                if self._seqs[idx] != self.next_seq:
+                    self.lost += 1
+                self._seqs[idx] = -1
+                self.next_seq = (self.next_seq + 1) & SEQ_MASK
+            if skip > self.slots:
+                self.lost += skip - self.slots
+                self.next_seq = (seq - self.slots + 1) & SEQ_MASK
+
+        idx = seq % self.slots
+        if self._seqs[idx] == seq:
+            self.duplicates += 1
+            return False
+        n = len(payload)
+        self._views[idx][:n] = payload
+        self._lens[idx] = n
+        self._seqs[idx] = seq
+        self._positions[idx] = sample_pos
+        if ((seq - self.highest_seq) & SEQ_MASK) < SEQ_HALF:
+            self.highest_seq = seq
+        return True
+
+    def pop(self, conceal=False):
+        # Called when the output wants more audio. A missing packet is waited for, unless
+        # conceal is set (the output is about to run dry): then it is given up and played as
+        # silence. Demand that finds nothing buffered is an underrun, and playout prefills again.
+        depth = self.depth()
+        if not self.primed:
+            if depth < self.target_depth:
+                return None
+            self.primed = True
+        if depth == 0:
+            if conceal:
+                self.primed = False
+                self.underruns += 1
+            return None
+
+        idx = self.next_seq % self.slots
+        if self._seqs[idx] == self.next_seq:
+            n = self._lens[idx]
+            out = self._views[idx][:n]
+            self.last_len = n
+            self.play_position = self._positions[idx]
+        elif not conceal:
+            return None
+        else:
+            self.lost += 1
+            out = self._silence[:self.last_len]
+        self._seqs[idx] = -1
+        self.next_seq = (self.next_seq + 1) & SEQ_MASK
+        self.played += 1
+        return out
+
+    def stats(self):
+        return {"rx": self.received, "played": self.played, "dup": self.duplicates, "late": self.late,
+                "lost": self.lost, "overflow": self.overflows, "underrun": self.underruns, "depth": self.depth()}
@@ -1,8 +1,22 @@
 import network
+import select
 import socket
+import struct
 import time
 import uerrno
 from machine import I2S, Pin, Timer
+from adpcm import AdpcmDecoder
+from control_protocol import (CONFIG_FLAG_ADPCM, CONFIG_FLAG_GAIN, CONFIG_FLAG_SEQ, CONFIG_PAYLOAD_FORMAT,
+                              CONTROL_HEADER_SIZE, OP_CONFIG, OP_GC, OP_PAUSE, OP_PLAY, OP_START, OP_STATS, OP_STOP,
+                              OP_SYNC, OP_VOL, START_PAYLOAD_FORMAT, ControlSequencer, is_control_frame)
+from gc_scheduler import GcScheduler
+from i2s_output import I2sOutput
+from jitter_buffer import AUDIO_HEADER_SIZE, JitterBuffer, packet_sample_pos, packet_seq
+from packet_rx import PacketReceiver, command_length, has_prefix, is_command, parse_int
+from pico_gain import PicoGain
+from pico_stats import IsrMonitor, LoopTimer
+from playout_sync import StartGate
+from seven_segment import SegmentDisplay
 
 WIFI_SSID = "SM"
 WIFI_PASSWORD = "smproiect"
@@ -10,6 +24,7 @@ WIFI_PASSWORD = "smproiect"
 UDP_IP = "0.0.0.0"
 AUDIO_UDP_PORT = 12345
 CONTROL_UDP_PORT = 12346
+AUDIO_MULTICAST_GROUP = None  # e.g. "239.0.0.57" when the client streams to a multicast group (multi-room)
 
 
 SCK_PIN_NUM = 9
@@ -38,39 +53,62 @@ PIN_LED_VOL_2 = Pin(14, Pin.OUT, value=0)
 PIN_LED_VOL_3 = Pin(15, Pin.OUT, value=0)
 led_volume_pins = [PIN_LED_VOL_1, PIN_LED_VOL_2, PIN_LED_VOL_3]
 
-digits_7seg = {
-    0: (0, 0, 0, 0, 0, 0, 1, 1), 1: (1, 0, 0, 1, 1, 1, 1, 1), 2: (0, 0, 1, 0, 0, 1, 0, 1),
-    3: (0, 0, 0, 0, 1, 1, 0, 1), 4: (1, 0, 0, 1, 1, 0, 0, 1), 5: (0, 1, 0, 0, 1, 0, 0, 1),
-    6: (0, 1, 0, 0, 0, 0, 0, 1), 7: (0, 0, 0, 1, 1, 1, 1, 1), 8: (0, 0, 0, 0, 0, 0, 0, 1),
-    9: (0, 0, 0, 1, 0, 0, 0, 1),
-    ' ': (1, 1, 1, 1, 1, 1, 1, 1), '-': (1, 1, 1, 1, 1, 1, 0, 1)
-}
-
 wlan = None;
 sock_audio = None;
 sock_control = None;
+audio_rx = None
 audio_out = None
 i2s_configured_by_client = False
+i2s_current_params = None
 display_timer = Timer()
-active_digit_index = 0
+segment_display = SegmentDisplay([0, 1, 2, 3, 4, 5, 6, 7], [16, 17, 18, 19])
 volume_received_from_pc = 75
 current_display_volume = 75
 last_volume_display_update_time = 0
 VOLUME_DISPLAY_UPDATE_INTERVAL_MS = 500
 player_status = "STOP"
+AUDIO_RECV_BUFFER_BYTES = 2048
+JITTER_SLOTS = 16
+JITTER_TARGET_DEPTH = 4
+PLAYOUT_LOW_WATER_MS = 40  # the jitter buffer tops the I2S output up to this much queued audio
+PLAYOUT_CONCEAL_MS = 15  # below this a missing packet is no longer waited for
+JITTER_STATS_INTERVAL_MS = 10000
+POLL_IDLE_MS = 50
+I2S_IBUF_BYTES = 8192
+I2S_RING_SLOTS = 8
+I2S_DRIVER_LEAD_MS = 20  # audio handed to the driver ahead of the DAC; the rest stays where the gain reaches it
+GC_COLLECT_BYTES = 8192
+DISPLAY_TIMER_HZ = 240
+audio_framed = False
+audio_codec = "PCM"
+audio_channels = 1
+adpcm_decoder = AdpcmDecoder(AUDIO_RECV_BUFFER_BYTES)
+jitter_buffer = JitterBuffer(JITTER_SLOTS, AUDIO_RECV_BUFFER_BYTES, JITTER_TARGET_DEPTH)
+i2s_output = I2sOutput(I2S_RING_SLOTS, AUDIO_RECV_BUFFER_BYTES)
+gc_scheduler = GcScheduler(GC_COLLECT_BYTES)
+control_sequencer = ControlSequencer()
+pico_gain = PicoGain(volume_received_from_pc)
+loop_timer = LoopTimer()
+display_isr_monitor = IsrMonitor(DISPLAY_TIMER_HZ)
+start_gate = StartGate()
 
 
 def init_i2s_on_pico(rate, bits, channels):
-    global audio_out, i2s_configured_by_client
-    if audio_out: audio_out.deinit(); audio_out = None; print("PICO I2S: Re-initializing...")
+    global audio_out, i2s_configured_by_client, i2s_current_params
+    if audio_out and i2s_current_params == (rate, bits, channels):
+        print(f"PICO I2S: Format unchanged ({rate}Hz, {bits}-bit, {channels}ch), keeping current I2S.")
+        return True
+    if audio_out: i2s_output.detach(); audio_out.deinit(); audio_out = None; print("PICO I2S: Re-initializing...")
     sck_pin_obj = Pin(SCK_PIN_NUM);
     ws_pin_obj = Pin(WS_PIN_NUM);
     sd_pin_obj = Pin(SD_PIN_NUM)
     i2s_format = I2S.MONO if channels == 1 else I2S.STEREO
     try:
         audio_out = I2S(0, sck=sck_pin_obj, ws=ws_pin_obj, sd=sd_pin_obj, mode=I2S.TX,
-                        bits=bits, format=i2s_format, rate=rate, ibuf=8192)
+                        bits=bits, format=i2s_format, rate=rate, ibuf=I2S_IBUF_BYTES)
+        i2s_output.attach(audio_out, rate * (bits // 8) * channels, I2S_IBUF_BYTES, I2S_DRIVER_LEAD_MS * 1000)
         print(f"PICO I2S Initialized: Rate={rate}, Bits={bits}, Ch={channels}")
+        i2s_current_params = (rate, bits, channels)
         i2s_configured_by_client = True;
         return True
     except Exception as e:
@@ -80,6 +118,273 @@ def init_i2s_on_pico(rate, bits, channels):
         return False
 
 
+def apply_audio_config(rate, bits, channels, framed, adpcm, gain=False):
+    global audio_framed, audio_codec, audio_channels
+    audio_framed = framed
+    audio_codec = "ADPCM" if adpcm else "PCM"
+    audio_channels = channels
+    jitter_buffer.reset()
+    i2s_output.mark_idle()
+    start_gate.clear()
+    if not init_i2s_on_pico(rate, bits, channels):
+        return False
+    # Volume on the Pico only for 16-bit output (PCM or decoded ADPCM); otherwise the client scales
+    if gain and bits == 16:
+        pico_gain.set_volume(volume_received_from_pc, ramp=False)
+        i2s_output.set_gain(pico_gain, channels)
+    else:
+        i2s_output.set_gain(None)
+    return True
+
+
+def apply_config_message(message):
+    # CONFIG:rate:bits:channels[:options], e.g. CONFIG:44100:16:1:SEQ for sequenced audio packets,
+    # CONFIG:22050:16:1:SEQ:ADPCM for IMA-ADPCM payloads decoded to 16-bit PCM on the Pico,
+    # and :GAIN when the client streams at unity gain and the volume is applied here
+    parts = message.split(':')
+    if len(parts) < 4:
+        print(f"PICO CTRL: Malformed CONFIG message: '{message}'")
+        return False
+    try:
+        rate = int(parts[1])
+        bits = int(parts[2])
+        channels = int(parts[3])
+    except ValueError:
+        print(f"PICO CTRL: Invalid CONFIG values in '{message}'")
+        return False
+    options = parts[4:]
+    return apply_audio_config(rate, bits, channels, "SEQ" in options, "ADPCM" in options, "GAIN" in options)
+
+
+def play_audio_payload(payload, skip_bytes=0):
+    # Drops the first skip_bytes of the (decoded) audio; returns what is left to skip
+    if audio_codec == "ADPCM":
+        payload = adpcm_decoder.decode(payload, audio_channels)
+    if skip_bytes and payload:
+        n = len(payload)
+        if skip_bytes >= n:
+            return skip_bytes - n
+        payload = memoryview(payload)[skip_bytes:]
+        skip_bytes = 0
+    if payload:
+        i2s_output.write(payload)
+    return skip_bytes
+
+
+def write_audio_packet(packet):
+    if not audio_framed:
+        play_audio_payload(packet)
+        return
+    # Only buffered here: the main loop plays it out when the DAC needs it (feed_playout)
+    jitter_buffer.push(packet_seq(packet), packet_sample_pos(packet), packet[AUDIO_HEADER_SIZE:])
+
+
+def playout_active():
+    return audio_framed and player_status == "PLAY" and not start_gate.armed
+
+
+def feed_playout():
+    # Playout is paced by the DAC: a packet leaves the jitter buffer only once the audio queued
+    # for I2S is down to PLAYOUT_LOW_WATER_MS, and a missing one is skipped only when it is about
+    # to run dry. The thresholds match playout_wait_ms, so the loop never wakes to do nothing.
+    while True:
+        buffered_ms = i2s_output.buffered_us() // 1000
+        if buffered_ms > PLAYOUT_LOW_WATER_MS:
+            return
+        chunk = jitter_buffer.pop(buffered_ms <= PLAYOUT_CONCEAL_MS)
+        if chunk is None:
+            return
+        if chunk:
+            play_audio_payload(chunk)
+
+
+def playout_wait_ms(idle_ms):
+    # How long the loop may sleep before the I2S output needs the next packet or a driver refill
+    refill_us = i2s_output.refill_wait_us()
+    if refill_us >= 0:
+        # Rounded up: waking just before the refill is due would only spin
+        idle_ms = min(idle_ms, (refill_us + 999) // 1000)
+    if not playout_active() or not jitter_buffer.primed:
+        return idle_ms
+    floor_ms = PLAYOUT_LOW_WATER_MS if jitter_buffer.head_ready() else PLAYOUT_CONCEAL_MS
+    return max(0, min(idle_ms, i2s_output.buffered_us() // 1000 - floor_ms))
+
+
+def arm_start(deadline_us, start_pos):
+    # START (multi-room): playout restarts from a clean buffer at deadline_us on this Pico's clock
+    if not audio_framed:
+        print("PICO CTRL: START needs sequenced audio (CONFIG ...:SEQ), ignored")
+        return
+    jitter_buffer.reset()
+    i2s_output.flush()
+    start_gate.arm(deadline_us, start_pos)
+
+
+def release_start():
+    # The deadline has passed: frames that should already have been heard are skipped. If the
+    # packet at start_pos was lost, the first one played is further on and needs that much less
+    rate, bits, channels = i2s_current_params
+    skip_frames = start_gate.release(rate)
+    jitter_buffer.prime()
+    chunk = jitter_buffer.pop()
+    if chunk is None:
+        return
+    skip_frames += start_gate.start_pos - jitter_buffer.play_position
+    skip_bytes = max(0, skip_frames) * (bits // 8) * channels
+    while chunk is not None:
+        if chunk:
+            skip_bytes = play_audio_payload(chunk, skip_bytes)
+        # Late audio is dropped right away; from then on feed_playout paces the rest
+        chunk = jitter_buffer.pop(True) if skip_bytes else None
+
+
+def sync_reply():
+    return ("SYNC:%d" % time.ticks_us()).encode()
+
+
+def handle_control_message(message):
+    # Returns True when the message changed the volume
+    global player_status
+    if message.startswith("CONFIG:"):
+        apply_config_message(message)
+    elif message.startswith("VOL:"):
+        try:
+            return set_volume_from_pc(int(message.split(':')[1]))
+        except (ValueError, IndexError):
+            print(f"PICO CTRL: Invalid VOL value in '{message}'")
+    elif message == "PLAY":
+        player_status = "PLAY"
+    elif message == "PAUSE":
+        player_status = "PAUSE"
+        i2s_output.mark_idle()
+    elif message == "STOP":
+        player_status = "STOP"
+        jitter_buffer.reset()
+        i2s_output.flush()
+        start_gate.clear()
+    elif message.startswith("START:"):
+        # START:deadline_us:sample_pos
+        try:
+            parts = message.split(':')
+            arm_start(int(parts[1]), int(parts[2]))
+        except (ValueError, IndexError):
+            print(f"PICO CTRL: Invalid START in '{message}'")
+    return False
+
+
+def stats_report():
+    # STATS:key=value:... with audio rx/drop counters, I2S output, main-loop work time, ISR lateness
+    # and the synchronised starts (how late the last one was released). underrun: playout found the
+    # jitter buffer empty; starved: the DAC ran out of audio (I2sOutput playout clock)
+    jb = jitter_buffer
+    return ("STATS:rx=%d:drop=%d:lost=%d:played=%d:i2s_bytes=%d:underrun=%d:starved=%d:starved_ms=%d"
+            ":ring_empty=%d:ring_overrun=%d"
+            ":loop_n=%d:loop_avg_us=%d:loop_max_us=%d:loop_hist=%s:isr_late=%d:isr_max_us=%d"
+            ":sync_starts=%d:sync_late_us=%d") % (
+        audio_rx.packets if audio_rx else 0, jb.duplicates + jb.late + jb.overflows, jb.lost, jb.played,
+        i2s_output.bytes_written, jb.underruns, i2s_output.starved, i2s_output.starved_us // 1000,
+        i2s_output.ring_empty, i2s_output.overruns,
+        loop_timer.count, loop_timer.average_us(), loop_timer.max_us, loop_timer.histogram(),
+        display_isr_monitor.overruns, display_isr_monitor.max_gap_us, start_gate.starts, start_gate.late_us)
+
+
+def display_isr(timer):
+    display_isr_monitor.tick()
+    segment_display.tick()
+
+
+def set_volume_from_pc(vol_val):
+    # Returns True when the volume changed
+    global volume_received_from_pc
+    temp_vol = max(0, min(100, vol_val))
+    if temp_vol == volume_received_from_pc:
+        return False
+    volume_received_from_pc = temp_vol
+    pico_gain.set_volume(temp_vol)
+    return True
+
+
+def handle_binary_control(data, addr):
+    # Applies the frame if it is the next in order, then acknowledges, so an ACKed CONFIG
+    # means I2S is already configured. Returns True when the frame changed the volume
+    global player_status
+    volume_changed = False
+    if control_sequencer.accept(data):
+        op = data[1]
+        if op == OP_VOL:
+            volume_changed = set_volume_from_pc(data[CONTROL_HEADER_SIZE])
+        elif op == OP_PLAY:
+            player_status = "PLAY"
+        elif op == OP_PAUSE:
+            player_status = "PAUSE"
+            i2s_output.mark_idle()
+        elif op == OP_STOP:
+            player_status = "STOP"
+            jitter_buffer.reset()
+            i2s_output.flush()
+            start_gate.clear()
+        elif op == OP_CONFIG:
+            rate, bits, channels, flags = struct.unpack_from(CONFIG_PAYLOAD_FORMAT, data, CONTROL_HEADER_SIZE)
+            apply_audio_config(rate, bits, channels, bool(flags & CONFIG_FLAG_SEQ), bool(flags & CONFIG_FLAG_ADPCM),
+                               bool(flags & CONFIG_FLAG_GAIN))
+        elif op == OP_GC:
+            sock_control.sendto(gc_scheduler.report().encode(), addr)
+        elif op == OP_STATS:
+            sock_control.sendto(stats_report().encode(), addr)
+        elif op == OP_SYNC:
+            sock_control.sendto(sync_reply(), addr)
+        elif op == OP_START:
+            arm_start(*struct.unpack_from(START_PAYLOAD_FORMAT, data, CONTROL_HEADER_SIZE))
+    sock_control.sendto(control_sequencer.ack, addr)
+    return volume_changed
+
+
+def handle_control_packet(data, addr):
+    # Binary frames and hot text commands are handled on the raw bytes; any other text
+    # (CONFIG, ...) takes the string path. Returns True when the packet changed the volume
+    global player_status
+    if is_control_frame(data):
+        return handle_binary_control(data, addr)
+    n = command_length(data)
+    if has_prefix(data, n, b"VOL:"):
+        vol_val = parse_int(data, 4, n)
+        if vol_val is None:
+            print(f"PICO CTRL: Invalid VOL value in '{bytes(data)}'")
+            return False
+        return set_volume_from_pc(vol_val)
+    elif is_command(data, n, b"PLAY"):
+        player_status = "PLAY"
+    elif is_command(data, n, b"PAUSE"):
+        player_status = "PAUSE"
+        i2s_output.mark_idle()
+    elif is_command(data, n, b"GC"):
+        sock_control.sendto(gc_scheduler.report().encode(), addr)
+    elif is_command(data, n, b"STATS"):
+        sock_control.sendto(stats_report().encode(), addr)
+    elif is_command(data, n, b"SYNC"):
+        sock_control.sendto(sync_reply(), addr)
+    else:
+        return handle_control_message(bytes(data).decode('utf-8').strip().upper())
+    return False
+
+
+def audio_poll_events():
+    # Audio is only polled while it can be played; otherwise packets wait in the socket buffer.
+    if audio_out and i2s_configured_by_client and player_status == "PLAY":
+        return select.POLLIN
+    return 0
+
+
+def join_multicast_group(sock, group):
+    # ip_mreq: the group and the local interface address, 4 bytes each
+    mreq = bytes(int(part) for part in (group + "." + wlan.ifconfig()[0]).split("."))
+    try:
+        sock.setsockopt(socket.IPPROTO_IP, socket.IP_ADD_MEMBERSHIP, mreq)
+        print(f"PICO: Joined audio multicast group {group}")
+    except (AttributeError, OSError) as e:
+        print(f"PICO: Cannot join multicast group {group}: {e}")
+
+
 def wifi_connect_pico(ssid, password):
     global wlan
     wlan = network.WLAN(network.STA_IF);
@@ -108,36 +413,6 @@ def set_all_digits_off_anode_common():
     for pin in digit_control_pins: pin.value(0)
 
 
-def activate_digit_anode_common(digit_idx_to_activate):
-    for i, pin in enumerate(digit_control_pins):
-        pin.value(1 if i == digit_idx_to_activate else 0)
-
-
-def display_char_on_segments(char_pattern_tuple):
-    for i, seg_pin_value_for_on in enumerate(char_pattern_tuple):
-        segment_pins[i].value(seg_pin_value_for_on)
-
-
-def update_display_multiplex(timer_obj):
-    global active_digit_index, current_display_volume
-    set_all_digits_off_anode_common()
-    set_all_segments_off()
-    val_to_show_on_current_digit = ' '
-    if active_digit_index == 0:
-        val_to_show_on_current_digit = (current_display_volume // 1000) % 10
-    elif active_digit_index == 1:
-        val_to_show_on_current_digit = (current_display_volume // 100) % 10
-    elif active_digit_index == 2:
-        val_to_show_on_current_digit = (current_display_volume // 10) % 10
-    elif active_digit_index == 3:
-        val_to_show_on_current_digit = current_display_volume % 10
-    char_pattern = list(digits_7seg.get(val_to_show_on_current_digit, digits_7seg[' ']))
-    char_pattern[7] = 1
-    display_char_on_segments(tuple(char_pattern))
-    activate_digit_anode_common(active_digit_index)
-    active_digit_index = (active_digit_index + 1) % len(digit_control_pins)
-
-
 def update_volume_leds(volume_level):
     PIN_LED_VOL_1.value(0)
     PIN_LED_VOL_2.value(0)
@@ -164,26 +439,22 @@ try:
         sock_control.settimeout(15.0)
         print(f"PICO: Listening for CONTROL on UDP port {CONTROL_UDP_PORT}")
         print("PICO: Waiting for initial CONFIG command from client...")
-        display_timer.init(freq=240, mode=Timer.PERIODIC, callback=update_display_multiplex)
+        segment_display.show(current_display_volume)
+        display_timer.init(freq=DISPLAY_TIMER_HZ, mode=Timer.PERIODIC, callback=display_isr)
 
         while not i2s_configured_by_client:
             try:
                 ctrl_data, ctrl_addr = sock_control.recvfrom(128)
+                if is_control_frame(ctrl_data):
+                    print(f"PICO CTRL RX (Initial): binary op {ctrl_data[1]} from {ctrl_addr}")
+                    if handle_binary_control(ctrl_data, ctrl_addr):
+                        update_volume_leds(volume_received_from_pc)
+                    continue
                 message = ctrl_data.decode('utf-8').strip().upper()
                 print(f"PICO CTRL RX (Initial): '{message}' from {ctrl_addr}")
                 if message.startswith("CONFIG:"):
-                    parts = message.split(':')
-                    if len(parts) == 4:
-                        try:
-                            rate = int(parts[1]);
-                            bits = int(parts[2]);
-                            channels = int(parts[3])
-                            if not init_i2s_on_pico(rate, bits, channels):
-                                print("PICO: Failed initial I2S config. Waiting again.")
-                        except ValueError:
-                            print(f"PICO CTRL: Error parsing CONFIG values in '{message}'")
-                    else:
-                        print(f"PICO CTRL: Malformed CONFIG message: '{message}'")
+                    if not apply_config_message(message):
+                        print("PICO: Failed initial I2S config. Waiting again.")
                 elif message.startswith("VOL:"):
                     try:
                         vol_val = int(message.split(':')[1])
@@ -205,64 +476,88 @@ try:
         sock_audio = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
         addr_audio = socket.getaddrinfo(UDP_IP, AUDIO_UDP_PORT)[0][-1]
         sock_audio.bind(addr_audio)
-        sock_audio.settimeout(0.01)
+        sock_audio.setblocking(False)
+        if AUDIO_MULTICAST_GROUP:
+            join_multicast_group(sock_audio, AUDIO_MULTICAST_GROUP)
         print(f"PICO: Listening for AUDIO on UDP port {AUDIO_UDP_PORT}")
-        sock_control.settimeout(0.01)
+        sock_control.setblocking(False)
+        audio_rx = PacketReceiver(sock_audio, AUDIO_RECV_BUFFER_BYTES)
+        # Both sockets are waited on together: audio is read as soon as it arrives and the
+        # loop only wakes up on its own every POLL_IDLE_MS for the display and stats.
+        poller = select.poll()
+        poller.register(sock_control, select.POLLIN)
+        audio_events = audio_poll_events()
+        poller.register(sock_audio, audio_events)
         last_audio_packet_time = time.ticks_ms()
+        last_jitter_stats_time = last_audio_packet_time
         AUDIO_SILENCE_TIMEOUT_MS = 5000
         print("PICO: Entering main loop...")
 
         while True:
-            current_time_ms = time.ticks_ms()
             new_volume_value_received = False
-            try:
-                ctrl_data, ctrl_addr = sock_control.recvfrom(128)
-                message = ctrl_data.decode('utf-8').strip().upper()
-                if message.startswith("CONFIG:"):
-                    parts = message.split(':');
-                    if len(parts) == 4:
-                        try:
-                            rate = int(parts[1]); bits = int(parts[2]); channels = int(parts[3]); init_i2s_on_pico(rate,
-                                                                                                                   bits,
-                                                                                                                   channels)
-                        except ValueError:
-                            print(f"PICO CTRL: Invalid CONFIG values in '{message}'")
-                elif message.startswith("VOL:"):
-                    try:
-                        vol_val = int(message.split(':')[1])
-                        temp_vol = max(0, min(100, vol_val))
-                        if temp_vol != volume_received_from_pc:
-                            volume_received_from_pc = temp_vol
+            control_received = False
+            woke_idle = True
+            work_start = -1
+            # The wait ends when the I2S output needs the next packet, or at an armed START deadline
+            for ready_sock, events in poller.ipoll(start_gate.wait_ms(playout_wait_ms(POLL_IDLE_MS))):
+                if woke_idle:
+                    # Iteration time is counted from here, so the poll wait is left out
+                    woke_idle = False
+                    work_start = time.ticks_us()
+                try:
+                    if ready_sock is sock_audio:
+                        audio_packet = audio_rx.read()
+                        if audio_packet is not None:
+                            write_audio_packet(audio_packet)
+                            last_audio_packet_time = time.ticks_ms()
+                    else:
+                        # recvfrom rather than readinto here: the sender's address is needed for replies
+                        ctrl_data, ctrl_addr = sock_control.recvfrom(128)
+                        if handle_control_packet(ctrl_data, ctrl_addr):
                             new_volume_value_received = True
-                    except (ValueError, IndexError):
-                        print(f"PICO CTRL: Invalid VOL value in '{message}'")
-                elif message == "PLAY":
-                    player_status = "PLAY"
-                elif message == "PAUSE":
-                    player_status = "PAUSE"
-                elif message == "STOP":
-                    player_status = "STOP"
-            except OSError as e:
-                if e.args[0] != uerrno.ETIMEDOUT: print(f"PICO CTRL Socket Error (Loop): {e}")
+                        control_received = True
+                except OSError as e:
+                    if e.args[0] != uerrno.EAGAIN: print(f"PICO Socket Error (Loop): {e}")
 
+            if start_gate.due() and jitter_buffer.depth():
+                release_start()
+            if playout_active():
+                feed_playout()
+            i2s_output.refill()
+
+            # Between packets the I2S ring keeps the DAC fed, so this is where collection pauses go
+            gc_scheduler.maybe_collect(woke_idle)
+
+            if control_received and audio_poll_events() != audio_events:
+                audio_events = audio_poll_events()
+                poller.modify(sock_audio, audio_events)
+
+            current_time_ms = time.ticks_ms()
             if time.ticks_diff(current_time_ms, last_volume_display_update_time) >= VOLUME_DISPLAY_UPDATE_INTERVAL_MS:
                 if current_display_volume != volume_received_from_pc:
                     current_display_volume = volume_received_from_pc
+                    segment_display.show(current_display_volume)
                 last_volume_display_update_time = current_time_ms
 
             if new_volume_value_received:
                 update_volume_leds(volume_received_from_pc)
 
-            if audio_out and i2s_configured_by_client and player_status == "PLAY":
-                try:
-                    audio_chunk, audio_addr = sock_audio.recvfrom(2048)
-                    if audio_chunk:
-                        audio_out.write(audio_chunk)
-                        last_audio_packet_time = time.ticks_ms()
-                except OSError as e:
-                    if e.args[0] == uerrno.ETIMEDOUT:
-                        if time.ticks_diff(current_time_ms, last_audio_packet_time) > AUDIO_SILENCE_TIMEOUT_MS:
-                            last_audio_packet_time = current_time_ms
+            if time.ticks_diff(current_time_ms, last_jitter_stats_time) >= JITTER_STATS_INTERVAL_MS:
+                if audio_framed: print(f"PICO JITTER: {jitter_buffer.stats()}")
+                if player_status == "PLAY": print(f"PICO I2S OUT: {i2s_output.stats()}")
+                print(f"PICO {gc_scheduler.report()}")
+                print(f"PICO LOOP: avg {loop_timer.average_us()}us max {loop_timer.max_us}us "
+                      f"hist {loop_timer.histogram()} | display ISR late {display_isr_monitor.overruns}")
+                if start_gate.starts:
+                    print(f"PICO SYNC: {start_gate.starts} starts, last {start_gate.late_us}us late, "
+                          f"max {start_gate.max_late_us}us")
+                last_jitter_stats_time = current_time_ms
+
+            if audio_events and time.ticks_diff(current_time_ms, last_audio_packet_time) > AUDIO_SILENCE_TIMEOUT_MS:
+                last_audio_packet_time = current_time_ms
+
+            if work_start >= 0:
+                loop_timer.record(time.ticks_diff(time.ticks_us(), work_start))
     else:
         print("PICO: Halting due to WiFi connection failure.")
 except RuntimeError as e:
@@ -280,7 +575,7 @@ finally:
     set_all_segments_off()
     for led_pin in led_volume_pins: led_pin.value(0)
     print("PICO: Display and LED pins set to off.")
-    if audio_out: print("PICO: Deinitializing I2S."); audio_out.deinit()
+    if audio_out: print("PICO: Deinitializing I2S."); i2s_output.detach(); audio_out.deinit()
     if sock_audio: print("PICO: Closing audio socket."); sock_audio.close()
     if sock_control: print("PICO: Closing control socket."); sock_control.close()
     if wlan and wlan.isconnected(): print("PICO: Disconnecting WiFi."); wlan.disconnect(); wlan.active(False)
@@ -0,0 +1,65 @@
+# Receive path that allocates nothing per packet: datagrams are read into a buffer created
+# once and handed on as memoryview slices, and control commands are matched on the raw bytes
+# instead of going through decode/strip/upper/split.
+#
+# A slice is only valid until the next read; everything downstream copies or decodes it
+# (jitter buffer slots, I2S ring, ADPCM output) before the loop reads again.
+
+
+class PacketReceiver:
+    def __init__(self, sock, size):
+        self.buf = bytearray(size)
+        self.view = memoryview(self.buf)
+        self.packets = 0
+        # MicroPython sockets have readinto; CPython (host harness) has recv_into
+        self._read_into = getattr(sock, "recv_into", None) or sock.readinto
+
+    def read(self):
+        n = self._read_into(self.buf)
+        if not n:
+            return None
+        self.packets += 1
+        return self.view[:n]
+
+
+def command_length(data):
+    # Length without trailing whitespace/newlines
+    n = len(data)
+    while n and data[n - 1] <= 32:
+        n -= 1
+    return n
+
+
+def has_prefix(data, n, prefix):
+    # Case-insensitive; prefix must be upper case bytes
+    if n < len(prefix):
+        return False
+    for i in range(len(prefix)):
+        c = data[i]
+        if 97 <= c <= 122:
+            c -= 32
+        if c != prefix[i]:
+            return False
+    return True
+
+
+def is_command(data, n, command):
+    return n == len(command) and has_prefix(data, n, command)
+
+
+def parse_int(data, start, end):
+    # Decimal integer from data[start:end], up to an optional ':'; None when malformed
+    sign = 1
+    if start < end and data[start] == 45:
+        sign = -1
+        start += 1
+    value = 0
+    digits = 0
+    while start < end and data[start] != 58:
+        c = data[start] - 48
+        if c < 0 or c > 9:
+            return None
+        value = value * 10 + c
+        digits += 1
+        start += 1
+    return sign * value if digits else None
@@ -0,0 +1,129 @@
+# Volume applied on the Pico to 16-bit PCM, in place, as a Q15 multiply. A volume change ramps
+# linearly from the current gain to the new one over GAIN_RAMP_FRAMES frames, so a step never
+# lands in the middle of a waveform as a click ("zipper noise") when the volume moves quickly.
+#
+# The product is truncated toward zero, like the client's GainStage and its old scale_volume.
+#
+# The ramp runs in 8 extra fractional bits (gain << 8), so the per-frame increment is computed
+# once per volume change and the sample loop needs no division.
+import array
+import sys
+
+Q15_ONE = 1 << 15
+GAIN_RAMP_FRAMES = 128  # ~6 ms at 22050 Hz, ~3 ms at 44100 Hz
+
+# state = [gain << 8, increment per frame, ramp frames left, target gain]
+_ACC, _DELTA, _LEFT, _TARGET = 0, 1, 2, 3
+
+HAVE_VIPER = sys.implementation.name == "micropython"
+if HAVE_VIPER:
+    import micropython
+
+    @micropython.viper
+    def _apply_gain_viper(buf: ptr16, samples: int, channels: int, state: ptr32):
+        acc = state[0]
+        delta = state[1]
+        left = state[2]
+        i = 0
+        while left > 0 and i < samples:
+            acc += delta
+            left -= 1
+            if left == 0:
+                acc = state[3] << 8
+            gain = acc >> 8
+            end = i + channels
+            while i < end:
+                s = buf[i]
+                if s & 0x8000:
+                    buf[i] = -(((0x10000 - s) * gain) >> 15)
+                else:
+                    buf[i] = (s * gain) >> 15
+                i += 1
+        state[0] = acc
+        state[2] = left
+        gain = acc >> 8
+        if gain == 32768:
+            return
+        while i < samples:
+            s = buf[i]
+            if s & 0x8000:
+                buf[i] = -(((0x10000 - s) * gain) >> 15)
+            else:
+                buf[i] = (s * gain) >> 15
+            i += 1
+
+
+def _scale(s, gain):
+    return -((-s * gain) >> 15) if s < 0 else (s * gain) >> 15
+
+
+def _apply_gain_py(buf, samples, channels, state):
+    acc, delta, left, target = state
+    i = 0
+    while left > 0 and i < samples:
+        acc += delta
+        left -= 1
+        if left == 0:
+            acc = target << 8
+        gain = acc >> 8
+        for j in range(i, i + channels):
+            buf[j] = _scale(buf[j], gain)
+        i += channels
+    state[_ACC] = acc
+    state[_LEFT] = left
+    gain = acc >> 8
+    if gain == Q15_ONE:
+        return
+    for j in range(i, samples):
+        buf[j] = _scale(buf[j], gain)
+
+
+def volume_to_q15(volume_percentage):
+    volume_percentage = max(0, min(100, volume_percentage))
+    return (volume_percentage * Q15_ONE + 50) // 100
+
+
+class PicoGain:
+    """Scales 16-bit buffers in place; set_volume() from the control path, apply() on the audio path.
+
+    set_volume() only stores the target, so it is safe while apply() runs from the I2S irq
+    callback; the ramp towards a new target starts at the next apply().
+    """
+
+    def __init__(self, volume=100, ramp_frames=GAIN_RAMP_FRAMES):
+        self.ramp_frames = ramp_frames
+        gain = volume_to_q15(volume)
+        self.target = gain
+        self._state = array.array('i', [gain << 8, 0, 0, gain])
+        self._apply = _apply_gain_viper if HAVE_VIPER else _apply_gain_py
+        self.buffers = 0
+        self.ramps = 0
+
+    def set_volume(self, volume_percentage, ramp=True):
+        self.target = volume_to_q15(volume_percentage)
+        if not ramp:
+            state = self._state
+            state[_ACC] = self.target << 8
+            state[_LEFT] = 0
+            state[_TARGET] = self.target
+
+    def gain(self):
+        return self._state[_ACC] >> 8
+
+    def apply(self, buf, channels=1):
+        # buf: writable bytes of 16-bit little-endian samples (a memoryview slice of a slot)
+        state = self._state
+        target = self.target
+        if target != state[_TARGET]:
+            state[_TARGET] = target
+            state[_DELTA] = ((target << 8) - state[_ACC]) // self.ramp_frames
+            state[_LEFT] = self.ramp_frames
+            self.ramps += 1
+        if state[_LEFT] == 0 and target == Q15_ONE:
+            return
+        samples = len(buf) // 2
+        if HAVE_VIPER:
+            self._apply(buf, samples, channels, state)
+        else:
+            self._apply(memoryview(buf).cast('h'), samples, channels, state)
+        self.buffers += 1
@@ -0,0 +1,65 @@
+# Counters for the STATS request on the control port. Everything here runs in the main loop
+# or in the display ISR, so the hot paths only do small-int arithmetic and never allocate.
+import array
+import time
+
+# Upper bounds (us) of the main-loop histogram buckets; the last bucket takes everything above
+LOOP_BUCKET_LIMITS_US = (250, 1000, 4000, 16000)
+
+
+class LoopTimer:
+    """Work time of each main-loop iteration, from the first ready socket to the end of the loop."""
+
+    def __init__(self):
+        self.buckets = array.array('I', [0] * (len(LOOP_BUCKET_LIMITS_US) + 1))
+        self.reset()
+
+    def reset(self):
+        self.count = 0
+        self.total_us = 0
+        self.max_us = 0
+        for i in range(len(self.buckets)):
+            self.buckets[i] = 0
+
+    def record(self, us):
+        self.count += 1
+        self.total_us += us
+        if us > self.max_us:
+            self.max_us = us
+        i = 0
+        for limit in LOOP_BUCKET_LIMITS_US:
+            if us < limit:
+                break
+            i += 1
+        self.buckets[i] += 1
+
+    def average_us(self):
+        return self.total_us // self.count if self.count else 0
+
+    def histogram(self):
+        return "/".join(str(n) for n in self.buckets)
+
+
+class IsrMonitor:
+    """Counts timer ISRs that fire more than `slack` periods after the previous one.
+
+    A late tick means something held interrupts off (or the previous ISR ran too long) and
+    the display multiplex skipped a digit slot.
+    """
+
+    def __init__(self, freq, slack=1.5):
+        self.period_us = 1000000 // freq
+        self.limit_us = int(self.period_us * slack)
+        self.overruns = 0
+        self.max_gap_us = 0
+        self._last = -1
+
+    def tick(self):
+        now = time.ticks_us()
+        if self._last >= 0:
+            gap = time.ticks_diff(now, self._last)
+            if gap > self.limit_us:
+                self.overruns += 1
+            if gap > self.max_gap_us:
+                self.max_gap_us = gap
+        self._last = now
@@ -0,0 +1,61 @@
+# Synchronised start for multi-room playback. The client measures the offset between its clock
+# and each Pico's ticks_us (SYNC requests), picks one start moment and sends every Pico a START
+# carrying that moment translated to the Pico's own clock, plus the sample_pos the stream starts at.
+# Until then the jitter buffer only fills; at the deadline playout begins, and frames that should
+# already have been heard (the loop woke up late, or the first packet arrived late) are skipped,
+# so every Pico plays sample k at deadline + k / rate.
+#
+# Clock drift between boards is not corrected: each new START re-aligns them.
+import time
+
+SPIN_US = 1500  # the last part of the wait is a sleep_us instead of a poll timeout (ms resolution)
+
+
+class StartGate:
+    def __init__(self):
+        self.armed = False
+        self.deadline = 0
+        self.start_pos = 0
+        self.starts = 0
+        self.late_us = 0
+        self.max_late_us = 0
+
+    def arm(self, deadline_us, start_pos):
+        self.deadline = deadline_us & 0x3FFFFFFF
+        self.start_pos = start_pos
+        self.armed = True
+
+    def clear(self):
+        self.armed = False
+
+    def wait_ms(self, idle_ms):
+        # Poll timeout for the main loop: wake up for the deadline (minus the spin). Once it has
+        # passed with nothing to play, the next audio packet wakes the loop anyway
+        if not self.armed:
+            return idle_ms
+        remaining = time.ticks_diff(self.deadline, time.ticks_us()) - SPIN_US
+        if remaining < 0:
+            return idle_ms
+        return min(idle_ms, remaining // 1000)
+
+    def due(self):
+        if not self.armed:
+            return False
+        remaining = time.ticks_diff(self.deadline, time.ticks_us())
+        if remaining > SPIN_US:
+            return False
+        if remaining > 0:
+            time.sleep_us(remaining)
+        return True
+
+    def release(self, rate):
+        # Returns how many frames are already late: the caller drops them from the first chunk
+        self.armed = False
+        late = time.ticks_diff(time.ticks_us(), self.deadline)
+        if late < 0:
+            late = 0
+        self.late_us = late
+        if late > self.max_late_us:
+            self.max_late_us = late
+        self.starts += 1
+        return late * rate // 1000000
@@ -0,0 +1,75 @@
+# Multiplexed 4-digit, common-anode 7-segment display driven straight through the SIO
+# GPIO set/clear registers. The per-digit masks are computed when the shown value changes;
+# the timer callback only writes four registers and allocates nothing.
+import sys
+from machine import mem32
+
+SIO_BASE = 0xD0000000
+if "RP2040" in getattr(sys.implementation, "_machine", ""):
+    GPIO_OUT_SET = SIO_BASE + 0x014
+    GPIO_OUT_CLR = SIO_BASE + 0x018
+else:
+    # RP2350 (Pico 2 W)
+    GPIO_OUT_SET = SIO_BASE + 0x018
+    GPIO_OUT_CLR = SIO_BASE + 0x020
+
+# Segment levels a, b, c, d, e, f, g, dp; 0 lights the segment
+SEGMENT_PATTERNS = {
+    0: (0, 0, 0, 0, 0, 0, 1, 1), 1: (1, 0, 0, 1, 1, 1, 1, 1), 2: (0, 0, 1, 0, 0, 1, 0, 1),
+    3: (0, 0, 0, 0, 1, 1, 0, 1), 4: (1, 0, 0, 1, 1, 0, 0, 1), 5: (0, 1, 0, 0, 1, 0, 0, 1),
+    6: (0, 1, 0, 0, 0, 0, 0, 1), 7: (0, 0, 0, 1, 1, 1, 1, 1), 8: (0, 0, 0, 0, 0, 0, 0, 1),
+    9: (0, 0, 0, 1, 0, 0, 0, 1),
+    ' ': (1, 1, 1, 1, 1, 1, 1, 1), '-': (1, 1, 1, 1, 1, 1, 0, 1)
+}
+
+
+class SegmentDisplay:
+    def __init__(self, segment_gpios, digit_gpios):
+        self.segment_gpios = segment_gpios
+        self.segment_mask = 0
+        for gpio in segment_gpios:
+            self.segment_mask |= 1 << gpio
+        self.digit_bits = [1 << gpio for gpio in digit_gpios]
+        self.digit_mask = 0
+        for bit in self.digit_bits:
+            self.digit_mask |= bit
+        self.num_digits = len(digit_gpios)
+        self.index = 0
+        self._lit = [0] * self.num_digits
+        self.value = None
+        # Bound once here; binding self.tick in Timer.init would allocate a new method object each time
+        self.tick_cb = self.tick
+
+    def lit_mask(self, char):
+        # GPIOs to pull low for char; the decimal point always stays off
+        pattern = SEGMENT_PATTERNS.get(char, SEGMENT_PATTERNS[' '])
+        mask = 0
+        for gpio, level in zip(self.segment_gpios[:7], pattern):
+            if level == 0:
+                mask |= 1 << gpio
+        return mask
+
+    def show(self, value):
+        if value == self.value:
+            return
+        lit = []
+        divisor = 10 ** (self.num_digits - 1)
+        for _ in range(self.num_digits):
+            lit.append(self.lit_mask((value // divisor) % 10))
+            divisor //= 10
+        # One reference swap, so the ISR never sees half of the old value and half of the new one
+        self._lit = lit
+        self.value = value
+
+    def tick(self, timer=None):
+        i = self.index
+        mem32[GPIO_OUT_CLR] = self.digit_mask
+        mem32[GPIO_OUT_SET] = self.segment_mask
+        mem32[GPIO_OUT_CLR] = self._lit[i]
+        mem32[GPIO_OUT_SET] = self.digit_bits[i]
+        i += 1
+        self.index = 0 if i == self.num_digits else i
+
+    def off(self):
+        mem32[GPIO_OUT_CLR] = self.digit_mask
+        mem32[GPIO_OUT_SET] = self.segment_mask